@@ -33,6 +33,7 @@ from backend.controllers.stress_controller import stress_controller
 
 # Import database
 from backend.database.db import init_db, close_db, db_manager
+from backend.services.aggregation_service import aggregation_service
 
 # Import config
 from backend.config import (
@@ -485,6 +486,8 @@ async def create_mood_entry(
         result = mood_collection.insert_one(entry_data)
         
         if result.inserted_id:
+            # New entries should show up in team dashboards right away
+            aggregation_service.invalidate()
             return {
                 "success": True,
                 "message": "Mood entry created successfully",
@@ -595,6 +598,24 @@ async def resume_session(session_id: str, user_id: str = Body(..., embed=True)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/emotion/session/{session_id}/frame", tags=["Emotion Detection"])
+async def process_frame(session_id: str, frame_base64: str = Body(..., embed=True)):
+    """Detect emotion in a webcam frame for an active session"""
+    try:
+        result = await emotion_controller.process_frame_async(
+            session_id,
+            {"frame_base64": frame_base64}
+        )
+        
+        if not result.get("success"):
+            raise HTTPException(status_code=400, detail=result.get("error"))
+        
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/emotion/session/complete", tags=["Emotion Detection"])
 async def complete_session(data: SessionComplete):
     """Complete an emotion detection session"""
@@ -657,7 +678,7 @@ async def calculate_stress(data: StressCalculation):
         if data.sleep_hours is not None:
             context["sleep_hours"] = data.sleep_hours
         
-        result = stress_controller.calculate_stress(
+        result = await stress_controller.calculate_stress_async(
             dominant_emotion=data.dominant_emotion,
             user_id=data.user_id,
             additional_factors=context if context else None
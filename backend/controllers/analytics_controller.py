@@ -22,6 +22,7 @@ if parent_dir not in sys.path:
 
 from backend.database.db import db_manager
 from backend.services.aggregation_service import aggregation_service
+from backend.services.alert_service import alert_service
 
 
 class AnalyticsController:
@@ -137,11 +138,8 @@ class AnalyticsController:
                 "stress_score": {"$gte": 7}
             })
             
-            # Get alerts count
-            alerts_count = self.db.alerts.count_documents({
-                "created_at": {"$gte": last_7d},
-                "acknowledged": False
-            })
+            # Alert counts come from the alert service (one query)
+            alert_summary = alert_service.get_alert_summary(last_7d)
             
             # Calculate wellness score (0-100)
             wellness_score = self._calculate_wellness_score(
@@ -176,10 +174,7 @@ class AnalyticsController:
                         "high_stress_count": high_stress_count,
                         "high_stress_percentage": round((high_stress_count / total_emotions) * 100, 2) if total_emotions > 0 else 0
                     },
-                    "alerts": {
-                        "unacknowledged_count": alerts_count,
-                        "severity_breakdown": self._get_alert_severity_breakdown(last_7d)
-                    },
+                    "alerts": alert_summary,
                     "trends": self._get_emotion_trends(last_7d),
                     "generated_at": datetime.utcnow().isoformat()
                 }
@@ -231,18 +226,6 @@ class AnalyticsController:
         except Exception:
             return 50  # Default middle score if calculation fails
     
-    def _get_alert_severity_breakdown(self, since: datetime) -> Dict:
-        """Get alert count by severity"""
-        try:
-            pipeline = [
-                {"$match": {"created_at": {"$gte": since}}},
-                {"$group": {"_id": "$severity", "count": {"$sum": 1}}}
-            ]
-            results = list(self.db.alerts.aggregate(pipeline))
-            return {r["_id"]: r["count"] for r in results}
-        except Exception:
-            return {}
-    
     def _get_emotion_trends(self, since: datetime) -> Dict:
         """Get emotion trends over time"""
         try:
@@ -251,7 +234,7 @@ class AnalyticsController:
                 {
                     "$group": {
                         "_id": {
-                            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                            "date": {"$dateTrunc": {"date": "$timestamp", "unit": "day"}},
                             "emotion": "$dominant_emotion"
                         },
                         "count": {"$sum": 1}
@@ -265,7 +248,7 @@ class AnalyticsController:
             # Organize by date
             trends = defaultdict(dict)
             for r in results:
-                date = r["_id"]["date"]
+                date = r["_id"]["date"].strftime("%Y-%m-%d")
                 emotion = r["_id"]["emotion"]
                 trends[date][emotion] = r["count"]
             
@@ -305,7 +288,9 @@ class AnalyticsController:
             
             # Enrich with additional insights
             if result.get("success") and result.get("distribution"):
-                result["insights"] = self._generate_emotion_insights(result["distribution"])
+                result["insights"] = self._generate_emotion_insights(
+                    result["distribution"], result["total_entries"]
+                )
             
             return result
             
@@ -316,13 +301,11 @@ class AnalyticsController:
                 "error": str(e)
             }
     
-    def _generate_emotion_insights(self, distribution: Dict) -> List[str]:
-        """Generate insights from emotion distribution"""
+    def _generate_emotion_insights(self, distribution: Dict, total: int) -> List[str]:
+        """Generate insights from emotion distribution (most frequent first) and its entry total"""
         insights = []
         
         try:
-            total = sum(d["count"] for d in distribution.values())
-            
             # Positive emotion percentage
             positive = ['Happy', 'Surprise']
             positive_count = sum(distribution.get(e, {}).get("count", 0) for e in positive)
@@ -341,9 +324,9 @@ class AnalyticsController:
             if negative_pct > 40:
                 insights.append("🚨 High negative emotion levels - immediate intervention recommended")
             
-            # Dominant emotion
+            # Dominant emotion (distribution arrives sorted by count)
             if distribution:
-                dominant = max(distribution.items(), key=lambda x: x[1]["count"])
+                dominant = next(iter(distribution.items()))
                 if dominant[1]["count"] / total > 0.5:
                     insights.append(f"📊 {dominant[0]} is heavily dominant ({dominant[1]['percentage']:.1f}%)")
             
@@ -649,7 +632,7 @@ class AnalyticsController:
                 {
                     "$group": {
                         "_id": {
-                            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                            "date": {"$dateTrunc": {"date": "$timestamp", "unit": "day"}},
                             "emotion": "$dominant_emotion"
                         },
                         "count": {"$sum": 1}
@@ -663,7 +646,7 @@ class AnalyticsController:
             # Organize by date
             by_date = defaultdict(list)
             for r in results:
-                date = r["_id"]["date"]
+                date = r["_id"]["date"].strftime("%Y-%m-%d")
                 emotion = r["_id"]["emotion"]
                 by_date[date].append({
                     "emotion": emotion,
@@ -4,11 +4,12 @@ Production-grade emotion detection with advanced session management and frame pr
 """
 import sys
 import os
+import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import uuid
 import logging
-from collections import deque
+from collections import Counter, deque
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -348,8 +349,6 @@ class EmotionController:
             entries = list(session["entries"])
             
             if entries:
-                from collections import Counter
-                
                 # Get emotion distribution
                 emotions = [e.get("dominant_emotion", "Unknown") for e in entries]
                 emotion_counter = Counter(emotions)
@@ -534,6 +533,7 @@ class EmotionController:
                 }
             }
             
+            # save_mood_entry also invalidates cached team reports
             self.mood_repo.save_mood_entry(mood_entry)
             logger.info(f"💾 Session saved to database: {session['session_id']}")
             return True
@@ -550,8 +550,8 @@ class EmotionController:
             dict: Validation results
         """
         try:
-            # Check if model is loaded
-            model_loaded = self.model.loaded if self.model else False
+            # Check the model, loading it if nothing has used it yet
+            model_loaded = self.model.ensure_loaded() if self.model else False
             
             # Get model info
             model_info = self.model.get_model_info() if self.model else {}
@@ -641,64 +641,57 @@ class EmotionController:
             dict: Emotion detection result
         """
         try:
-            session = self.sessions.get(session_id)
-            
-            if not session:
-                return {
-                    "success": False,
-                    "error": "Invalid or expired session"
-                }
-            
-            if session["status"] != "active":
-                return {
-                    "success": False,
-                    "error": f"Session is {session['status']}, not active"
-                }
-            
-            # Increment frame counter
-            session["frame_count"] += 1
+            session, error = self._frame_session(session_id)
+            if error is not None:
+                return error
             
             # Detect emotion
             result = self.analyzer.analyze_frame(frame_data)
             
             if result["success"]:
-                # Add timestamp
-                result["timestamp"] = datetime.utcnow().isoformat()
-                
-                # Add to session entries
-                entry = {
-                    "timestamp": datetime.utcnow(),
-                    "dominant_emotion": result["dominant_emotion"],
-                    "confidence": result["confidence"],
-                    "emotions": result["emotions"],
-                    "stress_score": result.get("stress_score", 0)
-                }
-                session["entries"].append(entry)
-                
-                # Update emotion counts
-                emotion = result["dominant_emotion"]
-                session["emotion_counts"][emotion] = session["emotion_counts"].get(emotion, 0) + 1
-                
-                # Update stress accumulator
-                session["stress_accumulator"].append(result.get("stress_score", 0))
-                
-                # Update last detected values
-                session["last_emotion"] = emotion
-                session["last_confidence"] = result["confidence"]
-                
                 # Save individual entry to database
-                mood_entry = {
-                    "session_id": session_id,
-                    "user_id": session["user_id"],
-                    "timestamp": datetime.utcnow(),
-                    "dominant_emotion": result["dominant_emotion"],
-                    "confidence": result["confidence"],
-                    "emotions": result["emotions"],
-                    "stress_score": result.get("stress_score", 0)
-                }
-                self.mood_repo.save_mood_entry(mood_entry)
-                
-                logger.debug(f"📸 Frame processed for session {session_id}: {emotion}")
+                self.mood_repo.save_mood_entry(self._record_frame(session_id, session, result))
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ Error processing frame: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def process_frame_async(
+        self,
+        session_id: str,
+        frame_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        process_frame for event-loop callers
+        
+        Detection goes through the model's batching queue, so frames from
+        concurrent sessions share model invocations; the mood entry is
+        saved from a worker thread.
+        
+        Args:
+            session_id: Session ID
+            frame_data: Frame data (base64 or image bytes)
+        
+        Returns:
+            dict: Emotion detection result
+        """
+        try:
+            session, error = self._frame_session(session_id)
+            if error is not None:
+                return error
+            
+            result = await self.analyzer.analyze_frame_async(frame_data)
+            
+            if result["success"]:
+                await asyncio.to_thread(
+                    self.mood_repo.save_mood_entry,
+                    self._record_frame(session_id, session, result)
+                )
             
             return result
             
@@ -709,6 +702,79 @@ class EmotionController:
                 "error": str(e)
             }
     
+    def _frame_session(self, session_id: str):
+        """
+        Look up an active session and count the incoming frame
+        
+        Returns:
+            tuple: (session, None), or (None, failure result)
+        """
+        session = self.sessions.get(session_id)
+        
+        if not session:
+            return None, {
+                "success": False,
+                "error": "Invalid or expired session"
+            }
+        
+        if session["status"] != "active":
+            return None, {
+                "success": False,
+                "error": f"Session is {session['status']}, not active"
+            }
+        
+        # Increment frame counter
+        session["frame_count"] += 1
+        return session, None
+    
+    def _record_frame(
+        self,
+        session_id: str,
+        session: Dict[str, Any],
+        result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Add a successful frame result to the session's running state
+        
+        Returns:
+            dict: Mood entry to save for the frame
+        """
+        # Add timestamp
+        result["timestamp"] = datetime.utcnow().isoformat()
+        
+        # Add to session entries
+        entry = {
+            "timestamp": datetime.utcnow(),
+            "dominant_emotion": result["dominant_emotion"],
+            "confidence": result["confidence"],
+            "emotions": result["emotions"],
+            "stress_score": result.get("stress_score", 0)
+        }
+        session["entries"].append(entry)
+        
+        # Update emotion counts
+        emotion = result["dominant_emotion"]
+        session["emotion_counts"][emotion] = session["emotion_counts"].get(emotion, 0) + 1
+        
+        # Update stress accumulator
+        session["stress_accumulator"].append(result.get("stress_score", 0))
+        
+        # Update last detected values
+        session["last_emotion"] = emotion
+        session["last_confidence"] = result["confidence"]
+        
+        logger.debug(f"📸 Frame processed for session {session_id}: {emotion}")
+        
+        return {
+            "session_id": session_id,
+            "user_id": session["user_id"],
+            "timestamp": datetime.utcnow(),
+            "dominant_emotion": result["dominant_emotion"],
+            "confidence": result["confidence"],
+            "emotions": result["emotions"],
+            "stress_score": result.get("stress_score", 0)
+        }
+    
     def get_session_statistics(self, session_id: str) -> Dict[str, Any]:
         """
         Get real-time statistics for an active session
@@ -738,8 +804,6 @@ class EmotionController:
                     "statistics": {}
                 }
             
-            from collections import Counter
-            
             # Calculate statistics
             emotions = [e["dominant_emotion"] for e in entries]
             emotion_counter = Counter(emotions)
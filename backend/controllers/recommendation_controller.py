@@ -62,10 +62,12 @@ class RecommendationController:
             
             logger.info(f"🎯 Generating recommendation for emotion: {dominant_emotion}")
             
-            # Get base recommendation from service
+            # Get base recommendation from service (insights are replaced
+            # by the controller's own below)
             result = self.recommendation_service.recommend_task(
                 dominant_emotion=dominant_emotion,
-                context=context
+                context=context,
+                include={"zone_info"}
             )
             
             if not result.get("success"):
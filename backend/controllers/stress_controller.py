@@ -4,6 +4,7 @@ Production-grade stress analysis with predictive alerts and comprehensive manage
 """
 import sys
 import os
+import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import logging
@@ -41,7 +42,8 @@ class StressController:
         dominant_emotion: str, 
         user_id: str,
         previous_score: Optional[int] = None,
-        additional_factors: Optional[Dict[str, Any]] = None
+        additional_factors: Optional[Dict[str, Any]] = None,
+        check_alert: bool = True
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive stress score with trend analysis
@@ -51,6 +53,8 @@ class StressController:
             user_id: User ID
             previous_score: Optional previous stress score
             additional_factors: Additional stress factors (workload, sleep, etc.)
+            check_alert: Raise a high-stress alert when warranted
+                (calculate_stress_async does this itself)
         
         Returns:
             dict: Comprehensive stress analysis
@@ -101,22 +105,17 @@ class StressController:
                 }
             
             # Check if alert should be created
-            if stress_score >= 7:
-                alert_result = self.alert_service.check_and_create_alert(
-                    user_id=user_id,
-                    alert_type="high_stress",
-                    severity="high" if stress_score >= 8 else "medium",
-                    message=f"High stress detected: {stress_level} (Score: {stress_score})",
-                    metadata={
-                        "stress_score": stress_score,
-                        "dominant_emotion": dominant_emotion,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
+            alert_request = self._stress_alert_request(
+                user_id,
+                stress_score,
+                result["stress_level"],
+                dominant_emotion
+            )
+            if check_alert and alert_request is not None:
+                self._apply_alert_result(
+                    result,
+                    self.alert_service.check_and_create_alert(**alert_request)
                 )
-                result["alert_triggered"] = alert_result.get("alert_created", False)
-                
-                if alert_result.get("alert_created"):
-                    result["alert_id"] = str(alert_result.get("alert", {}).get("_id"))
             
             # Add comparison with previous score
             if previous_score is not None:
@@ -157,6 +156,87 @@ class StressController:
                 "error_type": type(e).__name__
             }
     
+    async def calculate_stress_async(
+        self,
+        dominant_emotion: str,
+        user_id: str,
+        previous_score: Optional[int] = None,
+        additional_factors: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        calculate_stress for event-loop callers
+        
+        The analysis runs in a worker thread; the high-stress alert goes
+        through the alert service's motor path.
+        
+        Args:
+            dominant_emotion: The detected dominant emotion
+            user_id: User ID
+            previous_score: Optional previous stress score
+            additional_factors: Additional stress factors (workload, sleep, etc.)
+        
+        Returns:
+            dict: Comprehensive stress analysis
+        """
+        result = await asyncio.to_thread(
+            self.calculate_stress,
+            dominant_emotion,
+            user_id,
+            previous_score,
+            additional_factors,
+            False
+        )
+        if not result.get("success"):
+            return result
+        
+        alert_request = self._stress_alert_request(
+            user_id,
+            result["stress_score"],
+            result["stress_level"],
+            dominant_emotion
+        )
+        if alert_request is not None:
+            self._apply_alert_result(
+                result,
+                await self.alert_service.check_and_create_alert_async(**alert_request)
+            )
+        
+        return result
+    
+    @staticmethod
+    def _stress_alert_request(
+        user_id: str,
+        stress_score: int,
+        stress_level: str,
+        dominant_emotion: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Arguments for a high-stress alert, or None below the alert threshold
+        """
+        if stress_score < 7:
+            return None
+        
+        return {
+            "user_id": user_id,
+            "alert_type": "high_stress",
+            "severity": "high" if stress_score >= 8 else "medium",
+            "message": f"High stress detected: {stress_level} (Score: {stress_score})",
+            "metadata": {
+                "stress_score": stress_score,
+                "dominant_emotion": dominant_emotion,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        }
+    
+    @staticmethod
+    def _apply_alert_result(result: Dict[str, Any], alert_result: Dict[str, Any]):
+        """Record an alert check's outcome on a stress analysis"""
+        result["alert_triggered"] = alert_result.get("alert_created", False)
+        
+        if alert_result.get("alert_created"):
+            result["alert_id"] = str(alert_result.get("alert", {}).get("_id"))
+            result["alert_status"] = alert_result.get("status")
+    
     def get_user_stress_history(
         self, 
         user_id: str, 
@@ -846,27 +926,36 @@ class StressController:
         triggers = []
         
         try:
-            # Get high-stress entries
+            # Most common emotion and count of high-stress entries, computed
+            # server-side so only one document comes back
             start_date = datetime.utcnow() - timedelta(days=days)
-            high_stress = list(
-                self.db.mood_entries.find({
-                    "user_id": user_id,
-                    "timestamp": {"$gte": start_date},
-                    "stress_score": {"$gte": 7}
-                })
-            )
+            pipeline = [
+                {
+                    "$match": {
+                        "user_id": user_id,
+                        "timestamp": {"$gte": start_date},
+                        "stress_score": {"$gte": 7}
+                    }
+                },
+                {"$group": {"_id": "$dominant_emotion", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "most_common_emotion": {"$first": "$_id"},
+                        "high_stress_count": {"$sum": "$count"}
+                    }
+                }
+            ]
+            result = list(self.db.mood_entries.aggregate(pipeline))
             
-            if high_stress:
+            if result and result[0].get("high_stress_count"):
                 # Analyze emotions during high stress
-                emotions = [e.get("dominant_emotion") for e in high_stress]
-                from collections import Counter
-                emotion_counter = Counter(emotions)
-                
-                most_common = emotion_counter.most_common(1)[0]
-                triggers.append(f"{most_common[0]} emotion frequently accompanies high stress")
+                most_common = result[0]["most_common_emotion"]
+                triggers.append(f"{most_common} emotion frequently accompanies high stress")
                 
                 # Time-based patterns (simplified)
-                if len(high_stress) >= 3:
+                if result[0]["high_stress_count"] >= 3:
                     triggers.append("Multiple high-stress events detected - consider workload review")
         
         except Exception as e:
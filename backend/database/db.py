@@ -26,6 +26,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    MOTOR_AVAILABLE = True
+except ImportError:
+    MOTOR_AVAILABLE = False
+    logger.info("💡 Motor not available - async database access disabled")
+
 
 def retry_on_failure(max_retries=3, delay=1):
     """Decorator for retrying database operations"""
@@ -56,6 +63,7 @@ class DatabaseManager:
     def __init__(self):
         self.client: Optional[MongoClient] = None
         self.db: Optional[Database] = None
+        self.async_client = None  # Motor client, created on first async use
         self._connected = False
         self._connection_attempts = 0
         self._last_health_check = None
@@ -169,6 +177,10 @@ class DatabaseManager:
                 self.client.close()
                 logger.info("✅ Database connection closed properly")
             
+            if self.async_client is not None:
+                self.async_client.close()
+                self.async_client = None
+            
             self._connected = False
             self.client = None
             self.db = None
@@ -236,6 +248,37 @@ class DatabaseManager:
         
         return self.db
     
+    def get_async_database(self):
+        """
+        Get an asyncio (motor) database for event-loop callers
+        
+        The motor client is created on first use with the same pool and
+        timeout settings as the sync client.
+        
+        Returns:
+            AsyncIOMotorDatabase: Motor database instance or None if motor
+                is not installed
+        """
+        if not MOTOR_AVAILABLE:
+            return None
+        
+        if self.async_client is None:
+            self.async_client = AsyncIOMotorClient(
+                self.mongo_uri,
+                maxPoolSize=self.max_pool_size,
+                minPoolSize=self.min_pool_size,
+                maxIdleTimeMS=self.max_idle_time_ms,
+                serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+                connectTimeoutMS=self.connect_timeout_ms,
+                socketTimeoutMS=self.socket_timeout_ms,
+                retryWrites=self.retry_writes,
+                retryReads=self.retry_reads,
+                appName="Amdox_Emotion_Detection",
+                compressors="snappy,zlib"
+            )
+        
+        return self.async_client[self.db_name]
+    
     def get_collection(self, collection_name: str) -> Optional[Collection]:
         """
         Get a collection by name with existence verification
@@ -370,7 +413,12 @@ class DatabaseManager:
                 [("user_id", ASCENDING)],
                 [("session_id", ASCENDING)],
                 [("timestamp", DESCENDING)],
+                # Backs the team-scoped $match (user_id $in members + window)
+                # at the head of every AggregationService pipeline
                 [("user_id", ASCENDING), ("timestamp", DESCENDING)],
+                [("session_id", ASCENDING), ("timestamp", DESCENDING)],
+                # Covers system-wide window aggregations (activity, overview)
+                [("timestamp", DESCENDING), ("user_id", ASCENDING), ("stress_score", ASCENDING)],
                 [("stress_score", DESCENDING)],
                 [("dominant_emotion", ASCENDING)]
             ])
@@ -388,7 +436,40 @@ class DatabaseManager:
                 [("created_at", DESCENDING)],
                 [("acknowledged", ASCENDING)],
                 [("severity", ASCENDING)],
-                [("user_id", ASCENDING), ("created_at", DESCENDING)]
+                # Daily limit count and get_user_alerts with acknowledged
+                [("user_id", ASCENDING), ("created_at", DESCENDING)],
+                # AlertService cooldown check (equality, equality, range)
+                [("user_id", ASCENDING), ("alert_type", ASCENDING), ("created_at", DESCENDING)],
+                # Unacknowledged user/team alerts, newest first
+                [("user_id", ASCENDING), ("acknowledged", ASCENDING), ("created_at", DESCENDING)],
+                # delete_old_alerts cleanup
+                [("acknowledged", ASCENDING), ("acknowledged_at", ASCENDING)]
+            ])
+            
+            # At most one alert per (user, type, cooldown window) across workers
+            self.create_index_with_options(
+                "alerts",
+                [("user_id", ASCENDING), ("alert_type", ASCENDING), ("cooldown_bucket", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"cooldown_bucket": {"$exists": True}}
+            )
+            
+            # Acknowledged alerts expire at purge_at (TTL monitor deletes them)
+            self.create_index_with_options(
+                "alerts",
+                [("purge_at", ASCENDING)],
+                expireAfterSeconds=0
+            )
+            
+            # Daily per-user alert rollups (AlertService statistics); one
+            # document per (user, day) so upserts never split a day's counts
+            self.create_index_with_options(
+                "alert_stats_daily",
+                [("user_id", ASCENDING), ("date", DESCENDING)],
+                unique=True
+            )
+            self.create_indexes("alert_stats_daily", [
+                [("date", DESCENDING)]
             ])
             
             # Recommendation feedback collection indexes
@@ -450,6 +531,33 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"❌ Error creating indexes for {collection_name}: {e}")
     
+    def create_index_with_options(
+        self,
+        collection_name: str,
+        index_spec: List,
+        **options
+    ):
+        """
+        Create a single index with extra options (unique, partial, TTL)
+        
+        Args:
+            collection_name: Name of the collection
+            index_spec: Index specification
+            **options: create_index options, e.g. expireAfterSeconds
+        """
+        try:
+            collection = self.get_collection(collection_name)
+            if collection is None:
+                return
+            
+            collection.create_index(index_spec, background=True, **options)
+            
+        except OperationFailure as e:
+            if "already exists" not in str(e):
+                logger.warning(f"⚠️ Index creation warning for {collection_name}: {e}")
+        except Exception as e:
+            logger.error(f"❌ Error creating index for {collection_name}: {e}")
+    
     def drop_collection(self, collection_name: str) -> bool:
         """
         Drop a collection (use with caution)
@@ -23,6 +23,7 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from backend.database.db import db_manager
+from backend.services.aggregation_service import aggregation_service
 
 
 class MoodRepository:
@@ -132,6 +133,11 @@ class MoodRepository:
             
             logger.info(f"💾 Bulk saved {len(result.inserted_ids)} mood entries")
             
+            # Clear cache for every user in the batch
+            for user_id in {entry.get("user_id") for entry in mood_entries}:
+                if user_id:
+                    self._clear_user_cache(user_id)
+            
             return {
                 "success": True,
                 "inserted_count": len(result.inserted_ids),
@@ -140,6 +146,9 @@ class MoodRepository:
             
         except BulkWriteError as e:
             logger.error(f"❌ Bulk write error: {e}")
+            # Unordered inserts may have partially succeeded
+            if e.details.get("nInserted", 0):
+                aggregation_service.invalidate()
             return {
                 "success": False,
                 "error": str(e),
@@ -712,7 +721,8 @@ class MoodRepository:
                 {"$sort": {"avg_stress": -1}}
             ]
             
-            results = list(self.collection.aggregate(pipeline))
+            # One row per user; stream instead of buffering the raw cursor
+            results = self.collection.aggregate(pipeline, allowDiskUse=True, batchSize=500)
             
             return [
                 {
@@ -761,7 +771,7 @@ class MoodRepository:
                 {
                     "$group": {
                         "_id": {
-                            "$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}
+                            "$dateTrunc": {"date": "$timestamp", "unit": "day"}
                         },
                         "avg_stress": {"$avg": "$stress_score"},
                         "count": {"$sum": 1}
@@ -773,7 +783,7 @@ class MoodRepository:
             results = list(self.collection.aggregate(pipeline))
             
             return {
-                r["_id"]: {
+                r["_id"].strftime("%Y-%m-%d"): {
                     "avg_stress": round(r["avg_stress"], 2),
                     "count": r["count"]
                 }
@@ -797,10 +807,15 @@ class MoodRepository:
         self._cache[key] = (data, datetime.utcnow())
     
     def _clear_user_cache(self, user_id: str):
-        """Clear all cache entries for a user"""
+        """
+        Clear all cache entries for a user
+        
+        Also drops cached team reports, which aggregate this user's entries.
+        """
         keys_to_remove = [k for k in self._cache.keys() if user_id in k]
         for key in keys_to_remove:
             del self._cache[key]
+        aggregation_service.invalidate()
     
     def clear_all_cache(self):
         """Clear all cached data"""
@@ -578,26 +578,55 @@ class TeamRepository:
                     "emotion_distribution": {}
                 }
             
-            moods = list(mood_collection.find({
-                "user_id": {"$in": member_ids},
-                "timestamp": {"$gte": last_30d}
-            }))
+            # Per-emotion counts and stress totals, computed server-side
+            # instead of fetching every mood entry
+            pipeline = [
+                {
+                    "$match": {
+                        "user_id": {"$in": member_ids},
+                        "timestamp": {"$gte": last_30d}
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "dominant_emotion": 1,
+                        "stress_score": {"$ifNull": ["$stress_score", 0]}
+                    }
+                },
+                {
+                    "$group": {
+                        "_id": "$dominant_emotion",
+                        "count": {"$sum": 1},
+                        "stress_total": {"$sum": "$stress_score"},
+                        "max_stress": {"$max": "$stress_score"},
+                        "min_stress": {"$min": "$stress_score"}
+                    }
+                }
+            ]
             
-            # Calculate statistics
-            from collections import Counter
+            emotion_distribution = {}
+            entry_count = 0
+            stress_total = 0
+            max_stress = None
+            min_stress = None
             
-            emotions = [m.get("dominant_emotion") for m in moods]
-            stress_scores = [m.get("stress_score", 0) for m in moods]
+            for r in mood_collection.aggregate(pipeline):
+                emotion_distribution[r["_id"]] = r["count"]
+                entry_count += r["count"]
+                stress_total += r["stress_total"]
+                max_stress = r["max_stress"] if max_stress is None else max(max_stress, r["max_stress"])
+                min_stress = r["min_stress"] if min_stress is None else min(min_stress, r["min_stress"])
             
             return {
                 "team_id": team_id,
                 "team_name": team.get("name"),
                 "member_count": len(member_ids),
-                "mood_entries": len(moods),
-                "avg_stress": round(sum(stress_scores) / len(stress_scores), 2) if stress_scores else 0,
-                "max_stress": max(stress_scores) if stress_scores else 0,
-                "min_stress": min(stress_scores) if stress_scores else 0,
-                "emotion_distribution": dict(Counter(emotions)),
+                "mood_entries": entry_count,
+                "avg_stress": round(stress_total / entry_count, 2) if entry_count else 0,
+                "max_stress": max_stress if entry_count else 0,
+                "min_stress": min_stress if entry_count else 0,
+                "emotion_distribution": emotion_distribution,
                 "period": "last_30_days"
             }
             
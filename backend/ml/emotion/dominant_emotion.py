@@ -4,12 +4,14 @@ Production-grade emotion aggregation with temporal analysis and confidence weigh
 """
 import sys
 import os
-from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+from typing import Dict, List, Optional, Any, Tuple, Union
 from collections import Counter, deque
 from datetime import datetime
 import base64
 import numpy as np
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +25,22 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from backend.ml.emotion.emotion_model import emotion_model
+from backend.ml.emotion import _fast
+
+
+# Base stress score (0-10) per emotion
+EMOTION_BASE_STRESS = {
+    'Happy': 1,
+    'Surprise': 3,
+    'Neutral': 4,
+    'Sad': 6,
+    'Fear': 7,
+    'Disgust': 8,
+    'Angry': 8
+}
+
+# Emotions whose stress score scales with prediction confidence
+NEGATIVE_EMOTIONS = frozenset({'Sad', 'Fear', 'Disgust', 'Angry'})
 
 
 class DominantEmotionAnalyzer:
@@ -42,6 +60,16 @@ class DominantEmotionAnalyzer:
         self.smoothing_window = 5
         self._recent_emotions = deque(maxlen=self.smoothing_window)
         
+        # Stress lookup tables indexed by label (batch stress scoring)
+        self._stress_lut = np.array(
+            [EMOTION_BASE_STRESS.get(label, 5) for label in self.model.EMOTION_LABELS],
+            dtype=np.int8
+        )
+        self._negative_mask = np.array(
+            [label in NEGATIVE_EMOTIONS for label in self.model.EMOTION_LABELS],
+            dtype=np.int8
+        )
+        
         # Performance tracking
         self._analysis_count = 0
         
@@ -55,6 +83,30 @@ class DominantEmotionAnalyzer:
         """
         Analyze a frame and detect dominant emotion with enhancements
         
+        Args:
+            frame_data: Frame data containing image information
+            apply_smoothing: Apply temporal smoothing
+        
+        Returns:
+            dict: Analysis results including dominant emotion
+        """
+        result = self._analyze_frame(frame_data, apply_smoothing)
+        if result.get("success"):
+            result["timestamp"] = datetime.utcnow().isoformat()
+        return result
+    
+    async def analyze_frame_async(
+        self,
+        frame_data: Dict[str, Any],
+        apply_smoothing: bool = True
+    ) -> Dict[str, Any]:
+        """
+        analyze_frame for event-loop callers
+        
+        Decoding and preprocessing run in a worker thread; detection goes
+        through the model's batching queue, so frames from concurrent
+        sessions share model invocations.
+        
         Args:
             frame_data: Frame data containing image information
             apply_smoothing: Apply temporal smoothing
@@ -63,58 +115,52 @@ class DominantEmotionAnalyzer:
             dict: Analysis results including dominant emotion
         """
         try:
-            # Extract and validate image
-            image = self._extract_image(frame_data)
+            loop = asyncio.get_running_loop()
             
-            if image is None:
-                return {
-                    "success": False,
-                    "error": "Could not extract image from frame data"
-                }
+            # The face waits in the queue, so it needs its own array
+            prepared = await loop.run_in_executor(None, self._prepare_frame, frame_data, False)
+            if isinstance(prepared, dict):
+                return prepared
             
-            # Preprocess the image
-            processed_image = self.model.preprocess_face(image)
-            
-            if processed_image.size == 0:
-                return {
-                    "success": False,
-                    "error": "Failed to preprocess image"
-                }
-            
-            # Detect emotion
-            result = self.model.detect_emotion(processed_image, return_all_probabilities=True)
+            result = await self.model.detect_async(prepared)
             
             if not result.get("success"):
                 return result
             
-            dominant = result["dominant_emotion"]
-            confidence = result["confidence"]
-            
-            # Apply temporal smoothing if enabled
-            if apply_smoothing and self.temporal_smoothing:
-                dominant, confidence = self._apply_temporal_smoothing(
-                    dominant, 
-                    confidence,
-                    result["emotions"]
-                )
-                result["smoothed"] = True
-                result["dominant_emotion"] = dominant
-                result["confidence"] = confidence
-            
-            # Calculate stress score based on emotion
-            stress_score = self._emotion_to_stress(dominant, confidence)
-            result["stress_score"] = stress_score
-            
-            # Add quality assessment
-            result["analysis_quality"] = self._assess_analysis_quality(result)
-            
-            # Track analysis
-            self._analysis_count += 1
+            if not result.get("mock"):
+                result["all_probabilities"] = result["probs"].tolist()
+            
+            result = self._finish_frame(result, apply_smoothing)
             result["timestamp"] = datetime.utcnow().isoformat()
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ Error analyzing frame: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            }
+    
+    def _analyze_frame(
+        self, 
+        frame_data: Dict[str, Any],
+        apply_smoothing: bool
+    ) -> Dict[str, Any]:
+        """
+        Analyze a frame without stamping wall-clock time
+        
+        Multi-frame callers record a monotonic offset per frame instead and
+        format a single ISO timestamp for the aggregated result.
+        """
+        try:
+            # Extract, preprocess and detect emotion
+            result = self._detect_frame(frame_data, return_all_probabilities=True)
             
-            logger.debug(f"📸 Frame analyzed: {dominant} ({confidence:.3f})")
+            if not result.get("success"):
+                return result
             
-            return result
+            return self._finish_frame(result, apply_smoothing)
             
         except Exception as e:
             logger.error(f"❌ Error analyzing frame: {e}")
@@ -124,6 +170,107 @@ class DominantEmotionAnalyzer:
                 "error_type": type(e).__name__
             }
     
+    def _finish_frame(self, result: Dict[str, Any], apply_smoothing: bool) -> Dict[str, Any]:
+        """
+        Smooth, score and format a successful model result
+        
+        Args:
+            result: Raw model result (label_idx/probs)
+            apply_smoothing: Apply temporal smoothing
+        
+        Returns:
+            dict: Frame analysis
+        """
+        dominant = result["dominant_emotion"]
+        confidence = result["confidence"]
+        
+        # Apply temporal smoothing if enabled
+        if apply_smoothing and self.temporal_smoothing:
+            dominant, confidence = self._apply_temporal_smoothing(
+                dominant, 
+                confidence,
+                result["probs"]
+            )
+            result["smoothed"] = True
+            result["dominant_emotion"] = dominant
+            result["confidence"] = confidence
+            result["label_idx"] = self.model.EMOTION_LABELS.index(dominant)
+        
+        # Calculate stress score based on emotion
+        stress_score = self._emotion_to_stress(dominant, confidence)
+        result["stress_score"] = stress_score
+        
+        # Add quality assessment
+        result["analysis_quality"] = self._assess_analysis_quality(result)
+        
+        # Materialize the label-keyed distribution at the response boundary
+        result["emotions"] = self.model.probabilities_to_dict(result.pop("probs"))
+        
+        # Track analysis
+        self._analysis_count += 1
+        
+        logger.debug(f"📸 Frame analyzed: {dominant} ({confidence:.3f})")
+        
+        return result
+    
+    def _detect_frame(
+        self,
+        frame_data: Dict[str, Any],
+        return_all_probabilities: bool
+    ) -> Dict[str, Any]:
+        """
+        Extract, preprocess and run the model on a single frame
+        
+        Args:
+            frame_data: Frame data containing image information
+            return_all_probabilities: Include the probability list in the result
+        
+        Returns:
+            dict: Raw model result (label_idx/probs) or failure
+        """
+        processed_image = self._prepare_frame(frame_data, reuse_buffer=True)
+        
+        if isinstance(processed_image, dict):
+            return processed_image
+        
+        return self.model.detect_emotion(
+            processed_image,
+            return_all_probabilities=return_all_probabilities
+        )
+    
+    def _prepare_frame(
+        self,
+        frame_data: Dict[str, Any],
+        reuse_buffer: bool
+    ) -> Union[np.ndarray, Dict[str, Any]]:
+        """
+        Extract and preprocess the face tensor for a single frame
+        
+        Args:
+            frame_data: Frame data containing image information
+            reuse_buffer: Preprocess into this thread's scratch tensor
+        
+        Returns:
+            np.ndarray or dict: Model input, or a failure result
+        """
+        image = self._extract_image(frame_data)
+        
+        if image is None:
+            return {
+                "success": False,
+                "error": "Could not extract image from frame data"
+            }
+        
+        processed_image = self.model.preprocess_face(image, reuse_buffer=reuse_buffer)
+        
+        if processed_image.size == 0:
+            return {
+                "success": False,
+                "error": "Failed to preprocess image"
+            }
+        
+        return processed_image
+    
     def analyze_multiple_frames(
         self, 
         frames: List[Dict[str, Any]],
@@ -139,57 +286,125 @@ class DominantEmotionAnalyzer:
         Returns:
             dict: Aggregated analysis results
         """
+        aggregated, _ = self._analyze_multiple_frames(frames, method)
+        return aggregated
+    
+    def _analyze_multiple_frames(
+        self, 
+        frames: List[Dict[str, Any]],
+        method: str
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, np.ndarray]]]:
+        """
+        Analyze and aggregate frames, also returning the per-frame columns
+        
+        Frame results are written into preallocated NumPy columns rather
+        than a list of dicts; every aggregation reads those columns.
+        
+        Args:
+            frames: List of frame data dictionaries
+            method: Aggregation method (confidence_weighted/majority_vote/temporal)
+        
+        Returns:
+            tuple: (aggregated results, frame columns)
+        """
         try:
             if not frames:
                 return {
                     "success": False,
                     "error": "No frames provided"
-                }
+                }, None
             
             logger.info(f"🎬 Analyzing {len(frames)} frames with method: {method}")
             
-            # Analyze each frame
-            results = []
-            for i, frame_data in enumerate(frames):
-                result = self.analyze_frame(frame_data, apply_smoothing=False)
+            # Preallocate one column per per-frame field
+            frame_total = len(frames)
+            labels = np.empty(frame_total, dtype=np.int8)
+            confidences = np.empty(frame_total, dtype=np.float32)
+            offsets_us = np.empty(frame_total, dtype=np.int64)
+            count = 0
+            
+            # Analyze each frame (one wall-clock read, monotonic offsets per frame)
+            started_at = datetime.utcnow()
+            t0 = time.monotonic()
+            for frame_data in frames:
+                result = self._detect_frame(frame_data, return_all_probabilities=False)
                 if result.get("success"):
-                    result["frame_index"] = i
-                    results.append(result)
+                    labels[count] = result["label_idx"]
+                    confidences[count] = result["confidence"]
+                    offsets_us[count] = int((time.monotonic() - t0) * 1e6)
+                    count += 1
             
-            if not results:
+            self._analysis_count += count
+            
+            if count == 0:
                 return {
                     "success": False,
                     "error": "No successful frame analyses"
-                }
+                }, None
+            
+            columns = self._build_frame_columns(
+                labels[:count],
+                confidences[:count],
+                offsets_us[:count]
+            )
             
             # Aggregate based on method
             if method == "confidence_weighted":
-                aggregated = self._confidence_weighted_aggregation(results)
+                aggregated = self._confidence_weighted_aggregation(columns)
             elif method == "majority_vote":
-                aggregated = self._majority_vote_aggregation(results)
+                aggregated = self._majority_vote_aggregation(columns)
             elif method == "temporal":
-                aggregated = self._temporal_aggregation(results)
+                aggregated = self._temporal_aggregation(columns)
             else:
                 logger.warning(f"⚠️ Unknown method {method}, using confidence_weighted")
-                aggregated = self._confidence_weighted_aggregation(results)
+                aggregated = self._confidence_weighted_aggregation(columns)
             
             # Add comprehensive statistics
             aggregated.update({
-                "frame_count": len(frames),
-                "successful_analyses": len(results),
-                "failed_analyses": len(frames) - len(results),
+                "frame_count": frame_total,
+                "successful_analyses": count,
+                "failed_analyses": frame_total - count,
                 "aggregation_method": method,
-                "detailed_results": self._get_detailed_statistics(results)
+                "timestamp": started_at.isoformat(),
+                "detailed_results": self._get_detailed_statistics(columns)
             })
             
-            return aggregated
+            return aggregated, columns
             
         except Exception as e:
             logger.error(f"❌ Error analyzing multiple frames: {e}")
             return {
                 "success": False,
                 "error": str(e)
-            }
+            }, None
+    
+    def _build_frame_columns(
+        self,
+        labels: np.ndarray,
+        confidences: np.ndarray,
+        offsets_us: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Derive stress scores and emotion counts from the raw frame columns
+        
+        Args:
+            labels: Dominant emotion index per frame
+            confidences: Confidence per frame
+            offsets_us: Monotonic offset per frame (microseconds)
+        
+        Returns:
+            dict: Column name to array
+        """
+        stress_scores = np.empty(labels.size, dtype=np.int8)
+        _fast.stress_vec(labels, confidences, self._stress_lut, self._negative_mask, stress_scores)
+        
+        return {
+            "labels": labels,
+            "confidences": confidences,
+            "stress_scores": stress_scores,
+            "offsets_us": offsets_us,
+            "emotion_counts": np.bincount(labels, minlength=len(self.model.EMOTION_LABELS))
+        }
     
     def analyze_session(
         self,
@@ -216,19 +431,25 @@ class DominantEmotionAnalyzer:
             logger.info(f"📊 Analyzing session with {len(frames)} frames")
             
             # Analyze all frames
-            base_result = self.analyze_multiple_frames(frames, method="confidence_weighted")
+            base_result, columns = self._analyze_multiple_frames(
+                frames, method="confidence_weighted"
+            )
             
             if not base_result.get("success"):
                 return base_result
             
+            # Shared emotion distribution for the session-level helpers
+            emotion_counts = columns["emotion_counts"]
+            emotion_probabilities = emotion_counts / emotion_counts.sum()
+            
             # Add session-specific analysis
             session_analysis = {
                 **base_result,
                 "session_analysis": {
-                    "emotion_transitions": self._analyze_emotion_transitions(frames),
-                    "stability_score": self._calculate_stability_score(base_result.get("detailed_results", {})),
-                    "stress_progression": self._analyze_stress_progression(frames),
-                    "peak_emotions": self._identify_peak_emotions(base_result.get("detailed_results", {}))
+                    "emotion_transitions": self._analyze_emotion_transitions(columns["labels"]),
+                    "stability_score": self._calculate_stability_score(emotion_probabilities),
+                    "stress_progression": self._analyze_stress_progression(columns["stress_scores"]),
+                    "peak_emotions": self._identify_peak_emotions(emotion_counts, emotion_probabilities)
                 }
             }
             
@@ -261,15 +482,11 @@ class DominantEmotionAnalyzer:
             # Check if base64 encoded
             if "frame_base64" in frame_data and frame_data["frame_base64"]:
                 image_data = base64.b64decode(frame_data["frame_base64"])
-                nparr = np.frombuffer(image_data, np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                return image
+                return self._decode_image(image_data)
             
             # Check if raw image bytes
             if "image_bytes" in frame_data and frame_data["image_bytes"]:
-                nparr = np.frombuffer(frame_data["image_bytes"], np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                return image
+                return self._decode_image(frame_data["image_bytes"])
             
             # Check if already a numpy array
             if "image" in frame_data and isinstance(frame_data["image"], np.ndarray):
@@ -288,6 +505,78 @@ class DominantEmotionAnalyzer:
             logger.error(f"❌ Error extracting image: {e}")
             return None
     
+    def _decode_image(self, image_data: bytes) -> Optional[np.ndarray]:
+        """
+        Decode encoded image bytes, downscaling JPEGs during decode
+        
+        libjpeg can produce 1/2, 1/4 or 1/8 scale output straight from the
+        IDCT, so large webcam frames are decoded at the smallest scale that
+        still leaves 1.5x the model input resolution for resizing.
+        
+        Args:
+            image_data: Encoded image bytes
+        
+        Returns:
+            np.ndarray: BGR image array or None
+        """
+        import cv2
+        
+        flag = cv2.IMREAD_COLOR
+        size = self._get_jpeg_size(image_data)
+        
+        if size is not None:
+            min_side = int(max(self.model.target_size) * 1.5)
+            reduced_flags = (
+                (8, cv2.IMREAD_REDUCED_COLOR_8),
+                (4, cv2.IMREAD_REDUCED_COLOR_4),
+                (2, cv2.IMREAD_REDUCED_COLOR_2)
+            )
+            for factor, reduced_flag in reduced_flags:
+                if min(size) // factor >= min_side:
+                    flag = reduced_flag
+                    break
+        
+        nparr = np.frombuffer(image_data, np.uint8)
+        return cv2.imdecode(nparr, flag)
+    
+    def _get_jpeg_size(self, image_data: bytes) -> Optional[Tuple[int, int]]:
+        """
+        Read (height, width) from a JPEG frame header without decoding
+        
+        Args:
+            image_data: Encoded image bytes
+        
+        Returns:
+            tuple: (height, width), or None if not a parsable JPEG
+        """
+        if image_data[:2] != b"\xff\xd8":
+            return None
+        
+        i = 2
+        n = len(image_data)
+        while i + 9 < n:
+            if image_data[i] != 0xFF:
+                return None
+            marker = image_data[i + 1]
+            
+            # Fill bytes and standalone markers carry no length field
+            if marker == 0xFF:
+                i += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                i += 2
+                continue
+            
+            # Start-of-frame markers (excluding DHT/JPG/DAC) hold the dimensions
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height = int.from_bytes(image_data[i + 5:i + 7], "big")
+                width = int.from_bytes(image_data[i + 7:i + 9], "big")
+                return height, width
+            
+            i += 2 + int.from_bytes(image_data[i + 2:i + 4], "big")
+        
+        return None
+    
     def _emotion_to_stress(self, emotion: str, confidence: float) -> int:
         """
         Convert emotion to stress score with confidence adjustment
@@ -299,23 +588,12 @@ class DominantEmotionAnalyzer:
         Returns:
             int: Stress score (0-10)
         """
-        # Base stress mapping
-        stress_mapping = {
-            'Happy': 1,
-            'Surprise': 3,
-            'Neutral': 4,
-            'Sad': 6,
-            'Fear': 7,
-            'Disgust': 8,
-            'Angry': 8
-        }
-        
-        base_stress = stress_mapping.get(emotion, 5)
+        base_stress = EMOTION_BASE_STRESS.get(emotion, 5)
         
         # Adjust based on confidence
         # High confidence in negative emotions → higher stress
         # Low confidence in negative emotions → lower adjustment
-        if emotion in ['Sad', 'Fear', 'Disgust', 'Angry']:
+        if emotion in NEGATIVE_EMOTIONS:
             adjustment = (confidence - 0.5) * 2  # Range: -1 to +1
             adjusted_stress = base_stress + adjustment
         else:
@@ -328,7 +606,7 @@ class DominantEmotionAnalyzer:
         self,
         current_emotion: str,
         current_confidence: float,
-        all_emotions: Dict[str, float]
+        all_emotions: np.ndarray
     ) -> Tuple[str, float]:
         """
         Apply temporal smoothing to reduce jitter
@@ -336,7 +614,7 @@ class DominantEmotionAnalyzer:
         Args:
             current_emotion: Current frame's emotion
             current_confidence: Current frame's confidence
-            all_emotions: All emotion probabilities
+            all_emotions: All emotion probabilities (EMOTION_LABELS order)
         
         Returns:
             tuple: (smoothed_emotion, smoothed_confidence)
@@ -352,8 +630,8 @@ class DominantEmotionAnalyzer:
             if len(self._recent_emotions) < 2:
                 return current_emotion, current_confidence
             
-            # Aggregate recent emotions with decay
-            weighted_emotions = Counter()
+            # Aggregate recent probability vectors with decay
+            running_probs = np.zeros(len(all_emotions), dtype=np.float32)
             total_weight = 0
             
             for i, entry in enumerate(self._recent_emotions):
@@ -361,13 +639,14 @@ class DominantEmotionAnalyzer:
                 weight = (i + 1) / len(self._recent_emotions)
                 weight *= entry["confidence"]  # Weight by confidence
                 
-                weighted_emotions[entry["emotion"]] += weight
+                _fast.smoothing_update(running_probs, entry["all_emotions"], weight)
                 total_weight += weight
             
             # Get smoothed dominant emotion
             if total_weight > 0:
-                smoothed_emotion = weighted_emotions.most_common(1)[0][0]
-                smoothed_confidence = weighted_emotions[smoothed_emotion] / total_weight
+                smoothed_idx = int(np.argmax(running_probs))
+                smoothed_emotion = self.model.EMOTION_LABELS[smoothed_idx]
+                smoothed_confidence = float(running_probs[smoothed_idx]) / total_weight
                 return smoothed_emotion, min(1.0, smoothed_confidence)
             
             return current_emotion, current_confidence
@@ -376,171 +655,157 @@ class DominantEmotionAnalyzer:
             logger.error(f"Error in temporal smoothing: {e}")
             return current_emotion, current_confidence
     
-    def _confidence_weighted_aggregation(self, results: List[Dict]) -> Dict[str, Any]:
+    def _confidence_weighted_aggregation(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Aggregate using confidence-weighted voting"""
         try:
-            emotion_scores = Counter()
-            confidences = []
-            stress_scores = []
+            emotion_counts = columns["emotion_counts"]
             
-            for result in results:
-                emotion = result.get("dominant_emotion")
-                confidence = result.get("confidence", 0)
-                
-                # Weight by confidence
-                emotion_scores[emotion] += confidence
-                confidences.append(confidence)
-                stress_scores.append(result.get("stress_score", 0))
+            # Weight each vote by confidence
+            emotion_scores = np.bincount(
+                columns["labels"],
+                weights=columns["confidences"],
+                minlength=emotion_counts.size
+            )
+            total_weight = emotion_scores.sum()
             
             # Get weighted dominant emotion
-            dominant = emotion_scores.most_common(1)[0][0]
-            total_weight = sum(emotion_scores.values())
-            weighted_confidence = emotion_scores[dominant] / total_weight if total_weight > 0 else 0
-            
-            # Calculate average stress
-            avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else 0
+            dominant_idx = int(np.argmax(emotion_scores if total_weight > 0 else emotion_counts))
+            weighted_confidence = emotion_scores[dominant_idx] / total_weight if total_weight > 0 else 0
             
             return {
                 "success": True,
-                "dominant_emotion": dominant,
-                "confidence": round(weighted_confidence, 3),
-                "average_stress_score": round(avg_stress, 2),
-                "emotion_distribution": dict(emotion_scores)
+                "dominant_emotion": self.model.EMOTION_LABELS[dominant_idx],
+                "confidence": round(float(weighted_confidence), 3),
+                "average_stress_score": round(float(columns["stress_scores"].mean()), 2),
+                "emotion_distribution": {
+                    self.model.EMOTION_LABELS[i]: float(emotion_scores[i])
+                    for i in np.flatnonzero(emotion_counts)
+                }
             }
             
         except Exception as e:
             logger.error(f"Error in confidence weighted aggregation: {e}")
             return {"success": False, "error": str(e)}
     
-    def _majority_vote_aggregation(self, results: List[Dict]) -> Dict[str, Any]:
+    def _majority_vote_aggregation(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Aggregate using simple majority voting"""
         try:
-            emotions = [r.get("dominant_emotion") for r in results]
-            confidences = [r.get("confidence", 0) for r in results]
-            stress_scores = [r.get("stress_score", 0) for r in results]
-            
-            emotion_counter = Counter(emotions)
-            dominant = emotion_counter.most_common(1)[0][0]
+            emotion_counts = columns["emotion_counts"]
+            dominant_idx = int(np.argmax(emotion_counts))
             
             # Average confidence for dominant emotion
-            dominant_confidences = [
-                r.get("confidence", 0) for r in results 
-                if r.get("dominant_emotion") == dominant
-            ]
-            avg_confidence = sum(dominant_confidences) / len(dominant_confidences)
+            avg_confidence = columns["confidences"][columns["labels"] == dominant_idx].mean()
             
             return {
                 "success": True,
-                "dominant_emotion": dominant,
-                "confidence": round(avg_confidence, 3),
-                "average_stress_score": round(sum(stress_scores) / len(stress_scores), 2),
-                "emotion_distribution": dict(emotion_counter)
+                "dominant_emotion": self.model.EMOTION_LABELS[dominant_idx],
+                "confidence": round(float(avg_confidence), 3),
+                "average_stress_score": round(float(columns["stress_scores"].mean()), 2),
+                "emotion_distribution": {
+                    self.model.EMOTION_LABELS[i]: int(emotion_counts[i])
+                    for i in np.flatnonzero(emotion_counts)
+                }
             }
             
         except Exception as e:
             logger.error(f"Error in majority vote aggregation: {e}")
             return {"success": False, "error": str(e)}
     
-    def _temporal_aggregation(self, results: List[Dict]) -> Dict[str, Any]:
+    def _temporal_aggregation(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Aggregate with temporal weighting (recent frames matter more)"""
         try:
-            weighted_emotions = Counter()
-            weighted_stress = 0
-            total_weight = 0
+            emotion_counts = columns["emotion_counts"]
+            frame_total = columns["labels"].size
             
-            for i, result in enumerate(results):
-                # Linear temporal weight (more recent = higher weight)
-                weight = (i + 1) / len(results)
-                weight *= result.get("confidence", 0)  # Also weight by confidence
-                
-                emotion = result.get("dominant_emotion")
-                weighted_emotions[emotion] += weight
-                weighted_stress += result.get("stress_score", 0) * weight
-                total_weight += weight
+            # Linear temporal weight (more recent = higher weight), also weighted by confidence
+            weights = np.arange(1, frame_total + 1, dtype=np.float32) / frame_total
+            weights *= columns["confidences"]
             
-            dominant = weighted_emotions.most_common(1)[0][0]
-            weighted_confidence = weighted_emotions[dominant] / total_weight if total_weight > 0 else 0
-            avg_stress = weighted_stress / total_weight if total_weight > 0 else 0
+            weighted_emotions = np.bincount(
+                columns["labels"],
+                weights=weights,
+                minlength=emotion_counts.size
+            )
+            total_weight = weights.sum()
+            
+            dominant_idx = int(np.argmax(weighted_emotions if total_weight > 0 else emotion_counts))
+            weighted_confidence = weighted_emotions[dominant_idx] / total_weight if total_weight > 0 else 0
+            avg_stress = (columns["stress_scores"] * weights).sum() / total_weight if total_weight > 0 else 0
             
             return {
                 "success": True,
-                "dominant_emotion": dominant,
-                "confidence": round(weighted_confidence, 3),
-                "average_stress_score": round(avg_stress, 2),
-                "emotion_distribution": dict(weighted_emotions)
+                "dominant_emotion": self.model.EMOTION_LABELS[dominant_idx],
+                "confidence": round(float(weighted_confidence), 3),
+                "average_stress_score": round(float(avg_stress), 2),
+                "emotion_distribution": {
+                    self.model.EMOTION_LABELS[i]: float(weighted_emotions[i])
+                    for i in np.flatnonzero(emotion_counts)
+                }
             }
             
         except Exception as e:
             logger.error(f"Error in temporal aggregation: {e}")
             return {"success": False, "error": str(e)}
     
-    def _get_detailed_statistics(self, results: List[Dict]) -> Dict[str, Any]:
-        """Get detailed statistics from analysis results"""
+    def _get_detailed_statistics(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Get detailed statistics from the frame columns"""
         try:
-            emotions = [r.get("dominant_emotion") for r in results]
-            confidences = [r.get("confidence", 0) for r in results]
-            stress_scores = [r.get("stress_score", 0) for r in results]
+            emotion_counts = columns["emotion_counts"]
+            confidences = columns["confidences"]
+            stress_scores = columns["stress_scores"]
             
             return {
-                "emotion_counts": dict(Counter(emotions)),
+                "emotion_counts": {
+                    self.model.EMOTION_LABELS[i]: int(emotion_counts[i])
+                    for i in np.flatnonzero(emotion_counts)
+                },
                 "confidence_stats": {
-                    "mean": round(np.mean(confidences), 3),
-                    "std": round(np.std(confidences), 3),
-                    "min": round(np.min(confidences), 3),
-                    "max": round(np.max(confidences), 3)
+                    "mean": round(float(confidences.mean()), 3),
+                    "std": round(float(confidences.std()), 3),
+                    "min": round(float(confidences.min()), 3),
+                    "max": round(float(confidences.max()), 3)
                 },
                 "stress_stats": {
-                    "mean": round(np.mean(stress_scores), 2),
-                    "std": round(np.std(stress_scores), 2),
-                    "min": int(np.min(stress_scores)),
-                    "max": int(np.max(stress_scores))
+                    "mean": round(float(stress_scores.mean()), 2),
+                    "std": round(float(stress_scores.std()), 2),
+                    "min": int(stress_scores.min()),
+                    "max": int(stress_scores.max())
                 }
             }
         except Exception:
             return {}
     
-    def _analyze_emotion_transitions(self, frames: List[Dict]) -> Dict[str, Any]:
+    def _analyze_emotion_transitions(self, labels: np.ndarray) -> Dict[str, Any]:
         """Analyze how emotions transition throughout session"""
         try:
-            transitions = []
-            prev_emotion = None
-            
-            for frame in frames:
-                result = self.analyze_frame(frame, apply_smoothing=False)
-                if result.get("success"):
-                    current_emotion = result.get("dominant_emotion")
-                    if prev_emotion and prev_emotion != current_emotion:
-                        transitions.append({
-                            "from": prev_emotion,
-                            "to": current_emotion
-                        })
-                    prev_emotion = current_emotion
+            # Frames where the dominant emotion differs from the previous frame
+            changes = np.flatnonzero(labels[1:] != labels[:-1])
             
             # Count transition types
             transition_counts = Counter(
-                f"{t['from']} → {t['to']}" for t in transitions
+                zip(labels[changes].tolist(), labels[changes + 1].tolist())
             )
             
             return {
-                "total_transitions": len(transitions),
+                "total_transitions": int(changes.size),
                 "unique_transitions": len(transition_counts),
-                "most_common_transitions": dict(transition_counts.most_common(5))
+                "most_common_transitions": {
+                    f"{self.model.EMOTION_LABELS[src]} → {self.model.EMOTION_LABELS[dst]}": count
+                    for (src, dst), count in transition_counts.most_common(5)
+                }
             }
             
         except Exception:
             return {}
     
-    def _calculate_stability_score(self, detailed_results: Dict) -> float:
+    def _calculate_stability_score(self, probabilities: np.ndarray) -> float:
         """Calculate emotional stability score (0-1, higher = more stable)"""
         try:
-            emotion_counts = detailed_results.get("emotion_counts", {})
-            if not emotion_counts:
+            if probabilities.size == 0:
                 return 0.5
             
-            total = sum(emotion_counts.values())
             # Calculate entropy
-            probabilities = [count / total for count in emotion_counts.values()]
-            entropy = -sum(p * np.log(p + 1e-10) for p in probabilities)
+            entropy = _fast.entropy(probabilities.astype(np.float32))
             
             # Normalize (max entropy for 7 emotions = log(7))
             max_entropy = np.log(7)
@@ -551,53 +816,56 @@ class DominantEmotionAnalyzer:
         except Exception:
             return 0.5
     
-    def _analyze_stress_progression(self, frames: List[Dict]) -> Dict[str, Any]:
+    def _analyze_stress_progression(self, stress_scores: np.ndarray) -> Dict[str, Any]:
         """Analyze stress progression throughout session"""
         try:
-            stress_timeline = []
-            
-            for frame in frames:
-                result = self.analyze_frame(frame, apply_smoothing=False)
-                if result.get("success"):
-                    stress_timeline.append(result.get("stress_score", 0))
-            
-            if not stress_timeline:
+            if stress_scores.size == 0:
                 return {}
             
-            # Calculate trend
-            x = np.arange(len(stress_timeline))
-            coeffs = np.polyfit(x, stress_timeline, 1)
-            trend = "increasing" if coeffs[0] > 0.1 else "decreasing" if coeffs[0] < -0.1 else "stable"
+            # Calculate trend (closed-form least-squares slope, no LAPACK solve)
+            n = stress_scores.size
+            if n > 1:
+                x = np.arange(n, dtype=np.float32)
+                y = stress_scores.astype(np.float32)
+                x_centered = x - x.mean()
+                slope = float((x_centered * (y - y.mean())).sum() / (x_centered ** 2).sum())
+            else:
+                slope = 0.0
+            trend = "increasing" if slope > 0.1 else "decreasing" if slope < -0.1 else "stable"
             
             return {
-                "initial_stress": stress_timeline[0],
-                "final_stress": stress_timeline[-1],
-                "peak_stress": max(stress_timeline),
-                "min_stress": min(stress_timeline),
+                "initial_stress": int(stress_scores[0]),
+                "final_stress": int(stress_scores[-1]),
+                "peak_stress": int(stress_scores.max()),
+                "min_stress": int(stress_scores.min()),
                 "trend": trend,
-                "trend_coefficient": round(coeffs[0], 3)
+                "trend_coefficient": round(slope, 3)
             }
             
         except Exception:
             return {}
     
-    def _identify_peak_emotions(self, detailed_results: Dict) -> List[Dict]:
+    def _identify_peak_emotions(
+        self,
+        emotion_counts: np.ndarray,
+        probabilities: np.ndarray
+    ) -> List[Dict]:
         """Identify peak emotions during session"""
         try:
-            emotion_counts = detailed_results.get("emotion_counts", {})
-            total = sum(emotion_counts.values())
-            
-            peaks = []
-            for emotion, count in emotion_counts.items():
-                percentage = (count / total * 100) if total > 0 else 0
-                if percentage >= 20:  # Consider emotions that appear in >20% of frames
-                    peaks.append({
-                        "emotion": emotion,
-                        "count": count,
-                        "percentage": round(percentage, 1)
-                    })
-            
-            return sorted(peaks, key=lambda x: x["percentage"], reverse=True)
+            percentages = probabilities * 100
+            
+            # Consider emotions that appear in >20% of frames, highest first
+            peak_idx = np.flatnonzero(percentages >= 20)
+            peak_idx = peak_idx[np.argsort(-percentages[peak_idx], kind="stable")]
+            
+            return [
+                {
+                    "emotion": self.model.EMOTION_LABELS[i],
+                    "count": int(emotion_counts[i]),
+                    "percentage": round(float(percentages[i]), 1)
+                }
+                for i in peak_idx
+            ]
             
         except Exception:
             return []
@@ -4,11 +4,14 @@ Production-grade CNN model wrapper with optimized preprocessing and inference
 """
 import sys
 import os
+import asyncio
 from typing import Dict, List, Optional, Any, Tuple
 import numpy as np
 from pathlib import Path
 import logging
+import threading
 import time
+from collections import deque
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +27,38 @@ if parent_dir not in sys.path:
 from backend.config import EMOTION_LABELS
 
 
+# Model artifacts (the .tflite files and SavedModel are produced offline by convert_model.py)
+MODELS_DIR = Path(__file__).resolve().parent.parent.parent.parent / "models"
+KERAS_MODEL_FILE = "fer2013_mini_XCEPTION.102-0.66.hdf5"
+TFLITE_INT8_MODEL_FILE = "fer2013_mini_XCEPTION_int8.tflite"
+TFLITE_FP16_MODEL_FILE = "fer2013_mini_XCEPTION_fp16.tflite"
+GPU_DELEGATE_LIBRARY = "libtensorflowlite_gpu_delegate.so"
+SAVED_MODEL_DIR = "fer2013_mini_XCEPTION_savedmodel"  # XLA export of the Keras model
+
+# Largest per-class probability gap tolerated between the int8 and fp16 models
+INT8_MAX_PROBABILITY_DRIFT = 0.15
+
+# Pixel value -> [0, 1] table used when equalization is skipped
+_IDENTITY_LUT = np.arange(256, dtype=np.float32) * np.float32(1.0 / 255.0)
+_PIXEL_VALUES = np.arange(256, dtype=np.float64)
+
+
+def _quantize_input(input_details: Dict[str, Any], batch: np.ndarray) -> np.ndarray:
+    """Map a float32 batch into an int8 input tensor's quantized domain"""
+    if input_details["dtype"] != np.int8:
+        return batch
+    scale, zero_point = input_details["quantization"]
+    return np.clip(np.rint(batch / scale + zero_point), -128, 127).astype(np.int8)
+
+
+def _dequantize_output(output_details: Dict[str, Any], predictions: np.ndarray) -> np.ndarray:
+    """Map an int8 output tensor back to float32 probabilities"""
+    if output_details["dtype"] != np.int8:
+        return predictions
+    scale, zero_point = output_details["quantization"]
+    return (predictions.astype(np.float32) - zero_point) * scale
+
+
 class EmotionModel:
     """
     Enhanced wrapper for FER2013 Mini-XCEPTION emotion detection model
@@ -31,27 +66,90 @@ class EmotionModel:
     
     def __init__(self, model_path: str = None):
         self.model = None
-        self.loaded = False
+        self._loaded = False
         self.model_path = model_path
+        self.backend = None
+        self._model_arch = None  # Architecture summary captured at load time
+        
+        # Inference threads, capped so the model doesn't oversubscribe
+        # cores shared with the API workers and other services
+        self.num_threads = int(os.getenv(
+            "AMDOX_TFLITE_THREADS", str(min(4, os.cpu_count() or 1))
+        ))
+        
+        # TFLite interpreter state (interpreters are not thread-safe)
+        self._interpreter = None
+        self._input_details = None
+        self._output_details = None
+        self._interpreter_batch_size = 1
+        self._interpreter_lock = threading.Lock()
+        
+        # Traced Keras graphs for single-image and batched inference
+        self._infer1 = None
+        self._infer_batch = None
+        self._to_tensor = None
+        self._saved_model = None
+        
+        # Per-thread preprocessing scratch tensors and face detector
+        self._scratch = threading.local()
+        
         self.EMOTION_LABELS = EMOTION_LABELS
         
         # Model configuration
         self.input_shape = (64, 64, 1)  # Grayscale 64x64
         self.target_size = (64, 64)
         self.num_classes = len(EMOTION_LABELS)
+        self._log_num_classes = float(np.log(self.num_classes))  # Max entropy
         
         # Performance tracking
-        self._inference_times = []
+        self._inference_times = deque(maxlen=2048)  # Recent inferences only
         self._prediction_count = 0
         
         # Confidence calibration
         self._confidence_threshold = 0.3  # Minimum confidence
         self._use_calibration = True
         
+        # Faces with this much contrast (grayscale std) skip equalization
+        self._equalize_std_threshold = 40.0
+        
+        # Dynamic batching for concurrent async callers
+        self.max_batch = 32
+        self.max_wait_ms = 10
+        self.max_queue = 8 * self.max_batch  # Callers wait for room beyond this
+        self._batch_queue = None
+        self._batch_loop = None
+        self._batch_worker_task = None
+        
+        # Model is loaded on first use so importing the module stays cheap
+        self._load_attempted = False
+        self._load_lock = threading.Lock()
+        
         logger.info("🧠 Emotion Model initialized")
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether a real model is loaded (False until first used)"""
+        return self._loaded
+    
+    def ensure_loaded(self) -> bool:
+        """
+        Load the model now if no load has been attempted yet
+        
+        Returns:
+            bool: Whether a real model is available
+        """
+        self._ensure_loaded()
+        return self._loaded
+    
+    def _ensure_loaded(self):
+        """Load the model exactly once, on the first thread that needs it"""
+        if self._load_attempted:
+            return
         
-        # Attempt to load model
-        self._load_model()
+        with self._load_lock:
+            if not self._load_attempted:
+                self._load_model()
+                self._load_attempted = True
     
     def _load_model(self):
         """Load the emotion detection model with error handling"""
@@ -64,16 +162,33 @@ class EmotionModel:
             os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
             tf.get_logger().setLevel('ERROR')
             
+            # Pin TF op parallelism (only possible before the runtime starts)
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(self.num_threads)
+                tf.config.threading.set_inter_op_parallelism_threads(1)
+            except RuntimeError:
+                logger.warning("⚠️ TensorFlow runtime already initialized - thread counts unchanged")
+            
             # Determine model path
             if self.model_path is None:
-                base_dir = Path(__file__).resolve().parent.parent.parent.parent
-                self.model_path = str(base_dir / "models" / "fer2013_mini_XCEPTION.102-0.66.hdf5")
+                self.model_path = str(MODELS_DIR / KERAS_MODEL_FILE)
+            
+            # Prefer converted TFLite models (int8, then fp16) when present
+            if self._load_tflite_model(tf):
+                self._warmup_model()
+                return
+            
+            # Then the XLA-compiled SavedModel exported by convert_model.py
+            saved_model_dir = os.path.join(os.path.dirname(self.model_path), SAVED_MODEL_DIR)
+            if self._load_saved_model(tf, saved_model_dir):
+                self._warmup_model()
+                return
             
             # Check if model file exists
             if not os.path.exists(self.model_path):
                 logger.warning(f"⚠️ Model file not found at {self.model_path}")
                 logger.info("💡 Running in mock mode without actual emotion detection")
-                self.loaded = False
+                self._loaded = False
                 return
             
             logger.info(f"📥 Loading emotion model from: {self.model_path}")
@@ -92,9 +207,20 @@ class EmotionModel:
                 metrics=['accuracy']
             )
             
+            # Trace graphs once so inference skips the Keras predict loop
+            self._build_inference_functions(tf)
+            
+            self._model_arch = {
+                "input_shape": list(self.model.input.shape),
+                "output_shape": list(self.model.output.shape),
+                "total_params": int(self.model.count_params()),
+                "layers": len(self.model.layers)
+            }
+            
             load_time = time.time() - start_time
             
-            self.loaded = True
+            self._loaded = True
+            self.backend = "keras"
             logger.info(f"✅ Emotion model loaded successfully in {load_time:.2f}s")
             logger.info(f"   Model: FER2013 Mini-XCEPTION")
             logger.info(f"   Input shape: {self.input_shape}")
@@ -107,23 +233,281 @@ class EmotionModel:
         except ImportError as e:
             logger.error(f"❌ TensorFlow/Keras not available: {e}")
             logger.info("💡 Install with: pip install tensorflow")
-            self.loaded = False
+            self._loaded = False
         except Exception as e:
             logger.error(f"❌ Error loading emotion model: {e}")
             logger.info("💡 Running in mock mode without actual emotion detection")
-            self.loaded = False
+            self._loaded = False
+    
+    def _build_inference_functions(self, tf):
+        """
+        Build XLA-compiled batch-1 and variable-batch inference functions
+        
+        convert_model.py exports the same functions as a SavedModel, which
+        lets starts skip loading and tracing the Keras model.
+        
+        Args:
+            tf: Imported tensorflow module
+        """
+        model = self.model
+        module = tf.Module()
+        module.model = model
+        module.infer1 = tf.function(
+            lambda x: model(x, training=False),
+            jit_compile=True,
+            input_signature=[tf.TensorSpec([1, *self.input_shape], tf.float32)]
+        )
+        module.infer_batch = tf.function(
+            lambda x: model(x, training=False),
+            jit_compile=True,
+            input_signature=[tf.TensorSpec([None, *self.input_shape], tf.float32)]
+        )
+        
+        self._infer1 = module.infer1.get_concrete_function()
+        self._infer_batch = module.infer_batch.get_concrete_function()
+        self._to_tensor = tf.constant
+    
+    def _load_saved_model(self, tf, saved_model_dir: str) -> bool:
+        """
+        Load the exported SavedModel if it is newer than the Keras model
+        
+        Args:
+            tf: Imported tensorflow module
+            saved_model_dir: SavedModel directory
+        
+        Returns:
+            bool: True if the SavedModel functions are ready
+        """
+        if not os.path.isdir(saved_model_dir):
+            return False
+        if (os.path.exists(self.model_path)
+                and os.path.getmtime(saved_model_dir) < os.path.getmtime(self.model_path)):
+            logger.info("💡 SavedModel is older than the Keras model - ignoring it (re-run convert_model.py)")
+            return False
+        
+        try:
+            logger.info(f"📥 Loading SavedModel from: {saved_model_dir}")
+            start_time = time.time()
+            
+            self._saved_model = tf.saved_model.load(saved_model_dir)
+            self._infer1 = self._saved_model.infer1
+            self._infer_batch = self._saved_model.infer_batch
+            self._to_tensor = tf.constant
+            self._model_arch = {
+                "input_shape": [None, *self.input_shape],
+                "output_shape": [None, self.num_classes],
+                "format": "saved_model"
+            }
+            
+            load_time = time.time() - start_time
+            
+            self._loaded = True
+            self.backend = "saved_model"
+            logger.info(f"✅ SavedModel loaded successfully in {load_time:.2f}s")
+            
+            return True
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load SavedModel, falling back to Keras: {e}")
+            self._saved_model = None
+            return False
+    
+    def _load_tflite_model(self, tf) -> bool:
+        """
+        Load the converted TFLite model, preferring int8 over fp16
+        
+        The int8 model is only used when it agrees with the fp16 model on
+        probe inputs, guarding against calibration drift.
+        
+        Args:
+            tf: Imported tensorflow module
+        
+        Returns:
+            bool: True if an interpreter is ready
+        """
+        if self.model_path.endswith(".tflite"):
+            interpreter = self._create_interpreter(tf, self.model_path, use_gpu=True)
+            if interpreter is None:
+                return False
+            is_int8 = interpreter.get_input_details()[0]["dtype"] == np.int8
+            self._activate_interpreter(interpreter, "tflite_int8" if is_int8 else "tflite_fp16")
+            return True
+        
+        model_dir = os.path.dirname(self.model_path)
+        int8_path = os.path.join(model_dir, TFLITE_INT8_MODEL_FILE)
+        fp16_path = os.path.join(model_dir, TFLITE_FP16_MODEL_FILE)
+        
+        int8_interpreter = None
+        fp16_interpreter = None
+        if os.path.exists(int8_path):
+            int8_interpreter = self._create_interpreter(tf, int8_path)
+        if os.path.exists(fp16_path):
+            fp16_interpreter = self._create_interpreter(tf, fp16_path, use_gpu=True)
+        
+        if int8_interpreter is not None and fp16_interpreter is not None:
+            drift = self._measure_int8_drift(int8_interpreter, fp16_interpreter)
+            if drift > INT8_MAX_PROBABILITY_DRIFT:
+                logger.warning(
+                    f"⚠️ int8 model drifts from fp16 by {drift:.3f} - using fp16 model"
+                )
+                int8_interpreter = None
+        
+        if int8_interpreter is not None:
+            self._activate_interpreter(int8_interpreter, "tflite_int8")
+        elif fp16_interpreter is not None:
+            self._activate_interpreter(fp16_interpreter, "tflite_fp16")
+        else:
+            return False
+        
+        return True
+    
+    def _create_interpreter(self, tf, tflite_path: str, use_gpu: bool = False):
+        """
+        Create a TFLite interpreter with tensors allocated
+        
+        XNNPACK is applied by the default op resolver; the GPU delegate is
+        attached for float models when its shared library is installed.
+        
+        Args:
+            tf: Imported tensorflow module
+            tflite_path: Path to the .tflite model
+            use_gpu: Try to attach the GPU delegate
+        
+        Returns:
+            Interpreter or None if the model could not be loaded
+        """
+        try:
+            logger.info(f"📥 Loading TFLite emotion model from: {tflite_path}")
+            start_time = time.time()
+            
+            delegates = []
+            if use_gpu:
+                try:
+                    delegates.append(tf.lite.experimental.load_delegate(GPU_DELEGATE_LIBRARY))
+                    logger.info("🚀 TFLite GPU delegate attached")
+                except (ValueError, OSError):
+                    pass
+            
+            interpreter = tf.lite.Interpreter(
+                model_path=tflite_path,
+                num_threads=self.num_threads,
+                experimental_delegates=delegates or None
+            )
+            interpreter.allocate_tensors()
+            
+            load_time = time.time() - start_time
+            logger.info(f"✅ TFLite model loaded in {load_time:.2f}s")
+            
+            return interpreter
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load TFLite model {tflite_path}: {e}")
+            return None
+    
+    def _activate_interpreter(self, interpreter, backend: str):
+        """Use the given interpreter for inference"""
+        self._interpreter = interpreter
+        self._input_details = interpreter.get_input_details()[0]
+        self._output_details = interpreter.get_output_details()[0]
+        self._interpreter_batch_size = int(self._input_details["shape"][0])
+        self._model_arch = {
+            "input_shape": self._input_details["shape"].tolist(),
+            "output_shape": self._output_details["shape"].tolist(),
+            "input_dtype": self._input_details["dtype"].__name__,
+            "tensors": len(interpreter.get_tensor_details())
+        }
+        
+        self._loaded = True
+        self.backend = backend
+        logger.info(f"✅ Emotion model ready ({backend})")
+        logger.info(f"   Input: {self._input_details['dtype'].__name__} {list(self._input_details['shape'])}")
+        logger.info(f"   Classes: {self.num_classes}")
+    
+    def _measure_int8_drift(self, int8_interpreter, fp16_interpreter) -> float:
+        """
+        Largest probability difference between int8 and fp16 models on probe inputs
+        
+        Args:
+            int8_interpreter: Interpreter for the int8 model
+            fp16_interpreter: Interpreter for the fp16 reference
+        
+        Returns:
+            float: Maximum absolute per-class difference (inf on failure)
+        """
+        try:
+            rng = np.random.default_rng(0)
+            gradient = np.linspace(0.0, 1.0, self.target_size[0], dtype=np.float32)
+            probes = [
+                np.full(self.input_shape, 0.5, dtype=np.float32),
+                np.tile(gradient[:, None, None], (1, self.target_size[1], 1)),
+                np.tile(gradient[None, :, None], (self.target_size[0], 1, 1)),
+                rng.random(self.input_shape, dtype=np.float32),
+            ]
+            
+            max_drift = 0.0
+            for probe in probes:
+                outputs = []
+                for interpreter in (int8_interpreter, fp16_interpreter):
+                    input_details = interpreter.get_input_details()[0]
+                    output_details = interpreter.get_output_details()[0]
+                    interpreter.set_tensor(
+                        input_details["index"], _quantize_input(input_details, probe[None])
+                    )
+                    interpreter.invoke()
+                    outputs.append(_dequantize_output(
+                        output_details, interpreter.get_tensor(output_details["index"])
+                    ))
+                max_drift = max(max_drift, float(np.max(np.abs(outputs[0] - outputs[1]))))
+            
+            return max_drift
+            
+        except Exception as e:
+            logger.warning(f"⚠️ int8 accuracy check failed: {e}")
+            return float("inf")
+    
+    def _predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run the loaded model on a float32 batch
+        
+        Args:
+            batch: Preprocessed images (N, 64, 64, 1)
+        
+        Returns:
+            np.ndarray: Class probabilities (N, num_classes)
+        """
+        if self._interpreter is None:
+            infer = self._infer1 if batch.shape[0] == 1 else self._infer_batch
+            return infer(self._to_tensor(batch)).numpy()
+        
+        input_details = self._input_details
+        batch = _quantize_input(input_details, batch)
+        
+        with self._interpreter_lock:
+            batch_size = batch.shape[0]
+            if batch_size != self._interpreter_batch_size:
+                self._interpreter.resize_tensor_input(
+                    input_details["index"], [batch_size, *self.input_shape]
+                )
+                self._interpreter.allocate_tensors()
+                self._interpreter_batch_size = batch_size
+            
+            self._interpreter.set_tensor(input_details["index"], batch)
+            self._interpreter.invoke()
+            predictions = self._interpreter.get_tensor(self._output_details["index"])
+        
+        return _dequantize_output(self._output_details, predictions)
     
     def _warmup_model(self):
         """Warm up model with dummy prediction for faster first inference"""
         try:
-            if self.model is None:
+            if not self._loaded:
                 return
             
             logger.info("🔥 Warming up model...")
             dummy_input = np.zeros((1, 64, 64, 1), dtype=np.float32)
             
             # Run prediction to initialize model
-            _ = self.model.predict(dummy_input, verbose=0)
+            _ = self._predict(dummy_input)
             
             logger.info("✅ Model warmed up")
             
@@ -145,7 +529,8 @@ class EmotionModel:
         Returns:
             dict: Emotion detection results with confidence
         """
-        if not self.loaded or self.model is None:
+        self._ensure_loaded()
+        if not self._loaded:
             return self._mock_detection()
         
         try:
@@ -163,7 +548,7 @@ class EmotionModel:
                 }
             
             # Make prediction
-            predictions = self.model.predict(face_image, verbose=0)
+            predictions = self._predict(face_image)
             
             # Track inference time
             inference_time = time.time() - start_time
@@ -174,37 +559,37 @@ class EmotionModel:
             emotion_probs = predictions[0]
             
             # Apply calibration if enabled
+            log_probs = None
             if self._use_calibration:
-                emotion_probs = self._calibrate_confidence(emotion_probs)
+                emotion_probs, log_probs = self._calibrate_confidence(emotion_probs)
             
-            emotion_idx = np.argmax(emotion_probs)
-            confidence = float(emotion_probs[emotion_idx])
+            emotion_probs = emotion_probs.astype(np.float32, copy=False)
+            probs_list = emotion_probs.tolist()
+            emotion_idx = int(np.argmax(emotion_probs))
+            confidence = probs_list[emotion_idx]
             dominant_emotion = self.EMOTION_LABELS[emotion_idx]
             
             # Check confidence threshold
             if confidence < self._confidence_threshold:
                 logger.warning(f"⚠️ Low confidence: {confidence:.3f} for {dominant_emotion}")
             
-            # Create emotion dictionary
-            emotions = {
-                self.EMOTION_LABELS[i]: float(emotion_probs[i])
-                for i in range(len(self.EMOTION_LABELS))
-            }
-            
             result = {
                 "success": True,
                 "dominant_emotion": dominant_emotion,
                 "confidence": confidence,
-                "emotions": emotions,
+                "label_idx": emotion_idx,
+                "probs": emotion_probs,
                 "inference_time_ms": round(inference_time * 1000, 2)
             }
             
             # Add all probabilities if requested
             if return_all_probabilities:
-                result["all_probabilities"] = emotion_probs.tolist()
+                result["all_probabilities"] = probs_list
             
             # Add quality indicators
-            result["quality"] = self._assess_prediction_quality(confidence, emotion_probs)
+            result["quality"] = self._assess_prediction_quality(
+                confidence, emotion_probs, log_probs
+            )
             
             return result
             
@@ -229,20 +614,33 @@ class EmotionModel:
         Returns:
             list: Detection results for each face
         """
-        if not self.loaded or self.model is None:
+        self._ensure_loaded()
+        if not self._loaded:
             return [self._mock_detection() for _ in face_images]
         
         try:
             if not face_images:
                 return []
             
-            # Stack images into batch
-            batch = np.stack(face_images, axis=0)
+            # Copy images into this thread's batch tensor, max_batch at a time
+            batch_buf = self._scratch_array(
+                "batch_buf", (self.max_batch, *self.input_shape), np.float32
+            )
             
             start_time = time.time()
             
             # Batch prediction
-            predictions = self.model.predict(batch, verbose=0)
+            chunk_predictions = []
+            for offset in range(0, len(face_images), self.max_batch):
+                chunk = face_images[offset:offset + self.max_batch]
+                for i, face in enumerate(chunk):
+                    np.copyto(batch_buf[i], face)
+                chunk_predictions.append(self._predict(batch_buf[:len(chunk)]))
+            
+            if len(chunk_predictions) == 1:
+                predictions = chunk_predictions[0]
+            else:
+                predictions = np.concatenate(chunk_predictions)
             
             inference_time = time.time() - start_time
             per_image_time = inference_time / len(face_images)
@@ -250,24 +648,25 @@ class EmotionModel:
             results = []
             for i, emotion_probs in enumerate(predictions):
                 # Apply calibration
+                log_probs = None
                 if self._use_calibration:
-                    emotion_probs = self._calibrate_confidence(emotion_probs)
+                    emotion_probs, log_probs = self._calibrate_confidence(emotion_probs)
                 
-                emotion_idx = np.argmax(emotion_probs)
+                emotion_probs = emotion_probs.astype(np.float32, copy=False)
+                emotion_idx = int(np.argmax(emotion_probs))
                 confidence = float(emotion_probs[emotion_idx])
                 dominant_emotion = self.EMOTION_LABELS[emotion_idx]
                 
-                emotions = {
-                    self.EMOTION_LABELS[j]: float(emotion_probs[j])
-                    for j in range(len(self.EMOTION_LABELS))
-                }
-                
                 results.append({
                     "success": True,
                     "dominant_emotion": dominant_emotion,
                     "confidence": confidence,
-                    "emotions": emotions,
-                    "inference_time_ms": round(per_image_time * 1000, 2)
+                    "label_idx": emotion_idx,
+                    "probs": emotion_probs,
+                    "inference_time_ms": round(per_image_time * 1000, 2),
+                    "quality": self._assess_prediction_quality(
+                        confidence, emotion_probs, log_probs
+                    )
                 })
             
             self._prediction_count += len(face_images)
@@ -279,6 +678,84 @@ class EmotionModel:
             logger.error(f"❌ Error in batch detection: {e}")
             return [{"success": False, "error": str(e)} for _ in face_images]
     
+    async def detect_async(self, face_image: np.ndarray) -> Dict[str, Any]:
+        """
+        Detect emotion, coalescing concurrent requests into one batch
+        
+        Requests arriving within max_wait_ms of each other (up to max_batch)
+        share a single model invocation. Once max_queue requests are waiting,
+        callers wait for room instead of growing the backlog.
+        
+        Args:
+            face_image: Preprocessed face image array (64, 64, 1); read when
+                its batch runs, so not a reused scratch buffer
+        
+        Returns:
+            dict: Emotion detection results with confidence
+        """
+        loop = asyncio.get_running_loop()
+        
+        # The first load imports TensorFlow; keep it off the event loop
+        if not self._load_attempted:
+            await loop.run_in_executor(None, self._ensure_loaded)
+        if not self._loaded:
+            return self._mock_detection()
+        
+        if face_image.ndim == 4:
+            face_image = face_image[0]
+        
+        if face_image.shape != self.input_shape:
+            return {
+                "success": False,
+                "error": f"Invalid input shape. Expected {self.input_shape}"
+            }
+        
+        # Queue and worker are bound to the event loop that first uses them
+        if self._batch_loop is not loop or self._batch_worker_task.done():
+            self._batch_queue = asyncio.Queue(maxsize=self.max_queue)
+            self._batch_loop = loop
+            self._batch_worker_task = loop.create_task(self._batch_worker(self._batch_queue))
+        
+        future = loop.create_future()
+        await self._batch_queue.put((face_image, future))
+        
+        return await future
+    
+    async def _batch_worker(self, queue: asyncio.Queue):
+        """
+        Drain queued detection requests in batches
+        
+        Args:
+            queue: Queue of (face_image, future) pairs
+        """
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            pending = [await queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+            
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            faces = [face for face, _ in pending]
+            
+            try:
+                # Run inference off the event loop
+                results = await loop.run_in_executor(None, self.detect_emotions_batch, faces)
+            except Exception as e:
+                logger.error(f"❌ Error in batched detection: {e}")
+                results = [{"success": False, "error": str(e)} for _ in faces]
+            
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+    
     def _mock_detection(self) -> Dict[str, Any]:
         """Return mock detection when model not available"""
         import random
@@ -294,15 +771,27 @@ class EmotionModel:
             "success": True,
             "dominant_emotion": dominant,
             "confidence": emotions[dominant],
-            "emotions": emotions,
+            "label_idx": self.EMOTION_LABELS.index(dominant),
+            "probs": np.array(
+                [emotions[label] for label in self.EMOTION_LABELS], dtype=np.float32
+            ),
             "mock": True,
             "warning": "Model not loaded - using mock data"
         }
     
+    def _scratch_array(self, name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """Per-thread array reused across frames, allocated on first use"""
+        buffer = getattr(self._scratch, name, None)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            setattr(self._scratch, name, buffer)
+        return buffer
+    
     def preprocess_face(
         self, 
         face_image: np.ndarray, 
-        target_size: Optional[Tuple[int, int]] = None
+        target_size: Optional[Tuple[int, int]] = None,
+        reuse_buffer: bool = False
     ) -> np.ndarray:
         """
         Preprocess a face image for emotion detection with enhancements
@@ -310,6 +799,8 @@ class EmotionModel:
         Args:
             face_image: Raw face image (RGB or Grayscale)
             target_size: Target size (default: 64x64)
+            reuse_buffer: Write into this thread's scratch tensor instead of
+                allocating; the result is overwritten by the next call
         
         Returns:
             np.ndarray: Preprocessed image ready for model
@@ -325,32 +816,93 @@ class EmotionModel:
                 logger.error("❌ Empty face image provided")
                 return np.array([])
             
-            # Resize to target size
-            resized = cv2.resize(face_image, target_size, interpolation=cv2.INTER_AREA)
+            # Already a model-ready tensor (e.g. frames preprocessed upstream)
+            if face_image.dtype == np.float32 and face_image.shape == self.input_shape:
+                return face_image
+            
+            reuse_buffer = reuse_buffer and target_size == self.target_size
             
-            # Convert to grayscale if needed
-            if len(resized.shape) == 3 and resized.shape[2] == 3:
-                gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
-            elif len(resized.shape) == 3 and resized.shape[2] == 4:
-                gray = cv2.cvtColor(resized, cv2.COLOR_BGRA2GRAY)
+            # Convert to grayscale first so the resize touches one channel
+            if len(face_image.shape) == 3 and face_image.shape[2] == 3:
+                gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
+            elif len(face_image.shape) == 3 and face_image.shape[2] == 4:
+                gray = cv2.cvtColor(face_image, cv2.COLOR_BGRA2GRAY)
             else:
-                gray = resized
+                gray = face_image
             
-            # Apply histogram equalization for better contrast
-            gray = cv2.equalizeHist(gray)
+            # Resize to target size (fixed cameras often deliver it already)
+            if gray.shape[:2] != (target_size[1], target_size[0]):
+                if reuse_buffer:
+                    resized = self._scratch_array(
+                        "gray_buf", (target_size[1], target_size[0]), np.uint8
+                    )
+                    gray = cv2.resize(gray, target_size, dst=resized, interpolation=cv2.INTER_AREA)
+                else:
+                    gray = cv2.resize(gray, target_size, interpolation=cv2.INTER_AREA)
             
-            # Normalize to [0, 1]
-            normalized = gray.astype('float32') / 255.0
+            if reuse_buffer:
+                processed = self._scratch_array("pp_buf", (1, *self.input_shape), np.float32)
+            else:
+                processed = np.empty((1, *gray.shape, 1), dtype=np.float32)
             
-            # Add channel dimension
-            processed = np.expand_dims(normalized, axis=-1)
+            # Histogram equalization and [0, 1] scaling in a single gather
+            lut = self._equalization_lut(gray)
+            np.take(lut, gray, out=processed[0, :, :, 0])
             
-            return processed
+            return processed[0]
             
         except Exception as e:
             logger.error(f"❌ Error preprocessing face: {e}")
             return np.array([])
     
+    def _equalization_lut(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Build a 256-entry float32 LUT equal to cv2.equalizeHist followed by /255
+        
+        Well-contrasted images are only scaled, since equalizing them costs
+        time and shifts them away from the training distribution.
+        
+        Args:
+            gray: 8-bit grayscale image
+        
+        Returns:
+            np.ndarray: Lookup table mapping pixel values to [0, 1]
+        """
+        hist = np.bincount(gray.ravel(), minlength=256)
+        
+        # Contrast check from the histogram (no extra pass over pixels)
+        mean = np.dot(hist, _PIXEL_VALUES) / gray.size
+        variance = np.dot(hist, _PIXEL_VALUES * _PIXEL_VALUES) / gray.size - mean * mean
+        if variance >= self._equalize_std_threshold ** 2:
+            return _IDENTITY_LUT
+        
+        first = int(np.flatnonzero(hist)[0])
+        remaining = gray.size - int(hist[first])
+        
+        # Single-valued image: equalizeHist leaves it unchanged
+        if remaining == 0:
+            return np.full(256, first / 255.0, dtype=np.float32)
+        
+        # Same float32 arithmetic and rounding as OpenCV's equalizeHist
+        scale = np.float32(255.0) / np.float32(remaining)
+        cdf = (np.cumsum(hist) - hist[first]).astype(np.float32)
+        lut = np.clip(np.rint(cdf * scale), 0, 255)
+        lut *= np.float32(1.0 / 255.0)
+        
+        return lut
+    
+    def _face_cascade(self):
+        """Haar face cascade, parsed once per thread and reused"""
+        cascade = getattr(self._scratch, "face_cascade", None)
+        if cascade is None:
+            import cv2
+            
+            cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+            )
+            self._scratch.face_cascade = cascade
+        return cascade
+    
     def preprocess_face_with_detection(
         self,
         image: np.ndarray,
@@ -376,10 +928,7 @@ class EmotionModel:
             }
             
             if detect_face:
-                # Load face cascade
-                face_cascade = cv2.CascadeClassifier(
-                    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-                )
+                face_cascade = self._face_cascade()
                 
                 # Convert to grayscale for detection
                 if len(image.shape) == 3:
@@ -437,7 +986,7 @@ class EmotionModel:
             dict: Detection results with preprocessed data
         """
         try:
-            processed = self.preprocess_face(face_image)
+            processed = self.preprocess_face(face_image, reuse_buffer=True)
             
             if processed.size == 0:
                 return {
@@ -448,6 +997,7 @@ class EmotionModel:
             result = self.detect_emotion(processed)
             
             if result["success"]:
+                result["emotions"] = self.probabilities_to_dict(result.pop("probs"))
                 result["processed_image_shape"] = processed.shape
             
             return result
@@ -459,7 +1009,22 @@ class EmotionModel:
                 "error": str(e)
             }
     
-    def _calibrate_confidence(self, probabilities: np.ndarray) -> np.ndarray:
+    def probabilities_to_dict(self, probabilities: np.ndarray) -> Dict[str, float]:
+        """
+        Materialize a probability vector as a label-keyed dictionary
+        
+        Args:
+            probabilities: Class probabilities in EMOTION_LABELS order
+        
+        Returns:
+            dict: Emotion label to probability mapping
+        """
+        return dict(zip(self.EMOTION_LABELS, probabilities.tolist()))
+    
+    def _calibrate_confidence(
+        self, 
+        probabilities: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
         """
         Calibrate confidence scores for better reliability
         
@@ -467,23 +1032,28 @@ class EmotionModel:
             probabilities: Raw model probabilities
         
         Returns:
-            np.ndarray: Calibrated probabilities
+            tuple: (Calibrated probabilities, their natural logs or None)
         """
         try:
-            # Temperature scaling (T=1.5 works well for this model)
+            # Temperature scaling (T=1.5 works well for this model),
+            # as a softmax over log(p) / T normalized in log space with a
+            # max-shifted logsumexp
             temperature = 1.5
-            calibrated = np.exp(np.log(probabilities + 1e-10) / temperature)
-            calibrated = calibrated / np.sum(calibrated)
+            log_probs = np.log(probabilities + 1e-10)
+            log_probs *= 1.0 / temperature
+            max_log = log_probs.max()
+            log_probs -= max_log + np.log(np.exp(log_probs - max_log).sum())
             
-            return calibrated
+            return np.exp(log_probs), log_probs
             
         except Exception:
-            return probabilities
+            return probabilities, None
     
     def _assess_prediction_quality(
         self, 
         confidence: float,
-        probabilities: np.ndarray
+        probabilities: np.ndarray,
+        log_probs: Optional[np.ndarray] = None
     ) -> str:
         """
         Assess prediction quality based on confidence and distribution
@@ -491,17 +1061,19 @@ class EmotionModel:
         Args:
             confidence: Prediction confidence
             probabilities: All class probabilities
+            log_probs: Natural logs of probabilities, if already computed
         
         Returns:
             str: Quality rating (excellent/good/fair/poor)
         """
         try:
             # Calculate entropy
-            entropy = -np.sum(probabilities * np.log(probabilities + 1e-10))
+            if log_probs is None:
+                log_probs = np.log(probabilities + 1e-10)
+            entropy = -float(np.dot(probabilities, log_probs))
             
-            # Normalize entropy (max entropy for 7 classes is log(7))
-            max_entropy = np.log(7)
-            normalized_entropy = entropy / max_entropy
+            # Normalize entropy (max entropy is log(num_classes))
+            normalized_entropy = entropy / self._log_num_classes
             
             # Quality assessment
             if confidence >= 0.8 and normalized_entropy < 0.4:
@@ -520,6 +1092,7 @@ class EmotionModel:
         """Get comprehensive information about the model"""
         info = {
             "loaded": self.loaded,
+            "backend": self.backend,
             "model_path": self.model_path,
             "emotion_labels": self.EMOTION_LABELS,
             "num_classes": self.num_classes,
@@ -528,23 +1101,16 @@ class EmotionModel:
             "prediction_count": self._prediction_count
         }
         
-        if self.model:
-            try:
-                info["model_architecture"] = {
-                    "input_shape": list(self.model.input.shape),
-                    "output_shape": list(self.model.output.shape),
-                    "total_params": int(self.model.count_params()),
-                    "layers": len(self.model.layers)
-                }
-            except Exception:
-                pass
+        if self._model_arch:
+            info["model_architecture"] = self._model_arch
         
         # Performance statistics
         if self._inference_times:
+            times = np.fromiter(self._inference_times, dtype=np.float64)
             info["performance"] = {
-                "avg_inference_ms": round(np.mean(self._inference_times) * 1000, 2),
-                "min_inference_ms": round(np.min(self._inference_times) * 1000, 2),
-                "max_inference_ms": round(np.max(self._inference_times) * 1000, 2),
+                "avg_inference_ms": round(float(times.mean()) * 1000, 2),
+                "min_inference_ms": round(float(times.min()) * 1000, 2),
+                "max_inference_ms": round(float(times.max()) * 1000, 2),
                 "total_predictions": self._prediction_count
             }
         
@@ -557,7 +1123,7 @@ class EmotionModel:
                 "message": "No predictions made yet"
             }
         
-        times_ms = np.array(self._inference_times) * 1000
+        times_ms = np.fromiter(self._inference_times, dtype=np.float64) * 1000.0
         
         return {
             "total_predictions": self._prediction_count,
@@ -572,7 +1138,7 @@ class EmotionModel:
     
     def reset_performance_stats(self):
         """Reset performance tracking"""
-        self._inference_times = []
+        self._inference_times.clear()
         self._prediction_count = 0
         logger.info("📊 Performance stats reset")
     
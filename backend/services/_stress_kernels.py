@@ -0,0 +1,80 @@
+"""
+Compiled numeric kernels for Amdox stress analysis
+Numba-compiled stress series reductions with fixed signatures and NumPy fallbacks
+"""
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("💡 Numba not available - using NumPy stress kernels")
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(
+        "UniTuple(float64, 4)(float32[::1])",
+        cache=True,
+        fastmath=True
+    )
+    def trend_stats(scores):
+        """
+        Mean, population std and first/second half means of a stress series
+
+        Args:
+            scores: Chronological stress scores (non-empty)
+
+        Returns:
+            tuple: (mean, std, first_half_avg, second_half_avg); a half
+                with no entries averages to 0.0 (callers need n >= 2 to
+                compare halves)
+        """
+        n = scores.shape[0]
+        half = n // 2
+
+        first_sum = 0.0
+        second_sum = 0.0
+        for i in range(half):
+            first_sum += scores[i]
+        for i in range(half, n):
+            second_sum += scores[i]
+
+        mean = (first_sum + second_sum) / n
+
+        sq_dev = 0.0
+        for i in range(n):
+            d = scores[i] - mean
+            sq_dev += d * d
+
+        # fastmath assumes no NaNs, so empty halves use a finite sentinel
+        first_avg = first_sum / half if half > 0 else 0.0
+        second_avg = second_sum / (n - half) if n > half else 0.0
+
+        return mean, np.sqrt(sq_dev / n), first_avg, second_avg
+
+else:
+
+    def trend_stats(scores):
+        """
+        Mean, population std and first/second half means of a stress series
+
+        Args:
+            scores: Chronological stress scores (non-empty)
+
+        Returns:
+            tuple: (mean, std, first_half_avg, second_half_avg); a half
+                with no entries averages to 0.0 (callers need n >= 2 to
+                compare halves)
+        """
+        values = scores.astype(np.float64)
+        half = values.shape[0] // 2
+
+        first_avg = float(values[:half].mean()) if half > 0 else 0.0
+        second_avg = float(values[half:].mean()) if values.shape[0] > half else 0.0
+
+        return float(values.mean()), float(values.std()), first_avg, second_avg
@@ -4,10 +4,18 @@ Production-grade data aggregation with MongoDB pipelines for team analytics
 """
 import sys
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Any
+import copy
 import logging
+import math
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from pymongo import ReadPreference
+from pymongo.read_concern import ReadConcern
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,15 +31,209 @@ if parent_dir not in sys.path:
 from backend.database.db import db_manager
 
 
+# Stress score buckets: [0, 3) low, [3, 7) moderate, [7, 10] high
+STRESS_BUCKET_BOUNDARIES = [0, 3, 7, 11]
+STRESS_BUCKET_LABELS = {0: "low", 3: "moderate", 7: "high"}
+
+# Emotions counted towards negative prevalence in team recommendations
+NEGATIVE_EMOTIONS = frozenset({"Sad", "Angry", "Fear", "Disgust"})
+
+# Team recommendation messages by average stress bucket
+# (critical >= 7, elevated >= 5, low <= 3; nothing in between)
+TEAM_STRESS_RECOMMENDATIONS = {
+    "critical": (
+        "🚨 URGENT: Team stress is critically high - immediate intervention needed",
+        "📅 Schedule team wellness session",
+        "📊 Review workload distribution across team"
+    ),
+    "elevated": (
+        "⚠️ Elevated team stress - monitor closely",
+        "💡 Consider flexible work arrangements",
+        "🤝 Increase 1-on-1 check-ins"
+    ),
+    "low": (
+        "✅ Team stress is well-managed",
+        "🌟 Maintain current wellness practices"
+    )
+}
+NEGATIVE_MOOD_RECOMMENDATION = "😔 High negative emotion prevalence - address team morale"
+DEFAULT_TEAM_RECOMMENDATIONS = ("Team appears to be functioning well",)
+
+# Cursor batch size for pipelines that return one document per user
+AGGREGATE_BATCH_SIZE = 500
+
+# Reports read from secondaries; for this long after an invalidation their
+# results may predate the write, so they are served but not cached
+REPLICA_LAG_GRACE_SECONDS = 10
+
+
+def _utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime
+    
+    Stored mood timestamps are naive UTC, so window bounds and generated_at
+    stay naive; avoids the deprecated datetime.utcnow().
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class AggregationService:
     """
     Enhanced Aggregation Service for team and user analytics
+    
+    Every pipeline opens with a $match on timestamp (plus user_id $in members
+    when team-scoped). These rely on the mood_entries (user_id, timestamp)
+    and (timestamp, user_id, stress_score) indexes and on the unique teams
+    team_id index, all created by db_manager at connect time.
     """
     
     def __init__(self):
         self.db = db_manager.get_database()
+        
+        # Reports are read-only and tolerate slightly stale data, so let
+        # replica set secondaries serve the heavy scans
+        self.mood_reports = self.db.mood_entries.with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED,
+            read_concern=ReadConcern("available")
+        )
+        self.team_reports = self.db.teams.with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED,
+            read_concern=ReadConcern("available")
+        )
+        
+        # Runs independent pipelines concurrently (pymongo is thread-safe)
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="aggregation")
+        
+        # Results keyed on (kind, team_id, days); dashboards re-request the same windows
+        self._cache = TTLCache(maxsize=256, ttl=300)  # 5 minutes cache
+        self._cache_lock = threading.Lock()
+        
+        # Team documents, so one report doesn't re-read teams per pipeline
+        self._team_cache = TTLCache(maxsize=256, ttl=30)  # 30 seconds cache
+        
+        # Monotonic time of the last invalidation per team (None = all teams)
+        self._invalidated_at: Dict[Optional[str], float] = {}
+        
         logger.info("📊 Aggregation Service initialized")
     
+    def _get_cached(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """
+        Get cached result if still valid
+        
+        Callers get their own copy, since controllers enrich results in place.
+        """
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        return copy.deepcopy(cached) if cached is not None else None
+    
+    def _set_cache(self, key: tuple, data: Dict[str, Any]):
+        """
+        Cache a copy of a successful result
+        
+        Skipped right after an invalidation that covers the key, so a lagging
+        secondary can't put pre-write data back for the full TTL.
+        """
+        if data.get("success"):
+            snapshot = copy.deepcopy(data)
+            with self._cache_lock:
+                if not self._recently_invalidated(key[1]):
+                    self._cache[key] = snapshot
+    
+    def _recently_invalidated(self, team_id: Optional[str]) -> bool:
+        """
+        Whether results for team_id may still be stale on a secondary
+        
+        Caller must hold _cache_lock. System-wide results (team_id None) are
+        affected by every invalidation.
+        """
+        if team_id is None:
+            times = self._invalidated_at.values()
+        else:
+            times = [t for k, t in self._invalidated_at.items() if k in (team_id, None)]
+        cutoff = time.monotonic() - REPLICA_LAG_GRACE_SECONDS
+        return any(t > cutoff for t in times)
+    
+    def _get_team_cached(self, team_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a team document, reusing recent lookups
+        
+        Args:
+            team_id: Team ID
+        
+        Returns:
+            dict: Team document or None if not found
+        """
+        with self._cache_lock:
+            team = self._team_cache.get(team_id)
+        if team is not None:
+            return team
+        
+        team = self.team_reports.find_one({"team_id": team_id})
+        if team is not None:
+            with self._cache_lock:
+                if not self._recently_invalidated(team_id):
+                    self._team_cache[team_id] = team
+        return team
+    
+    def _get_team_members_cached(self, team_id: str) -> Optional[List[str]]:
+        """
+        Get a team's member IDs, reusing recent lookups
+        
+        Args:
+            team_id: Team ID
+        
+        Returns:
+            list: Member user IDs or None if the team is not found
+        """
+        team = self._get_team_cached(team_id)
+        if team is None:
+            return None
+        return team.get("members", [])
+    
+    def _aggregate(self, pipeline: List[Dict[str, Any]]):
+        """
+        Run a mood_entries pipeline as a streaming cursor
+        
+        Large $group stages may spill to disk instead of failing at the
+        100MB in-memory limit; reads go to a secondary when available.
+        
+        Args:
+            pipeline: Aggregation pipeline
+        
+        Returns:
+            CommandCursor: Cursor over the results
+        """
+        return self.mood_reports.aggregate(
+            pipeline,
+            allowDiskUse=True,
+            batchSize=AGGREGATE_BATCH_SIZE
+        )
+    
+    def invalidate(self, team_id: Optional[str] = None):
+        """
+        Drop cached results so the next call re-aggregates
+        
+        Args:
+            team_id: Team whose results changed (None clears everything);
+                system-wide results are always dropped
+        """
+        with self._cache_lock:
+            now = time.monotonic()
+            cutoff = now - REPLICA_LAG_GRACE_SECONDS
+            # Keep the bookkeeping bounded to invalidations still in grace
+            for key in [k for k, t in self._invalidated_at.items() if t <= cutoff]:
+                del self._invalidated_at[key]
+            self._invalidated_at[team_id] = now
+            if team_id is None:
+                self._cache.clear()
+                self._team_cache.clear()
+            else:
+                self._team_cache.pop(team_id, None)
+                for key in list(self._cache.keys()):
+                    if key[1] in (team_id, None):
+                        self._cache.pop(key, None)
+        logger.debug(f"🗑️ Aggregation cache invalidated for {team_id or 'all teams'}")
+    
     def aggregate_team_stress(
         self,
         team_id: Optional[str] = None,
@@ -47,8 +249,23 @@ class AggregationService:
         Returns:
             dict: Aggregated stress data
         """
+        cache_key = ("team_stress", team_id, days)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._aggregate_team_stress(team_id, days)
+        self._set_cache(cache_key, result)
+        return result
+    
+    def _aggregate_team_stress(
+        self,
+        team_id: Optional[str],
+        days: int
+    ) -> Dict[str, Any]:
+        """Run the team stress pipeline (uncached)"""
         try:
-            since = datetime.utcnow() - timedelta(days=days)
+            since = _utcnow() - timedelta(days=days)
             
             # Build match stage
             match_stage = {"timestamp": {"$gte": since}}
@@ -56,87 +273,102 @@ class AggregationService:
             # Get team members if team_id provided
             user_ids = None
             if team_id:
-                team = self.db.teams.find_one({"team_id": team_id})
-                if not team:
+                user_ids = self._get_team_members_cached(team_id)
+                if user_ids is None:
                     return {
                         "success": False,
                         "error": f"Team {team_id} not found"
                     }
-                user_ids = team.get("members", [])
                 if user_ids:
                     match_stage["user_id"] = {"$in": user_ids}
             
-            # Aggregation pipeline
+            # Aggregation pipeline: overall stats and bucketed distribution
+            # from a single pass over the matched entries
             pipeline = [
                 {"$match": match_stage},
+                {"$project": {"_id": 0, "stress_score": 1}},
+                {"$facet": self._team_stress_facets()}
+            ]
+            
+            result = list(self._aggregate(pipeline))
+            
+            return self._build_team_stress(team_id, days, result[0] if result else {})
+            
+        except Exception as e:
+            logger.error(f"❌ Error aggregating team stress: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    @staticmethod
+    def _team_stress_facets() -> Dict[str, List[Dict[str, Any]]]:
+        """$facet branches for overall stress stats and the bucketed distribution"""
+        return {
+            "stats": [
                 {
                     "$group": {
                         "_id": None,
                         "overall_avg_stress": {"$avg": "$stress_score"},
                         "max_stress": {"$max": "$stress_score"},
                         "min_stress": {"$min": "$stress_score"},
-                        "total_entries": {"$sum": 1},
-                        "high_stress_count": {
-                            "$sum": {"$cond": [{"$gte": ["$stress_score", 7]}, 1, 0]}
-                        },
-                        "moderate_stress_count": {
-                            "$sum": {"$cond": [
-                                {"$and": [
-                                    {"$gte": ["$stress_score", 3]},
-                                    {"$lt": ["$stress_score", 7]}
-                                ]},
-                                1,
-                                0
-                            ]}
-                        },
-                        "low_stress_count": {
-                            "$sum": {"$cond": [{"$lt": ["$stress_score", 3]}, 1, 0]}
-                        }
+                        "total_entries": {"$sum": 1}
                     }
                 }
-            ]
-            
-            result = list(self.db.mood_entries.aggregate(pipeline))
-            
-            if not result or result[0]["_id"] is None:
-                return {
-                    "success": True,
-                    "team_id": team_id,
-                    "message": "No data available",
-                    "data": {}
+            ],
+            "distribution": [
+                {
+                    "$bucket": {
+                        "groupBy": "$stress_score",
+                        "boundaries": STRESS_BUCKET_BOUNDARIES,
+                        "default": "other",
+                        "output": {"count": {"$sum": 1}}
+                    }
                 }
-            
-            data = result[0]
-            total = data["total_entries"]
-            
+            ]
+        }
+    
+    @staticmethod
+    def _build_team_stress(
+        team_id: Optional[str],
+        days: int,
+        facets: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Shape the stats/distribution facets into the team stress response"""
+        stats = facets.get("stats")
+        if not stats or not stats[0]["total_entries"]:
             return {
                 "success": True,
                 "team_id": team_id,
-                "period_days": days,
-                "data": {
-                    "overall_avg_stress": round(data["overall_avg_stress"], 2),
-                    "max_stress": data["max_stress"],
-                    "min_stress": data["min_stress"],
-                    "total_entries": total,
-                    "stress_distribution": {
-                        "high": data["high_stress_count"],
-                        "moderate": data["moderate_stress_count"],
-                        "low": data["low_stress_count"]
-                    },
-                    "stress_distribution_percentage": {
-                        "high": round((data["high_stress_count"] / total) * 100, 1) if total > 0 else 0,
-                        "moderate": round((data["moderate_stress_count"] / total) * 100, 1) if total > 0 else 0,
-                        "low": round((data["low_stress_count"] / total) * 100, 1) if total > 0 else 0
-                    }
-                }
+                "message": "No data available",
+                "data": {}
             }
-            
-        except Exception as e:
-            logger.error(f"❌ Error aggregating team stress: {e}", exc_info=True)
-            return {
-                "success": False,
-                "error": str(e)
+        
+        data = stats[0]
+        total = data["total_entries"]
+        
+        distribution = {label: 0 for label in ("high", "moderate", "low")}
+        for bucket in facets.get("distribution", []):
+            label = STRESS_BUCKET_LABELS.get(bucket["_id"])
+            if label:
+                distribution[label] = bucket["count"]
+        
+        return {
+            "success": True,
+            "team_id": team_id,
+            "period_days": days,
+            "data": {
+                "overall_avg_stress": round(data["overall_avg_stress"], 2),
+                "max_stress": data["max_stress"],
+                "min_stress": data["min_stress"],
+                "total_entries": total,
+                "stress_distribution": distribution,
+                "stress_distribution_percentage": {
+                    label: round((count / total) * 100, 1) if total > 0 else 0
+                    for label, count in distribution.items()
+                }
             }
+        }
     
     def aggregate_emotion_distribution(
         self,
@@ -153,58 +385,38 @@ class AggregationService:
         Returns:
             dict: Emotion distribution data
         """
+        cache_key = ("emotion_distribution", team_id, days)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._aggregate_emotion_distribution(team_id, days)
+        self._set_cache(cache_key, result)
+        return result
+    
+    def _aggregate_emotion_distribution(
+        self,
+        team_id: Optional[str],
+        days: int
+    ) -> Dict[str, Any]:
+        """Run the emotion distribution pipeline (uncached)"""
         try:
-            since = datetime.utcnow() - timedelta(days=days)
+            since = _utcnow() - timedelta(days=days)
             match_stage = {"timestamp": {"$gte": since}}
             
             # Filter by team
             if team_id:
-                team = self.db.teams.find_one({"team_id": team_id})
-                if team and team.get("members"):
-                    match_stage["user_id"] = {"$in": team["members"]}
+                members = self._get_team_members_cached(team_id)
+                if members:
+                    match_stage["user_id"] = {"$in": members}
             
             # Aggregation pipeline
             pipeline = [
                 {"$match": match_stage},
-                {
-                    "$group": {
-                        "_id": "$dominant_emotion",
-                        "count": {"$sum": 1},
-                        "avg_confidence": {"$avg": "$confidence"}
-                    }
-                },
-                {"$sort": {"count": -1}}
-            ]
-            
-            results = list(self.db.mood_entries.aggregate(pipeline))
-            
-            if not results:
-                return {
-                    "success": True,
-                    "message": "No emotion data available",
-                    "distribution": {}
-                }
+                {"$project": {"_id": 0, "dominant_emotion": 1, "confidence": 1}}
+            ] + self._emotion_distribution_stages()
             
-            # Calculate total and percentages
-            total = sum(r["count"] for r in results)
-            
-            distribution = {}
-            for r in results:
-                emotion = r["_id"]
-                distribution[emotion] = {
-                    "count": r["count"],
-                    "percentage": round((r["count"] / total) * 100, 1) if total > 0 else 0,
-                    "avg_confidence": round(r.get("avg_confidence", 0), 3)
-                }
-            
-            return {
-                "success": True,
-                "team_id": team_id,
-                "period_days": days,
-                "distribution": distribution,
-                "total_entries": total,
-                "dominant_emotion": results[0]["_id"] if results else "Unknown"
-            }
+            return self._build_emotion_distribution(team_id, days, self._aggregate(pipeline))
             
         except Exception as e:
             logger.error(f"❌ Error aggregating emotion distribution: {e}", exc_info=True)
@@ -213,6 +425,82 @@ class AggregationService:
                 "error": str(e)
             }
     
+    @staticmethod
+    def _emotion_distribution_stages() -> List[Dict[str, Any]]:
+        """
+        Per-emotion count, percentage and confidence stages, most frequent first
+        
+        The total is attached to every emotion with a second $group/$unwind
+        rather than a $facet, so these stages can also run inside the team
+        report's $facet.
+        """
+        return [
+            {
+                "$group": {
+                    "_id": "$dominant_emotion",
+                    "count": {"$sum": 1},
+                    "avg_confidence": {"$avg": "$confidence"}
+                }
+            },
+            {
+                "$group": {
+                    "_id": None,
+                    "total": {"$sum": "$count"},
+                    "emotions": {"$push": "$$ROOT"}
+                }
+            },
+            {"$unwind": "$emotions"},
+            {
+                "$project": {
+                    "_id": "$emotions._id",
+                    "count": "$emotions.count",
+                    "total": 1,
+                    "percentage": {
+                        "$round": [
+                            {"$multiply": [{"$divide": ["$emotions.count", "$total"]}, 100]},
+                            1
+                        ]
+                    },
+                    "avg_confidence": {"$round": [{"$ifNull": ["$emotions.avg_confidence", 0]}, 3]}
+                }
+            },
+            {"$sort": {"count": -1}}
+        ]
+    
+    @staticmethod
+    def _build_emotion_distribution(
+        team_id: Optional[str],
+        days: int,
+        results: Iterable[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Shape per-emotion groups (most frequent first) into the emotion distribution response"""
+        # Percentages and total arrive computed by the pipeline
+        distribution = {}
+        total = 0
+        for r in results:
+            distribution[r["_id"]] = {
+                "count": r["count"],
+                "percentage": r["percentage"],
+                "avg_confidence": r["avg_confidence"]
+            }
+            total = r["total"]
+        
+        if not distribution:
+            return {
+                "success": True,
+                "message": "No emotion data available",
+                "distribution": {}
+            }
+        
+        return {
+            "success": True,
+            "team_id": team_id,
+            "period_days": days,
+            "distribution": distribution,
+            "total_entries": total,
+            "dominant_emotion": next(iter(distribution))
+        }
+    
     def aggregate_user_activity(
         self,
         days: int = 30
@@ -227,57 +515,22 @@ class AggregationService:
             dict: User activity data
         """
         try:
-            since = datetime.utcnow() - timedelta(days=days)
+            since = _utcnow() - timedelta(days=days)
             
             # Pipeline for active users
+            # Projection matches the (timestamp, user_id, stress_score) index
+            # plus timestamp, so only index keys are read for the window
             pipeline = [
                 {"$match": {"timestamp": {"$gte": since}}},
-                {
-                    "$group": {
-                        "_id": "$user_id",
-                        "entry_count": {"$sum": 1},
-                        "avg_stress": {"$avg": "$stress_score"},
-                        "last_activity": {"$max": "$timestamp"}
-                    }
-                },
-                {"$sort": {"entry_count": -1}}
+                {"$project": {"_id": 0, "user_id": 1, "stress_score": 1, "timestamp": 1}}
+            ] + self._user_activity_stages() + [
+                {"$facet": self._user_activity_facets()}
             ]
             
-            results = list(self.db.mood_entries.aggregate(pipeline))
-            
-            # Statistics
-            total_users = len(results)
-            total_entries = sum(r["entry_count"] for r in results)
-            
-            # Active users (>= 5 entries)
-            active_users = [r for r in results if r["entry_count"] >= 5]
+            # One document back: system-wide counts plus the 10 most active users
+            result = list(self._aggregate(pipeline))
             
-            # High stress users
-            high_stress_users = [
-                r for r in results 
-                if r.get("avg_stress", 0) >= 7
-            ]
-            
-            return {
-                "success": True,
-                "period_days": days,
-                "statistics": {
-                    "total_users": total_users,
-                    "total_entries": total_entries,
-                    "avg_entries_per_user": round(total_entries / total_users, 1) if total_users > 0 else 0,
-                    "active_users_count": len(active_users),
-                    "high_stress_users_count": len(high_stress_users)
-                },
-                "top_active_users": [
-                    {
-                        "user_id": r["_id"],
-                        "entry_count": r["entry_count"],
-                        "avg_stress": round(r["avg_stress"], 2),
-                        "last_activity": r["last_activity"].isoformat()
-                    }
-                    for r in results[:10]
-                ]
-            }
+            return self._build_user_activity(days, result[0] if result else {})
             
         except Exception as e:
             logger.error(f"❌ Error aggregating user activity: {e}", exc_info=True)
@@ -286,6 +539,79 @@ class AggregationService:
                 "error": str(e)
             }
     
+    @staticmethod
+    def _user_activity_stages() -> List[Dict[str, Any]]:
+        """Per-user entry count, average stress and last activity stage"""
+        return [
+            {
+                "$group": {
+                    "_id": "$user_id",
+                    "entry_count": {"$sum": 1},
+                    "avg_stress": {"$avg": "$stress_score"},
+                    "last_activity": {"$max": "$timestamp"}
+                }
+            }
+        ]
+    
+    @staticmethod
+    def _user_activity_facets() -> Dict[str, List[Dict[str, Any]]]:
+        """$facet branches over per-user rows: system-wide counts and the 10 most active users"""
+        return {
+            "stats": [
+                {
+                    "$group": {
+                        "_id": None,
+                        "total_users": {"$sum": 1},
+                        "total_entries": {"$sum": "$entry_count"},
+                        "active_users_count": {  # >= 5 entries
+                            "$sum": {"$cond": [{"$gte": ["$entry_count", 5]}, 1, 0]}
+                        },
+                        "high_stress_users_count": {
+                            "$sum": {"$cond": [{"$gte": ["$avg_stress", 7]}, 1, 0]}
+                        }
+                    }
+                }
+            ],
+            "top": [
+                {"$sort": {"entry_count": -1}},
+                {"$limit": 10}
+            ]
+        }
+    
+    @staticmethod
+    def _build_user_activity(
+        days: int,
+        facets: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Shape the stats/top facets into the user activity response"""
+        stats = facets.get("stats") or [{}]
+        
+        total_users = stats[0].get("total_users", 0)
+        total_entries = stats[0].get("total_entries", 0)
+        
+        top_active_users = [
+            {
+                "user_id": r["_id"],
+                "entry_count": r["entry_count"],
+                "avg_stress": round(r["avg_stress"], 2),
+                "last_activity": r["last_activity"].isoformat()
+            }
+            for r in facets.get("top", [])
+        ]
+        
+        return {
+            "success": True,
+            "period_days": days,
+            "statistics": {
+                "total_users": total_users,
+                "total_entries": total_entries,
+                "avg_entries_per_user": round(total_entries / total_users, 1) if total_users > 0 else 0,
+                "active_users_count": stats[0].get("active_users_count", 0),
+                "high_stress_users_count": stats[0].get("high_stress_users_count", 0)
+            },
+            "top_active_users": top_active_users
+        }
+    
     def generate_team_report(
         self,
         team_id: str,
@@ -301,11 +627,30 @@ class AggregationService:
         Returns:
             dict: Comprehensive team report
         """
+        cache_key = ("team_report", team_id, days)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._generate_team_report(team_id, days)
+        self._set_cache(cache_key, result)
+        return result
+    
+    def _generate_team_report(
+        self,
+        team_id: str,
+        days: int
+    ) -> Dict[str, Any]:
+        """Build the team report (uncached)"""
         try:
             logger.info(f"📊 Generating team report for {team_id}")
             
+            # One reference time so every query covers the same window
+            now = _utcnow()
+            since = now - timedelta(days=days)
+            
             # Get team info
-            team = self.db.teams.find_one({"team_id": team_id})
+            team = self._get_team_cached(team_id)
             
             if not team:
                 return {
@@ -313,46 +658,34 @@ class AggregationService:
                     "error": f"Team {team_id} not found"
                 }
             
-            # Get all data
-            stress_data = self.aggregate_team_stress(team_id, days)
-            emotion_data = self.aggregate_emotion_distribution(team_id, days)
-            
-            # Get member details
             member_ids = team.get("members", [])
-            members = []
             
-            for user_id in member_ids:
-                # Get user stress stats
-                user_stats = self._get_user_stress_stats(user_id, days)
-                members.append(user_stats)
+            # Stress and emotion facets share one scan of the team's entries;
+            # run it concurrently with the member stats query
+            match_stage = {"timestamp": {"$gte": since}}
+            if member_ids:
+                match_stage["user_id"] = {"$in": member_ids}
             
-            # Sort members by avg stress
-            members.sort(key=lambda x: x.get("avg_stress", 0), reverse=True)
+            # Inactive teams: one indexed lookup instead of the full pipelines
+            has_entries = self.mood_reports.find_one(match_stage, {"_id": 1}) is not None
             
-            # Generate recommendations
-            recommendations = self._generate_team_recommendations(
-                stress_data.get("data", {}),
-                emotion_data.get("distribution", {}),
-                members
-            )
+            if has_entries:
+                team_future = self._executor.submit(
+                    self._aggregate_team_facets, team_id, days, match_stage
+                )
+                
+                # Get member details
+                member_stats = self._get_users_stress_stats_bulk(member_ids, since)
+                
+                stress_data, emotion_data = team_future.result()
+            else:
+                member_stats = {}
+                stress_data = self._build_team_stress(team_id, days, {})
+                emotion_data = self._build_emotion_distribution(team_id, days, [])
             
-            return {
-                "success": True,
-                "team_id": team_id,
-                "team_name": team.get("name"),
-                "period_days": days,
-                "generated_at": datetime.utcnow().isoformat(),
-                "overview": {
-                    "member_count": len(members),
-                    "overall_avg_stress": stress_data.get("data", {}).get("overall_avg_stress", 0),
-                    "dominant_emotion": emotion_data.get("dominant_emotion", "Unknown"),
-                    "high_stress_members": sum(1 for m in members if m.get("avg_stress", 0) >= 7)
-                },
-                "stress_analysis": stress_data.get("data", {}),
-                "emotion_analysis": emotion_data.get("distribution", {}),
-                "members": members,
-                "recommendations": recommendations
-            }
+            return self._build_team_report(
+                team, days, now, stress_data, emotion_data, member_stats
+            )
             
         except Exception as e:
             logger.error(f"❌ Error generating team report: {e}", exc_info=True)
@@ -361,64 +694,282 @@ class AggregationService:
                 "error": str(e)
             }
     
-    def _get_user_stress_stats(
+    def generate_team_reports_bulk(
         self,
-        user_id: str,
-        days: int
-    ) -> Dict[str, Any]:
-        """Get stress statistics for a user"""
+        team_ids: List[str],
+        days: int = 30
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate reports for several teams with a single pipeline
+        
+        Teams are matched in the teams collection and each one $lookup-s its
+        members' mood entries, so uncached teams cost one round trip in total
+        instead of several per team.
+        
+        Args:
+            team_ids: Team IDs
+            days: Number of days to analyze
+        
+        Returns:
+            dict: Reports keyed by team ID (same shape as generate_team_report)
+        """
+        reports = {}
+        pending = []
+        
+        for team_id in dict.fromkeys(team_ids):
+            cached = self._get_cached(("team_report", team_id, days))
+            if cached is not None:
+                reports[team_id] = cached
+            else:
+                pending.append(team_id)
+        
+        if not pending:
+            return reports
+        
         try:
-            since = datetime.utcnow() - timedelta(days=days)
+            logger.info(f"📊 Generating team reports for {len(pending)} teams")
+            
+            now = _utcnow()
+            since = now - timedelta(days=days)
+            
+            facets = self._team_stress_facets()
+            facets["emotion"] = self._emotion_distribution_stages()
+            facets["members"] = self._member_stats_stages()
             
             pipeline = [
+                {"$match": {"team_id": {"$in": pending}}},
                 {
-                    "$match": {
-                        "user_id": user_id,
-                        "timestamp": {"$gte": since}
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": None,
-                        "avg_stress": {"$avg": "$stress_score"},
-                        "max_stress": {"$max": "$stress_score"},
-                        "entry_count": {"$sum": 1},
-                        "dominant_emotions": {"$push": "$dominant_emotion"}
+                    "$lookup": {
+                        "from": "mood_entries",
+                        "let": {"members": {"$ifNull": ["$members", []]}},
+                        "pipeline": [
+                            {"$match": {"timestamp": {"$gte": since}}},
+                            {
+                                # Teams without members cover every entry,
+                                # as in generate_team_report
+                                "$match": {
+                                    "$expr": {
+                                        "$or": [
+                                            {"$eq": [{"$size": "$$members"}, 0]},
+                                            {"$in": ["$user_id", "$$members"]}
+                                        ]
+                                    }
+                                }
+                            },
+                            {
+                                "$project": {
+                                    "_id": 0,
+                                    "user_id": 1,
+                                    "stress_score": 1,
+                                    "dominant_emotion": 1,
+                                    "confidence": 1
+                                }
+                            },
+                            {"$facet": facets}
+                        ],
+                        "as": "aggregations"
                     }
                 }
             ]
             
-            result = list(self.db.mood_entries.aggregate(pipeline))
+            for team in self.team_reports.aggregate(pipeline, allowDiskUse=True):
+                team_id = team["team_id"]
+                team_facets = team["aggregations"][0] if team["aggregations"] else {}
+                
+                stress_data = self._build_team_stress(team_id, days, team_facets)
+                emotion_data = self._build_emotion_distribution(
+                    team_id, days, team_facets.get("emotion", [])
+                )
+                member_stats = self._build_member_stats(team_facets.get("members", []))
+                
+                report = self._build_team_report(
+                    team, days, now, stress_data, emotion_data, member_stats
+                )
+                
+                self._set_cache(("team_stress", team_id, days), stress_data)
+                self._set_cache(("emotion_distribution", team_id, days), emotion_data)
+                self._set_cache(("team_report", team_id, days), report)
+                reports[team_id] = report
             
-            if not result or result[0]["_id"] is None:
-                return {
-                    "user_id": user_id,
-                    "avg_stress": 0,
-                    "max_stress": 0,
-                    "entry_count": 0
-                }
+            for team_id in pending:
+                if team_id not in reports:
+                    reports[team_id] = {
+                        "success": False,
+                        "error": f"Team {team_id} not found"
+                    }
             
-            data = result[0]
+        except Exception as e:
+            logger.error(f"❌ Error generating team reports: {e}", exc_info=True)
+            for team_id in pending:
+                reports.setdefault(team_id, {
+                    "success": False,
+                    "error": str(e)
+                })
+        
+        return reports
+    
+    def _build_team_report(
+        self,
+        team: Dict[str, Any],
+        days: int,
+        now: datetime,
+        stress_data: Dict[str, Any],
+        emotion_data: Dict[str, Any],
+        member_stats: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Assemble a team report from its aggregated parts"""
+        members = [
+            member_stats.get(user_id) or
+            {"user_id": user_id, "avg_stress": 0, "max_stress": 0, "entry_count": 0}
+            for user_id in team.get("members", [])
+        ]
+        
+        # Sort members by avg stress
+        members.sort(key=lambda x: x.get("avg_stress", 0), reverse=True)
+        
+        # Generate recommendations
+        recommendations = self._generate_team_recommendations(
+            stress_data.get("data", {}),
+            emotion_data.get("distribution", {}),
+            members
+        )
+        
+        return {
+            "success": True,
+            "team_id": team["team_id"],
+            "team_name": team.get("name"),
+            "period_days": days,
+            "generated_at": now.isoformat(),
+            "overview": {
+                "member_count": len(members),
+                "overall_avg_stress": stress_data.get("data", {}).get("overall_avg_stress", 0),
+                "dominant_emotion": emotion_data.get("dominant_emotion", "Unknown"),
+                "high_stress_members": sum(1 for m in members if m.get("avg_stress", 0) >= 7)
+            },
+            "stress_analysis": stress_data.get("data", {}),
+            "emotion_analysis": emotion_data.get("distribution", {}),
+            "members": members,
+            "recommendations": recommendations
+        }
+    
+    def _aggregate_team_facets(
+        self,
+        team_id: Optional[str],
+        days: int,
+        match_stage: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run the team stress and emotion distribution pipelines as one $facet scan
+        
+        Args:
+            team_id: Team ID the results are reported (and cached) under
+            days: Number of days covered by match_stage
+            match_stage: Shared $match filter
+        
+        Returns:
+            tuple: (team stress result, emotion distribution result)
+        """
+        facets = self._team_stress_facets()
+        facets["emotion"] = self._emotion_distribution_stages()
+        pipeline = [
+            {"$match": match_stage},
+            {"$project": {"_id": 0, "stress_score": 1, "dominant_emotion": 1, "confidence": 1}},
+            {"$facet": facets}
+        ]
+        
+        result = list(self._aggregate(pipeline))
+        team_facets = result[0] if result else {}
+        
+        stress_data = self._build_team_stress(team_id, days, team_facets)
+        emotion_data = self._build_emotion_distribution(
+            team_id, days, team_facets.get("emotion", [])
+        )
+        
+        # Seed the per-pipeline caches from the shared scan
+        self._set_cache(("team_stress", team_id, days), stress_data)
+        self._set_cache(("emotion_distribution", team_id, days), emotion_data)
+        
+        return stress_data, emotion_data
+    
+    def _get_users_stress_stats_bulk(
+        self,
+        user_ids: List[str],
+        since: datetime
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get stress statistics for several users since the given time
+        
+        Args:
+            user_ids: User IDs
+            since: Start of the window
+        
+        Returns:
+            dict: Stats keyed by user ID (users without entries are omitted)
+        """
+        try:
+            pipeline = [
+                {
+                    "$match": {
+                        "user_id": {"$in": user_ids},
+                        "timestamp": {"$gte": since}
+                    }
+                },
+                {"$project": {"_id": 0, "user_id": 1, "dominant_emotion": 1, "stress_score": 1}}
+            ] + self._member_stats_stages()
             
-            # Get most common emotion
-            from collections import Counter
-            emotion_counter = Counter(data.get("dominant_emotions", []))
-            most_common = emotion_counter.most_common(1)
+            return self._build_member_stats(self._aggregate(pipeline))
             
-            return {
-                "user_id": user_id,
-                "avg_stress": round(data.get("avg_stress", 0), 2),
-                "max_stress": data.get("max_stress", 0),
-                "entry_count": data.get("entry_count", 0),
-                "most_common_emotion": most_common[0][0] if most_common else "Unknown"
+        except Exception as e:
+            logger.error(f"Error getting member stress stats: {e}")
+            return {}
+    
+    @staticmethod
+    def _member_stats_stages() -> List[Dict[str, Any]]:
+        """
+        Per-user stress stats stages
+        
+        Count per (user, emotion) first, then fold into one document per
+        user whose first emotion (by count) is the most common one.
+        """
+        return [
+            {
+                "$group": {
+                    "_id": {"user_id": "$user_id", "emotion": "$dominant_emotion"},
+                    "count": {"$sum": 1},
+                    "stress_total": {"$sum": "$stress_score"},
+                    "max_stress": {"$max": "$stress_score"}
+                }
+            },
+            {"$sort": {"count": -1, "_id.emotion": 1}},
+            {
+                "$group": {
+                    "_id": "$_id.user_id",
+                    "most_common_emotion": {"$first": "$_id.emotion"},
+                    "entry_count": {"$sum": "$count"},
+                    "stress_total": {"$sum": "$stress_total"},
+                    "max_stress": {"$max": "$max_stress"}
+                }
             }
+        ]
+    
+    @staticmethod
+    def _build_member_stats(results: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Shape per-user rows into member stats keyed by user ID"""
+        stats = {}
+        for data in results:
+            entry_count = data["entry_count"]
+            if not entry_count:
+                continue
             
-        except Exception:
-            return {
-                "user_id": user_id,
-                "avg_stress": 0,
-                "entry_count": 0
+            stats[data["_id"]] = {
+                "user_id": data["_id"],
+                "avg_stress": round(data["stress_total"] / entry_count, 2),
+                "max_stress": data.get("max_stress", 0),
+                "entry_count": entry_count,
+                "most_common_emotion": data.get("most_common_emotion") or "Unknown"
             }
+        
+        return stats
     
     def _generate_team_recommendations(
         self,
@@ -434,17 +985,13 @@ class AggregationService:
             high_stress_count = stress_data.get("stress_distribution", {}).get("high", 0)
             
             # Stress-based recommendations
-            if avg_stress >= 7:
-                recommendations.append("🚨 URGENT: Team stress is critically high - immediate intervention needed")
-                recommendations.append("📅 Schedule team wellness session")
-                recommendations.append("📊 Review workload distribution across team")
-            elif avg_stress >= 5:
-                recommendations.append("⚠️ Elevated team stress - monitor closely")
-                recommendations.append("💡 Consider flexible work arrangements")
-                recommendations.append("🤝 Increase 1-on-1 check-ins")
-            elif avg_stress <= 3:
-                recommendations.append("✅ Team stress is well-managed")
-                recommendations.append("🌟 Maintain current wellness practices")
+            bucket = (
+                "critical" if avg_stress >= 7 else
+                "elevated" if avg_stress >= 5 else
+                "low" if avg_stress <= 3 else
+                None
+            )
+            recommendations.extend(TEAM_STRESS_RECOMMENDATIONS.get(bucket, ()))
             
             # Member-specific
             high_stress_members = [m for m in members if m.get("avg_stress", 0) >= 7]
@@ -455,19 +1002,21 @@ class AggregationService:
             
             # Emotion-based
             if emotion_data:
-                total = sum(d.get("count", 0) for d in emotion_data.values())
-                negative_count = sum(
-                    emotion_data.get(e, {}).get("count", 0)
-                    for e in ['Sad', 'Angry', 'Fear', 'Disgust']
-                )
+                total = 0
+                negative_count = 0
+                for emotion, d in emotion_data.items():
+                    count = d.get("count", 0)
+                    total += count
+                    if emotion in NEGATIVE_EMOTIONS:
+                        negative_count += count
                 
                 if total > 0 and (negative_count / total) > 0.4:
-                    recommendations.append("😔 High negative emotion prevalence - address team morale")
+                    recommendations.append(NEGATIVE_MOOD_RECOMMENDATION)
             
         except Exception as e:
             logger.error(f"Error generating recommendations: {e}")
         
-        return recommendations if recommendations else ["Team appears to be functioning well"]
+        return recommendations if recommendations else list(DEFAULT_TEAM_RECOMMENDATIONS)
     
     def analyze_stress_patterns(
         self,
@@ -485,37 +1034,78 @@ class AggregationService:
             dict: Pattern analysis
         """
         try:
-            since = datetime.utcnow() - timedelta(days=days)
+            since = _utcnow() - timedelta(days=days)
             
-            entries = list(
-                self.db.mood_entries.find({
-                    "user_id": user_id,
-                    "timestamp": {"$gte": since}
-                }).sort("timestamp", 1)
-            )
+            # Number entries chronologically, then reduce each half to
+            # count/sum/sum-of-squares so only two documents come back
+            pipeline = [
+                {
+                    "$match": {
+                        "user_id": user_id,
+                        "timestamp": {"$gte": since}
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "timestamp": 1,
+                        "stress_score": {"$ifNull": ["$stress_score", 0]}
+                    }
+                },
+                {
+                    "$setWindowFields": {
+                        "sortBy": {"timestamp": 1},
+                        "output": {
+                            "idx": {"$documentNumber": {}},
+                            "total": {
+                                "$count": {},
+                                "window": {"documents": ["unbounded", "unbounded"]}
+                            }
+                        }
+                    }
+                },
+                {
+                    "$group": {
+                        "_id": {
+                            "$cond": [
+                                {"$lte": ["$idx", {"$floor": {"$divide": ["$total", 2]}}]},
+                                "first",
+                                "second"
+                            ]
+                        },
+                        "count": {"$sum": 1},
+                        "stress_total": {"$sum": "$stress_score"},
+                        "stress_sq_total": {
+                            "$sum": {"$multiply": ["$stress_score", "$stress_score"]}
+                        }
+                    }
+                }
+            ]
             
-            if not entries:
+            halves = {r["_id"]: r for r in self._aggregate(pipeline)}
+            
+            if not halves:
                 return {
                     "success": True,
                     "message": "No data available",
                     "analysis": {}
                 }
             
-            stress_scores = [e.get("stress_score", 0) for e in entries]
-            
             # Calculate statistics
-            import numpy as np
+            total_entries = sum(h["count"] for h in halves.values())
+            stress_total = sum(h["stress_total"] for h in halves.values())
+            stress_sq_total = sum(h["stress_sq_total"] for h in halves.values())
             
-            avg_stress = np.mean(stress_scores)
-            std_stress = np.std(stress_scores)
+            avg_stress = stress_total / total_entries
+            std_stress = math.sqrt(max(stress_sq_total / total_entries - avg_stress * avg_stress, 0.0))
             
             # Determine trend
-            if len(stress_scores) >= 2:
-                first_half = stress_scores[:len(stress_scores)//2]
-                second_half = stress_scores[len(stress_scores)//2:]
+            if total_entries >= 2:
+                first_half = halves["first"]
+                second_half = halves["second"]
                 
-                first_avg = np.mean(first_half)
-                second_avg = np.mean(second_half)
+                first_avg = first_half["stress_total"] / first_half["count"]
+                second_avg = second_half["stress_total"] / second_half["count"]
                 
                 if second_avg > first_avg + 1:
                     trend = "increasing"
@@ -535,7 +1125,7 @@ class AggregationService:
                     "std_deviation": round(std_stress, 2),
                     "trend": trend,
                     "volatility": "high" if std_stress > 2 else "moderate" if std_stress > 1 else "low",
-                    "total_entries": len(entries)
+                    "total_entries": total_entries
                 }
             }
             
@@ -556,15 +1146,63 @@ class AggregationService:
         Returns:
             dict: System overview
         """
+        cache_key = ("system_overview", None, days)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._get_system_overview(days)
+        self._set_cache(cache_key, result)
+        return result
+    
+    def _get_system_overview(self, days: int) -> Dict[str, Any]:
+        """Build the system overview (uncached)"""
         try:
-            stress_data = self.aggregate_team_stress(None, days)
-            emotion_data = self.aggregate_emotion_distribution(None, days)
-            activity_data = self.aggregate_user_activity(days)
+            now = _utcnow()
+            
+            # Stress, emotion and activity branches share one scan of the window.
+            # $facet branches can't nest a $facet, so each activity branch
+            # regroups the entries per user itself
+            facets = self._team_stress_facets()
+            facets["emotion"] = self._emotion_distribution_stages()
+            for name, stages in self._user_activity_facets().items():
+                facets[f"activity_{name}"] = self._user_activity_stages() + stages
+            
+            pipeline = [
+                {"$match": {"timestamp": {"$gte": now - timedelta(days=days)}}},
+                {
+                    "$project": {
+                        "_id": 0,
+                        "user_id": 1,
+                        "timestamp": 1,
+                        "stress_score": 1,
+                        "dominant_emotion": 1,
+                        "confidence": 1
+                    }
+                },
+                {"$facet": facets}
+            ]
+            
+            result = list(self._aggregate(pipeline))
+            overview_facets = result[0] if result else {}
+            
+            stress_data = self._build_team_stress(None, days, overview_facets)
+            emotion_data = self._build_emotion_distribution(
+                None, days, overview_facets.get("emotion", [])
+            )
+            activity_data = self._build_user_activity(days, {
+                "stats": overview_facets.get("activity_stats"),
+                "top": overview_facets.get("activity_top", [])
+            })
+            
+            # Seed the system-wide caches from the shared scan
+            self._set_cache(("team_stress", None, days), stress_data)
+            self._set_cache(("emotion_distribution", None, days), emotion_data)
             
             return {
                 "success": True,
                 "period_days": days,
-                "generated_at": datetime.utcnow().isoformat(),
+                "generated_at": now.isoformat(),
                 "overview": {
                     "total_users": activity_data.get("statistics", {}).get("total_users", 0),
                     "total_entries": activity_data.get("statistics", {}).get("total_entries", 0),
@@ -4,10 +4,18 @@ Production-grade alert management with cooldown, daily limits, and severity hand
 """
 import sys
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 import logging
+import asyncio
+import atexit
+import threading
 from collections import defaultdict
+from bson import ObjectId
+from bson.errors import InvalidId
+from cachetools import TTLCache
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,16 +31,91 @@ if parent_dir not in sys.path:
 from backend.database.db import db_manager
 
 
+# Alerts index backing the cooldown lookup (created by db_manager)
+COOLDOWN_INDEX = [("user_id", ASCENDING), ("alert_type", ASCENDING), ("created_at", DESCENDING)]
+
+# Acknowledged alerts are purged by the alerts purge_at TTL index after this long
+ACKNOWLEDGED_ALERT_RETENTION_DAYS = 30
+
+# Index backing delete_old_alerts (created by db_manager)
+ACKNOWLEDGED_INDEX = [("acknowledged", ASCENDING), ("acknowledged_at", ASCENDING)]
+
+# Buffered alert writes are flushed at this interval (seconds) or batch size
+ALERT_FLUSH_INTERVAL = 0.1
+ALERT_FLUSH_BATCH_SIZE = 50
+
+# Queued alerts whose write keeps failing are dropped (and logged) after this
+# many attempts; during an outage each attempt waits out server selection
+ALERT_WRITE_MAX_ATTEMPTS = 5
+
+
+def _utcnow() -> datetime:
+    """Current UTC time, naive like the stored alert timestamps"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class AlertService:
     """
     Enhanced Alert Service with intelligent cooldown and severity management
     """
     
+    # Severity levels, lowest first
+    _SEVERITY_LEVELS = ('low', 'medium', 'high', 'critical')
+    _VALID_SEVERITIES = frozenset(_SEVERITY_LEVELS)
+    
+    # Hours an alert stays active, by severity
+    _EXPIRY_HOURS = {
+        'low': 24,
+        'medium': 48,
+        'high': 72,
+        'critical': 168  # 1 week
+    }
+    
     def __init__(self):
         self.db = db_manager.get_database()
         self.cooldown_minutes = 15  # Cooldown period between alerts
         self.daily_limit = 5  # Maximum alerts per user per day
-        self._alert_cache = defaultdict(list)  # In-memory cache
+        
+        # (user_id, alert_type) pairs alerted by this process within the
+        # cooldown, so most cooldown checks skip the database
+        self._cooldown_cache = TTLCache(maxsize=100_000, ttl=self.cooldown_minutes * 60)
+        
+        # Today's (UTC) alert count per user as last seen by this process.
+        # Counts only grow within a day, so a user at the limit is answered
+        # from memory; below it the database count decides, which includes
+        # alerts raised by other workers
+        self._daily_counts: Dict[str, int] = {}
+        self._daily_count_date = _utcnow().date()
+        
+        # Team member lists for team-scoped statistics; membership rarely changes
+        self._team_members_cache = TTLCache(maxsize=1024, ttl=300)  # 5 minutes cache
+        
+        self._cache_lock = threading.Lock()
+        
+        # Non-critical alerts are queued and written with insert_many by a
+        # background thread; reads flush the queue first. Acknowledgement
+        # rollup increments ride along in the writer's rollup bulk_write
+        self._write_buffer: List[Dict[str, Any]] = []
+        self._write_failures: Dict[ObjectId, int] = {}
+        self._pending_acks: List[tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._writer = threading.Thread(
+            target=self._flush_loop,
+            name="alert-writer",
+            daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.flush)
+        
+        # Statistics read the rollups only, so alerts written before the
+        # rollups existed are backfilled once in the background
+        threading.Thread(
+            target=self._backfill_rollups,
+            name="alert-rollup-backfill",
+            daemon=True
+        ).start()
+        
         logger.info("🚨 Alert Service initialized")
     
     def check_and_create_alert(
@@ -54,36 +137,29 @@ class AlertService:
             metadata: Additional metadata
         
         Returns:
-            dict: Alert creation result
+            dict: Alert creation result. A created alert has status "saved"
+                (critical, written before returning) or "queued" (handed to
+                the background writer, which retries failed writes and
+                discards, with a log line, alerts another worker already
+                raised in the same cooldown window)
         """
         try:
+            # One reference time for the checks and the new alert
+            now = _utcnow()
+            
             # Validate severity
-            valid_severities = ['low', 'medium', 'high', 'critical']
-            if severity not in valid_severities:
-                return {
-                    "success": False,
-                    "error": f"Invalid severity. Must be one of: {valid_severities}"
-                }
+            if severity not in self._VALID_SEVERITIES:
+                return self._invalid_severity_response()
             
             # Check cooldown
-            if self._is_in_cooldown(user_id, alert_type):
-                logger.info(f"⏰ Alert for {user_id} is in cooldown period")
-                return {
-                    "success": True,
-                    "alert_created": False,
-                    "reason": "cooldown_active",
-                    "message": f"Alert cooldown active ({self.cooldown_minutes} min)"
-                }
+            if self._is_in_cooldown(user_id, alert_type, now):
+                logger.info("⏰ Alert for %s is in cooldown period", user_id)
+                return self._cooldown_response()
             
             # Check daily limit
-            if self._exceeds_daily_limit(user_id):
-                logger.warning(f"⚠️ Daily alert limit reached for {user_id}")
-                return {
-                    "success": True,
-                    "alert_created": False,
-                    "reason": "daily_limit_reached",
-                    "message": f"Daily alert limit ({self.daily_limit}) reached"
-                }
+            if self._exceeds_daily_limit(user_id, now):
+                logger.warning("⚠️ Daily alert limit reached for %s", user_id)
+                return self._daily_limit_response()
             
             # Create alert
             alert = self._create_alert(
@@ -91,86 +167,301 @@ class AlertService:
                 alert_type,
                 severity,
                 message,
-                metadata
+                metadata,
+                now
             )
             
-            logger.info(f"🚨 Alert created for {user_id}: {alert_type} ({severity})")
+            if alert is None:
+                logger.info("⏰ Alert for %s already raised by another worker", user_id)
+                return self._cooldown_response()
             
+            logger.info("🚨 Alert created for %s: %s (%s)", user_id, alert_type, severity)
+            
+            return self._created_response(alert)
+            
+        except Exception as e:
+            logger.error("❌ Error creating alert: %s", e, exc_info=True)
             return {
-                "success": True,
-                "alert_created": True,
-                "alert": alert
+                "success": False,
+                "error": str(e)
             }
+    
+    async def check_and_create_alert_async(
+        self,
+        user_id: str,
+        alert_type: str,
+        severity: str,
+        message: str,
+        metadata: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        check_and_create_alert for event-loop callers
+        
+        Same checks and result as the sync method, but the database round
+        trips (cooldown and daily-limit misses, critical inserts) go through
+        motor so the loop keeps serving other requests. Without motor the
+        sync method runs in a worker thread.
+        
+        Args:
+            user_id: User ID
+            alert_type: Alert type (high_stress, critical_stress, etc.)
+            severity: Severity level (low/medium/high/critical)
+            message: Alert message
+            metadata: Additional metadata
+        
+        Returns:
+            dict: Alert creation result (see check_and_create_alert)
+        """
+        adb = db_manager.get_async_database()
+        if adb is None:
+            return await asyncio.to_thread(
+                self.check_and_create_alert, user_id, alert_type, severity, message, metadata
+            )
+        
+        try:
+            now = _utcnow()
+            
+            if severity not in self._VALID_SEVERITIES:
+                return self._invalid_severity_response()
+            
+            if await self._is_in_cooldown_async(adb, user_id, alert_type, now):
+                logger.info("⏰ Alert for %s is in cooldown period", user_id)
+                return self._cooldown_response()
+            
+            if await self._exceeds_daily_limit_async(adb, user_id, now):
+                logger.warning("⚠️ Daily alert limit reached for %s", user_id)
+                return self._daily_limit_response()
+            
+            alert = self._build_alert(user_id, alert_type, severity, message, metadata, now)
+            
+            if severity == "critical":
+                try:
+                    await adb.alerts.insert_one(alert)
+                except DuplicateKeyError:
+                    self._mark_cooldown(user_id, alert_type, now)
+                    logger.info("⏰ Alert for %s already raised by another worker", user_id)
+                    return self._cooldown_response()
+                
+                try:
+                    await adb.alert_stats_daily.bulk_write(self._rollup_updates([alert]), ordered=False)
+                except Exception as e:
+                    logger.error("Error updating alert rollups: %s", e)
+            else:
+                self._queue_alert(alert)
+            
+            logger.info("🚨 Alert created for %s: %s (%s)", user_id, alert_type, severity)
+            
+            return self._created_response(self._record_alert(alert))
             
         except Exception as e:
-            logger.error(f"❌ Error creating alert: {e}", exc_info=True)
+            logger.error("❌ Error creating alert: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
             }
     
-    def _is_in_cooldown(self, user_id: str, alert_type: str) -> bool:
+    def _invalid_severity_response(self) -> Dict[str, Any]:
+        """Result for an unknown severity level"""
+        return {
+            "success": False,
+            "error": f"Invalid severity. Must be one of: {list(self._SEVERITY_LEVELS)}"
+        }
+    
+    @staticmethod
+    def _created_response(alert: Dict[str, Any]) -> Dict[str, Any]:
+        """Result for a saved (critical) or queued alert"""
+        return {
+            "success": True,
+            "alert_created": True,
+            "status": "saved" if alert["severity"] == "critical" else "queued",
+            "alert": alert
+        }
+    
+    def _cooldown_response(self) -> Dict[str, Any]:
+        """Result for an alert suppressed by the cooldown"""
+        return {
+            "success": True,
+            "alert_created": False,
+            "reason": "cooldown_active",
+            "message": f"Alert cooldown active ({self.cooldown_minutes} min)"
+        }
+    
+    def _daily_limit_response(self) -> Dict[str, Any]:
+        """Result for an alert suppressed by the daily limit"""
+        return {
+            "success": True,
+            "alert_created": False,
+            "reason": "daily_limit_reached",
+            "message": f"Daily alert limit ({self.daily_limit}) reached"
+        }
+    
+    def _is_in_cooldown(self, user_id: str, alert_type: str, now: datetime) -> bool:
         """
         Check if user is in cooldown period for alert type
         
         Args:
             user_id: User ID
             alert_type: Alert type
+            now: Reference time (naive UTC)
         
         Returns:
             bool: True if in cooldown
         """
         try:
-            cooldown_time = datetime.utcnow() - timedelta(minutes=self.cooldown_minutes)
+            if self._cooldown_cached(user_id, alert_type):
+                return True
             
-            # Check database
-            recent_alert = self.db.alerts.find_one({
-                "user_id": user_id,
-                "alert_type": alert_type,
-                "created_at": {"$gte": cooldown_time}
-            })
+            # Check database (alerts created by other processes); only
+            # existence matters, so project an index key for a covered scan
+            recent_alert = self.db.alerts.find_one(
+                self._cooldown_filter(user_id, alert_type, now),
+                {"_id": 0, "created_at": 1},
+                hint=COOLDOWN_INDEX
+            )
+            
+            return recent_alert is not None
+            
+        except Exception as e:
+            logger.error("Error checking cooldown: %s", e)
+            return False
+    
+    async def _is_in_cooldown_async(self, adb, user_id: str, alert_type: str, now: datetime) -> bool:
+        """_is_in_cooldown over a motor database"""
+        try:
+            if self._cooldown_cached(user_id, alert_type):
+                return True
+            
+            recent_alert = await adb.alerts.find_one(
+                self._cooldown_filter(user_id, alert_type, now),
+                {"_id": 0, "created_at": 1},
+                hint=COOLDOWN_INDEX
+            )
             
             return recent_alert is not None
             
         except Exception as e:
-            logger.error(f"Error checking cooldown: {e}")
+            logger.error("Error checking cooldown: %s", e)
             return False
     
-    def _exceeds_daily_limit(self, user_id: str) -> bool:
+    def _cooldown_cached(self, user_id: str, alert_type: str) -> bool:
+        """Whether this process raised the alert type within the cooldown"""
+        with self._cache_lock:
+            return (user_id, alert_type) in self._cooldown_cache
+    
+    def _mark_cooldown(self, user_id: str, alert_type: str, created_at: datetime):
+        """Start the cooldown for an alert type in this process"""
+        with self._cache_lock:
+            self._cooldown_cache[(user_id, alert_type)] = created_at
+    
+    def _cooldown_filter(self, user_id: str, alert_type: str, now: datetime) -> Dict[str, Any]:
+        """Alerts filter for the alert type raised within the cooldown"""
+        return {
+            "user_id": user_id,
+            "alert_type": alert_type,
+            "created_at": {"$gte": now - timedelta(minutes=self.cooldown_minutes)}
+        }
+    
+    def _exceeds_daily_limit(self, user_id: str, now: datetime) -> bool:
         """
         Check if user has exceeded daily alert limit
         
         Args:
             user_id: User ID
+            now: Reference time (naive UTC)
         
         Returns:
             bool: True if limit exceeded
         """
         try:
-            today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            alert_count = self._daily_count_cached(user_id, now)
             
-            # Count today's alerts
-            alert_count = self.db.alerts.count_documents({
-                "user_id": user_id,
-                "created_at": {"$gte": today_start}
-            })
+            if alert_count is not None and alert_count >= self.daily_limit:
+                return True
+            
+            # Below the limit other workers may have raised alerts too, so
+            # count today's stored alerts plus this process's queued ones;
+            # only "limit reached" matters, so stop counting at the limit
+            alert_count = self._store_daily_count(
+                user_id,
+                now,
+                self.db.alerts.count_documents(
+                    self._daily_count_filter(user_id, now),
+                    limit=self.daily_limit
+                ) + self._queued_count(user_id)
+            )
+            
+            return alert_count >= self.daily_limit
+            
+        except Exception as e:
+            logger.error("Error checking daily limit: %s", e)
+            return False
+    
+    async def _exceeds_daily_limit_async(self, adb, user_id: str, now: datetime) -> bool:
+        """_exceeds_daily_limit over a motor database"""
+        try:
+            alert_count = self._daily_count_cached(user_id, now)
+            
+            if alert_count is not None and alert_count >= self.daily_limit:
+                return True
+            
+            alert_count = self._store_daily_count(
+                user_id,
+                now,
+                await adb.alerts.count_documents(
+                    self._daily_count_filter(user_id, now),
+                    limit=self.daily_limit
+                ) + self._queued_count(user_id)
+            )
             
             return alert_count >= self.daily_limit
             
         except Exception as e:
-            logger.error(f"Error checking daily limit: {e}")
+            logger.error("Error checking daily limit: %s", e)
             return False
     
+    def _daily_count_filter(self, user_id: str, now: datetime) -> Dict[str, Any]:
+        """Alerts filter for a user's alerts raised today (UTC)"""
+        return {
+            "user_id": user_id,
+            "created_at": {"$gte": self._rollup_day(now)}
+        }
+    
+    def _daily_count_cached(self, user_id: str, now: datetime) -> Optional[int]:
+        """Today's tracked alert count for a user (None until backfilled)"""
+        with self._cache_lock:
+            # New UTC day: every count starts over
+            if now.date() != self._daily_count_date:
+                self._daily_counts.clear()
+                self._daily_count_date = now.date()
+            return self._daily_counts.get(user_id)
+    
+    def _store_daily_count(self, user_id: str, now: datetime, alert_count: int) -> int:
+        """Track a database count, keeping a higher one recorded concurrently"""
+        with self._cache_lock:
+            if now.date() == self._daily_count_date:
+                alert_count = max(self._daily_counts.get(user_id, 0), alert_count)
+                self._daily_counts[user_id] = alert_count
+        return alert_count
+    
+    def _queued_count(self, user_id: str) -> int:
+        """Number of a user's alerts waiting for the background writer"""
+        with self._buffer_lock:
+            return sum(1 for alert in self._write_buffer if alert["user_id"] == user_id)
+    
     def _create_alert(
         self,
         user_id: str,
         alert_type: str,
         severity: str,
         message: str,
-        metadata: Optional[Dict]
-    ) -> Dict[str, Any]:
+        metadata: Optional[Dict],
+        now: datetime
+    ) -> Optional[Dict[str, Any]]:
         """
-        Create and save alert to database
+        Create an alert and save (or queue) it
+        
+        Critical alerts are written immediately; others are queued for the
+        background writer under a pre-generated ObjectId.
         
         Args:
             user_id: User ID
@@ -178,51 +469,260 @@ class AlertService:
             severity: Severity level
             message: Alert message
             metadata: Additional metadata
+            now: Creation time (naive UTC)
         
         Returns:
-            dict: Created alert document
+            dict: Created alert document, or None if another worker already
+                raised this alert type in the current cooldown window
         """
         try:
-            alert = {
-                "user_id": user_id,
-                "alert_type": alert_type,
-                "severity": severity,
-                "message": message,
-                "metadata": metadata or {},
-                "acknowledged": False,
-                "acknowledged_at": None,
-                "created_at": datetime.utcnow(),
-                "expires_at": self._calculate_expiry(severity)
-            }
+            alert = self._build_alert(user_id, alert_type, severity, message, metadata, now)
             
             # Save to database
-            result = self.db.alerts.insert_one(alert)
-            alert["_id"] = str(result.inserted_id)
+            if severity == "critical":
+                try:
+                    self.db.alerts.insert_one(alert)
+                except DuplicateKeyError:
+                    self._mark_cooldown(user_id, alert_type, now)
+                    return None
+                self._update_rollups([alert])
+            else:
+                self._queue_alert(alert)
             
-            # Cache in memory
-            self._alert_cache[user_id].append({
-                "alert_id": str(result.inserted_id),
-                "created_at": alert["created_at"],
-                "alert_type": alert_type
-            })
-            
-            return alert
+            return self._record_alert(alert)
             
         except Exception as e:
-            logger.error(f"Error creating alert document: {e}")
+            logger.error("Error creating alert document: %s", e)
             raise
     
-    def _calculate_expiry(self, severity: str) -> datetime:
-        """Calculate alert expiry time based on severity"""
-        expiry_hours = {
-            'low': 24,
-            'medium': 48,
-            'high': 72,
-            'critical': 168  # 1 week
+    def _build_alert(
+        self,
+        user_id: str,
+        alert_type: str,
+        severity: str,
+        message: str,
+        metadata: Optional[Dict],
+        now: datetime
+    ) -> Dict[str, Any]:
+        """New alert document under a pre-generated ObjectId"""
+        # The unique (user_id, alert_type, cooldown_bucket) index lets the
+        # database reject a racing duplicate from another worker
+        cooldown_bucket = int(now.replace(tzinfo=timezone.utc).timestamp() // (self.cooldown_minutes * 60))
+        
+        return {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "alert_type": alert_type,
+            "severity": severity,
+            "message": message,
+            "metadata": metadata or {},
+            "acknowledged": False,
+            "acknowledged_at": None,
+            "created_at": now,
+            "expires_at": self._calculate_expiry(severity, now),
+            "cooldown_bucket": cooldown_bucket
         }
+    
+    def _queue_alert(self, alert: Dict[str, Any]):
+        """Queue an alert for the background writer"""
+        with self._buffer_lock:
+            self._write_buffer.append(alert)
+            if len(self._write_buffer) >= ALERT_FLUSH_BATCH_SIZE:
+                self._flush_requested.set()
+    
+    def _record_alert(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Count a saved (or queued) alert in the in-process caches
+        
+        Returns:
+            dict: The alert as returned to callers
+        """
+        user_id = alert["user_id"]
+        with self._cache_lock:
+            self._cooldown_cache[(user_id, alert["alert_type"])] = alert["created_at"]
+            if user_id in self._daily_counts and alert["created_at"].date() == self._daily_count_date:
+                self._daily_counts[user_id] += 1
         
-        hours = expiry_hours.get(severity, 24)
-        return datetime.utcnow() + timedelta(hours=hours)
+        response = {**alert, "_id": str(alert["_id"])}
+        response.pop("cooldown_bucket")
+        return response
+    
+    def flush(self):
+        """Write all queued alerts and acknowledgement rollups to the database"""
+        with self._buffer_lock:
+            batch, self._write_buffer = self._write_buffer, []
+            acks, self._pending_acks = self._pending_acks, []
+        
+        if not batch:
+            if acks:
+                self._update_rollups([], acks)
+            return
+        
+        written, retry, cooldown_hits = batch, [], []
+        try:
+            self.db.alerts.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            failed = set()
+            retry_errors = []
+            
+            for error in write_errors:
+                if error.get("code") == 11000:
+                    # Duplicate _id: stored by an earlier, failed attempt
+                    if error.get("keyPattern") == {"_id": 1}:
+                        continue
+                    # Duplicate cooldown bucket: another worker raised it
+                    failed.add(error["index"])
+                    cooldown_hits.append(batch[error["index"]])
+                else:
+                    failed.add(error["index"])
+                    retry.append(batch[error["index"]])
+                    retry_errors.append(error)
+            
+            if retry:
+                logger.error(
+                    "❌ Error writing %s queued alerts: %s",
+                    len(retry), retry_errors[0].get("errmsg")
+                )
+            
+            written = [alert for i, alert in enumerate(batch) if i not in failed]
+        except Exception as e:
+            logger.error("❌ Error writing %s queued alerts: %s", len(batch), e)
+            written, retry = [], batch
+        
+        if cooldown_hits:
+            self._discard_cooldown_hits(cooldown_hits)
+        
+        self._requeue_failed(written, retry)
+        self._update_rollups(written, acks)
+    
+    def _discard_cooldown_hits(self, alerts: List[Dict[str, Any]]):
+        """
+        Account for queued alerts the cooldown_bucket index rejected
+        
+        Another worker stored the same alert type in the same cooldown
+        window first, so these were cooldown hits after all: they no longer
+        count toward the daily limit and are logged by id, since callers
+        were already told they were queued.
+        
+        Args:
+            alerts: Queued alerts rejected as cooldown duplicates
+        """
+        with self._cache_lock:
+            for alert in alerts:
+                user_id = alert["user_id"]
+                if self._daily_counts.get(user_id) and alert["created_at"].date() == self._daily_count_date:
+                    self._daily_counts[user_id] -= 1
+        
+        logger.warning(
+            "⏰ Discarded %s queued alerts already raised by another worker in their cooldown window: %s",
+            len(alerts), [str(alert["_id"]) for alert in alerts]
+        )
+    
+    def _requeue_failed(self, written: List[Dict[str, Any]], failed: List[Dict[str, Any]]):
+        """
+        Queue failed alert writes for another attempt
+        
+        Alerts that failed ALERT_WRITE_MAX_ATTEMPTS times are dropped and
+        logged by id.
+        
+        Args:
+            written: Alerts stored by the last flush
+            failed: Alerts the last flush could not store
+        """
+        dropped = []
+        with self._buffer_lock:
+            if self._write_failures:
+                for alert in written:
+                    self._write_failures.pop(alert["_id"], None)
+            
+            retry = []
+            for alert in failed:
+                failures = self._write_failures.pop(alert["_id"], 0) + 1
+                if failures >= ALERT_WRITE_MAX_ATTEMPTS:
+                    dropped.append(alert)
+                else:
+                    self._write_failures[alert["_id"]] = failures
+                    retry.append(alert)
+            
+            self._write_buffer[:0] = retry
+        
+        if dropped:
+            logger.error(
+                "❌ Dropping %s alerts after %s failed writes: %s",
+                len(dropped), ALERT_WRITE_MAX_ATTEMPTS, [str(alert["_id"]) for alert in dropped]
+            )
+    
+    @staticmethod
+    def _rollup_day(moment: datetime) -> datetime:
+        """Midnight (UTC) of the day an alert_stats_daily rollup covers"""
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    def _update_rollups(self, alerts: List[Dict[str, Any]], acks: Optional[List[tuple]] = None):
+        """
+        Add newly written alerts and acknowledgements to the per-user daily
+        alert_stats_daily rollups in one bulk_write
+        
+        Args:
+            alerts: Alert documents that were just inserted
+            acks: (user_id, rollup day, response minutes) per acknowledgement
+        """
+        requests = self._rollup_updates(alerts) + self._ack_rollup_updates(acks or [])
+        if not requests:
+            return
+        
+        try:
+            self.db.alert_stats_daily.bulk_write(requests, ordered=False)
+        except Exception as e:
+            logger.error("Error updating alert rollups: %s", e)
+    
+    def _rollup_updates(self, alerts: List[Dict[str, Any]]) -> List[UpdateOne]:
+        """Upserting $inc updates adding alerts to their (user, day) rollups"""
+        increments = defaultdict(lambda: defaultdict(int))
+        for alert in alerts:
+            inc = increments[(alert["user_id"], self._rollup_day(alert["created_at"]))]
+            inc["total"] += 1
+            inc[f"by_severity.{alert['severity']}"] += 1
+            inc[f"by_type.{alert['alert_type']}"] += 1
+        
+        return [
+            UpdateOne(
+                {"user_id": user_id, "date": day},
+                {"$inc": dict(inc)},
+                upsert=True
+            )
+            for (user_id, day), inc in increments.items()
+        ]
+    
+    @staticmethod
+    def _ack_rollup_updates(acks: List[tuple]) -> List[UpdateOne]:
+        """Upserting $inc updates adding acknowledgements to their (user, day) rollups"""
+        increments = defaultdict(lambda: defaultdict(float))
+        for user_id, day, response_minutes in acks:
+            inc = increments[(user_id, day)]
+            inc["ack_count"] += 1
+            inc["response_minutes_total"] += response_minutes
+        
+        return [
+            UpdateOne(
+                {"user_id": user_id, "date": day},
+                {"$inc": {"ack_count": int(inc["ack_count"]), "response_minutes_total": inc["response_minutes_total"]}},
+                upsert=True
+            )
+            for (user_id, day), inc in increments.items()
+        ]
+    
+    def _flush_loop(self):
+        """Background writer: flush on interval or when a batch fills up"""
+        while True:
+            self._flush_requested.wait(ALERT_FLUSH_INTERVAL)
+            self._flush_requested.clear()
+            self.flush()
+    
+    def _calculate_expiry(self, severity: str, created_at: datetime) -> datetime:
+        """Calculate alert expiry time based on severity"""
+        hours = self._EXPIRY_HOURS.get(severity, 24)
+        return created_at + timedelta(hours=hours)
     
     def get_user_alerts(
         self,
@@ -241,44 +741,79 @@ class AlertService:
         Returns:
             dict: User alerts
         """
+        self.flush()
+        
         try:
             query = {"user_id": user_id}
             
             if not include_acknowledged:
                 query["acknowledged"] = False
             
-            alerts = list(
-                self.db.alerts
-                .find(query)
-                .sort("created_at", -1)
-                .limit(limit)
-            )
+            # Ids are stringified by the server; one batch holds the page
+            pipeline = [
+                {"$match": query},
+                {"$sort": {"created_at": -1}},
+                {"$limit": limit}
+            ] + self._alert_output_stages()
             
-            # Convert ObjectId to string
-            for alert in alerts:
-                alert["_id"] = str(alert["_id"])
+            alerts = list(self.db.alerts.aggregate(pipeline, batchSize=limit))
             
             # Group by severity
             by_severity = defaultdict(list)
+            unacknowledged_count = 0
             for alert in alerts:
                 by_severity[alert["severity"]].append(alert)
+                if not alert.get("acknowledged"):
+                    unacknowledged_count += 1
             
             return {
                 "success": True,
                 "user_id": user_id,
                 "alerts": alerts,
                 "total_count": len(alerts),
-                "unacknowledged_count": sum(1 for a in alerts if not a.get("acknowledged")),
+                "unacknowledged_count": unacknowledged_count,
                 "by_severity": dict(by_severity)
             }
             
         except Exception as e:
-            logger.error(f"❌ Error getting user alerts: {e}", exc_info=True)
+            logger.error("❌ Error getting user alerts: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    def _get_team_members_cached(self, team_id: str) -> Optional[List[str]]:
+        """
+        Get a team's member IDs, reusing recent lookups
+        
+        Args:
+            team_id: Team ID
+        
+        Returns:
+            list: Member user IDs or None if the team is not found
+        """
+        with self._cache_lock:
+            members = self._team_members_cache.get(team_id)
+        if members is not None:
+            return members
+        
+        team = self.db.teams.find_one({"team_id": team_id}, {"_id": 0, "members": 1})
+        if team is None:
+            return None
+        
+        members = team.get("members", [])
+        with self._cache_lock:
+            self._team_members_cache[team_id] = members
+        return members
+    
+    @staticmethod
+    def _alert_output_stages() -> List[Dict[str, Any]]:
+        """Stages shaping alert documents for API output (string ids, no bookkeeping fields)"""
+        return [
+            {"$project": {"cooldown_bucket": 0, "purge_at": 0}},
+            {"$addFields": {"_id": {"$toString": "$_id"}}}
+        ]
+    
     def acknowledge_alert(
         self,
         alert_id: str,
@@ -296,41 +831,58 @@ class AlertService:
         Returns:
             dict: Acknowledgement result
         """
+        self.flush()
+        
         try:
-            from bson import ObjectId
+            object_id = ObjectId(alert_id)
             
-            # Verify alert belongs to user
-            alert = self.db.alerts.find_one({
-                "_id": ObjectId(alert_id),
-                "user_id": user_id
-            })
+            now = _utcnow()
+            update_data = {
+                "acknowledged": True,
+                "acknowledged_at": now,
+                "acknowledgement_note": acknowledgement_note,
+                "purge_at": now + timedelta(days=ACKNOWLEDGED_ALERT_RETENTION_DAYS)
+            }
             
-            if not alert:
-                return {
-                    "success": False,
-                    "error": "Alert not found or does not belong to user"
-                }
+            # Acknowledge in one round trip when the alert is the user's and
+            # still open; only a miss needs a lookup to explain why
+            alert = self.db.alerts.find_one_and_update(
+                {
+                    "_id": object_id,
+                    "user_id": user_id,
+                    "acknowledged": {"$ne": True}
+                },
+                {"$set": update_data},
+                projection={"_id": 0, "created_at": 1}
+            )
             
-            if alert.get("acknowledged"):
+            if alert is None:
+                alert = self.db.alerts.find_one(
+                    {"_id": object_id, "user_id": user_id},
+                    {"acknowledged_at": 1}
+                )
+                
+                if not alert:
+                    return {
+                        "success": False,
+                        "error": "Alert not found or does not belong to user"
+                    }
+                
                 return {
                     "success": True,
                     "message": "Alert already acknowledged",
                     "acknowledged_at": alert.get("acknowledged_at")
                 }
             
-            # Update alert
-            update_data = {
-                "acknowledged": True,
-                "acknowledged_at": datetime.utcnow(),
-                "acknowledgement_note": acknowledgement_note
-            }
+            # Count the acknowledgement on the day the alert was raised; the
+            # background writer applies it with the next rollup bulk_write
+            response_minutes = (update_data["acknowledged_at"] - alert["created_at"]).total_seconds() / 60
+            with self._buffer_lock:
+                self._pending_acks.append(
+                    (user_id, self._rollup_day(alert["created_at"]), response_minutes)
+                )
             
-            self.db.alerts.update_one(
-                {"_id": ObjectId(alert_id)},
-                {"$set": update_data}
-            )
-            
-            logger.info(f"✅ Alert {alert_id} acknowledged by {user_id}")
+            logger.info("✅ Alert %s acknowledged by %s", alert_id, user_id)
             
             return {
                 "success": True,
@@ -338,8 +890,13 @@ class AlertService:
                 "acknowledged_at": update_data["acknowledged_at"].isoformat()
             }
             
+        except InvalidId:
+            return {
+                "success": False,
+                "error": f"Invalid alert ID: {alert_id}"
+            }
         except Exception as e:
-            logger.error(f"❌ Error acknowledging alert: {e}", exc_info=True)
+            logger.error("❌ Error acknowledging alert: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
@@ -362,9 +919,42 @@ class AlertService:
         Returns:
             dict: Team alerts
         """
+        self.flush()
+        
         try:
-            # Get team members
-            team = self.db.teams.find_one({"team_id": team_id})
+            alert_filter = {"acknowledged": False}
+            if severity_filter:
+                alert_filter["severity"] = severity_filter
+            
+            # Team and its members' open alerts in one round trip; the
+            # localField join matches alerts per member on the user_id index
+            pipeline = [
+                {"$match": {"team_id": team_id}},
+                {"$limit": 1},
+                {
+                    "$lookup": {
+                        "from": "alerts",
+                        "localField": "members",
+                        "foreignField": "user_id",
+                        "pipeline": [
+                            {"$match": alert_filter},
+                            {"$sort": {"created_at": -1}},
+                            {"$limit": limit}
+                        ] + self._alert_output_stages(),
+                        "as": "alerts"
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "name": 1,
+                        "member_count": {"$size": {"$ifNull": ["$members", []]}},
+                        "alerts": 1
+                    }
+                }
+            ]
+            
+            team = next(self.db.teams.aggregate(pipeline), None)
             
             if not team:
                 return {
@@ -372,9 +962,7 @@ class AlertService:
                     "error": f"Team {team_id} not found"
                 }
             
-            member_ids = team.get("members", [])
-            
-            if not member_ids:
+            if not team["member_count"]:
                 return {
                     "success": True,
                     "team_id": team_id,
@@ -382,26 +970,7 @@ class AlertService:
                     "message": "No team members found"
                 }
             
-            # Build query
-            query = {
-                "user_id": {"$in": member_ids},
-                "acknowledged": False
-            }
-            
-            if severity_filter:
-                query["severity"] = severity_filter
-            
-            # Get alerts
-            alerts = list(
-                self.db.alerts
-                .find(query)
-                .sort("created_at", -1)
-                .limit(limit)
-            )
-            
-            # Convert ObjectIds
-            for alert in alerts:
-                alert["_id"] = str(alert["_id"])
+            alerts = team["alerts"]
             
             # Statistics
             severity_counts = defaultdict(int)
@@ -423,7 +992,7 @@ class AlertService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Error getting team alerts: {e}", exc_info=True)
+            logger.error("❌ Error getting team alerts: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
@@ -433,21 +1002,30 @@ class AlertService:
         """
         Delete old acknowledged alerts
         
+        Alerts acknowledged since purge_at was introduced are removed by the
+        TTL index after ACKNOWLEDGED_ALERT_RETENTION_DAYS; this covers older
+        ones and shorter retention periods.
+        
         Args:
             days: Delete alerts older than this many days
         
         Returns:
             dict: Deletion result
         """
+        self.flush()
+        
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            cutoff_date = _utcnow() - timedelta(days=days)
             
-            result = self.db.alerts.delete_many({
-                "acknowledged": True,
-                "acknowledged_at": {"$lt": cutoff_date}
-            })
+            result = self.db.alerts.delete_many(
+                {
+                    "acknowledged": True,
+                    "acknowledged_at": {"$lt": cutoff_date}
+                },
+                hint=ACKNOWLEDGED_INDEX
+            )
             
-            logger.info(f"🗑️ Deleted {result.deleted_count} old alerts")
+            logger.info("🗑️ Deleted %s old alerts", result.deleted_count)
             
             return {
                 "success": True,
@@ -456,7 +1034,7 @@ class AlertService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Error deleting old alerts: {e}", exc_info=True)
+            logger.error("❌ Error deleting old alerts: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
@@ -471,6 +1049,10 @@ class AlertService:
         """
         Get alert statistics
         
+        Computed from the alert_stats_daily rollups kept up to date by the
+        alert writer and acknowledge_alert (rebuild_alert_rollups backfills
+        them), so whole days are counted.
+        
         Args:
             user_id: Optional user ID filter
             team_id: Optional team ID filter
@@ -479,22 +1061,48 @@ class AlertService:
         Returns:
             dict: Alert statistics
         """
+        self.flush()
+        
         try:
-            since = datetime.utcnow() - timedelta(days=days)
-            query = {"created_at": {"$gte": since}}
+            # Rollups cover whole UTC days, so the window starts at midnight
+            since = self._rollup_day(_utcnow() - timedelta(days=days))
+            query = {"date": {"$gte": since}}
             
             # Apply filters
             if user_id:
                 query["user_id"] = user_id
             elif team_id:
-                team = self.db.teams.find_one({"team_id": team_id})
-                if team:
-                    query["user_id"] = {"$in": team.get("members", [])}
+                members = self._get_team_members_cached(team_id)
+                if members is not None:
+                    query["user_id"] = {"$in": members}
+            
+            # Reduce the (user, day) rollups instead of the raw alerts
+            pipeline = [
+                {"$match": query},
+                {
+                    "$facet": {
+                        "totals": [
+                            {
+                                "$group": {
+                                    "_id": None,
+                                    "total": {"$sum": "$total"},
+                                    "acknowledged": {"$sum": "$ack_count"},
+                                    "response_minutes_total": {"$sum": "$response_minutes_total"}
+                                }
+                            }
+                        ],
+                        "by_severity": self._rollup_breakdown_stages("by_severity"),
+                        "by_type": self._rollup_breakdown_stages("by_type")
+                    }
+                }
+            ]
             
-            # Get alerts
-            alerts = list(self.db.alerts.find(query))
+            result = list(self.db.alert_stats_daily.aggregate(pipeline))
+            facets = result[0] if result else {}
+            totals = (facets.get("totals") or [{}])[0]
+            total = totals.get("total") or 0
             
-            if not alerts:
+            if not total:
                 return {
                     "success": True,
                     "period_days": days,
@@ -502,25 +1110,12 @@ class AlertService:
                     "statistics": {}
                 }
             
-            # Calculate statistics
-            total = len(alerts)
-            acknowledged = sum(1 for a in alerts if a.get("acknowledged"))
-            
-            severity_counts = defaultdict(int)
-            type_counts = defaultdict(int)
-            
-            for alert in alerts:
-                severity_counts[alert["severity"]] += 1
-                type_counts[alert["alert_type"]] += 1
+            acknowledged = totals.get("acknowledged", 0)
+            severity_counts = {r["_id"]: r["count"] for r in facets.get("by_severity", []) if r["count"]}
+            type_counts = {r["_id"]: r["count"] for r in facets.get("by_type", []) if r["count"]}
             
             # Response time (time to acknowledge)
-            response_times = []
-            for alert in alerts:
-                if alert.get("acknowledged") and alert.get("acknowledged_at"):
-                    delta = (alert["acknowledged_at"] - alert["created_at"]).total_seconds() / 60
-                    response_times.append(delta)
-            
-            avg_response = sum(response_times) / len(response_times) if response_times else 0
+            avg_response = totals.get("response_minutes_total", 0) / acknowledged if acknowledged else 0
             
             return {
                 "success": True,
@@ -530,8 +1125,8 @@ class AlertService:
                     "acknowledged": acknowledged,
                     "unacknowledged": total - acknowledged,
                     "acknowledgement_rate": round((acknowledged / total) * 100, 1) if total > 0 else 0,
-                    "severity_breakdown": dict(severity_counts),
-                    "type_breakdown": dict(type_counts),
+                    "severity_breakdown": severity_counts,
+                    "type_breakdown": type_counts,
                     "avg_response_time_minutes": round(avg_response, 1),
                     "critical_count": severity_counts.get("critical", 0),
                     "high_count": severity_counts.get("high", 0)
@@ -539,12 +1134,179 @@ class AlertService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Error getting alert statistics: {e}", exc_info=True)
+            logger.error("❌ Error getting alert statistics: %s", e, exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def get_alert_summary(self, since: datetime) -> Dict[str, Any]:
+        """
+        Count alerts raised since a given time for dashboards
+        
+        Args:
+            since: Start of the window (naive UTC)
+        
+        Returns:
+            dict: unacknowledged_count and severity_breakdown
+        """
+        self.flush()
+        
+        try:
+            pipeline = [
+                {"$match": {"created_at": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": "$severity",
+                        "count": {"$sum": 1},
+                        "unacknowledged": {
+                            "$sum": {"$cond": [{"$eq": ["$acknowledged", False]}, 1, 0]}
+                        }
+                    }
+                }
+            ]
+            
+            severity_counts = {}
+            unacknowledged_count = 0
+            for r in self.db.alerts.aggregate(pipeline):
+                severity_counts[r["_id"]] = r["count"]
+                unacknowledged_count += r["unacknowledged"]
+            
+            return {
+                "unacknowledged_count": unacknowledged_count,
+                "severity_breakdown": severity_counts
+            }
+            
+        except Exception as e:
+            logger.error("Error getting alert summary: %s", e)
+            return {
+                "unacknowledged_count": 0,
+                "severity_breakdown": {}
+            }
+    
+    def _backfill_rollups(self):
+        """Rebuild every rollup once if no rebuild has ever run"""
+        try:
+            if self.db.alert_stats_daily.find_one({"rebuilt_at": {"$exists": True}}, {"_id": 1}) is None:
+                self.rebuild_alert_rollups(days=None)
+        except Exception as e:
+            logger.error("❌ Error backfilling alert rollups: %s", e)
+    
+    def rebuild_alert_rollups(self, days: Optional[int] = 30) -> Dict[str, Any]:
+        """
+        Recompute alert_stats_daily from the raw alerts
+        
+        Backfills alerts written before rollups existed and corrects any
+        missed increments. Counting is done by a $group pipeline; Python only
+        folds its (user, day, severity, type) rows into rollup documents,
+        which replace their (user, day) rollup by upsert. Past days in the
+        window left without alerts are removed.
+        
+        Args:
+            days: Number of days (whole UTC days) to rebuild; None rebuilds
+                all alerts
+        
+        Returns:
+            dict: Rebuild result
+        """
+        self.flush()
+        
+        try:
+            since = None if days is None else self._rollup_day(_utcnow() - timedelta(days=days))
+            rebuilt_at = _utcnow()
+            
+            pipeline = [
+                {"$match": {} if since is None else {"created_at": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "user_id": "$user_id",
+                            "date": {"$dateTrunc": {"date": "$created_at", "unit": "day"}},
+                            "severity": "$severity",
+                            "alert_type": "$alert_type"
+                        },
+                        "count": {"$sum": 1},
+                        "ack_count": {"$sum": {"$cond": ["$acknowledged", 1, 0]}},
+                        "response_ms_total": {
+                            "$sum": {
+                                "$cond": [
+                                    {"$and": ["$acknowledged", "$acknowledged_at"]},
+                                    {"$subtract": ["$acknowledged_at", "$created_at"]},
+                                    0
+                                ]
+                            }
+                        }
+                    }
+                }
+            ]
+            
+            rollups = {}
+            for row in self.db.alerts.aggregate(pipeline, allowDiskUse=True):
+                key = row["_id"]
+                rollup = rollups.setdefault((key["user_id"], key["date"]), {
+                    "user_id": key["user_id"],
+                    "date": key["date"],
+                    "total": 0,
+                    "by_severity": defaultdict(int),
+                    "by_type": defaultdict(int),
+                    "ack_count": 0,
+                    "response_minutes_total": 0.0,
+                    "rebuilt_at": rebuilt_at
+                })
+                rollup["total"] += row["count"]
+                rollup["by_severity"][key["severity"]] += row["count"]
+                rollup["by_type"][key["alert_type"]] += row["count"]
+                rollup["ack_count"] += row["ack_count"]
+                rollup["response_minutes_total"] += row["response_ms_total"] / 60000
+            
+            documents = [
+                {**r, "by_severity": dict(r["by_severity"]), "by_type": dict(r["by_type"])}
+                for r in rollups.values()
+            ]
+            
+            if documents:
+                self.db.alert_stats_daily.bulk_write(
+                    [
+                        ReplaceOne({"user_id": d["user_id"], "date": d["date"]}, d, upsert=True)
+                        for d in documents
+                    ],
+                    ordered=False
+                )
+            
+            # Past days this rebuild did not write have no alerts left; today
+            # is kept since the writer may have just started its rollup
+            stale = {"date": {"$lt": self._rollup_day(rebuilt_at)}, "rebuilt_at": {"$ne": rebuilt_at}}
+            if since is not None:
+                stale["date"]["$gte"] = since
+            self.db.alert_stats_daily.delete_many(stale)
+            
+            logger.info(
+                "📊 Rebuilt %s alert rollups since %s",
+                len(documents), since.date() if since else "the first alert"
+            )
+            
+            return {
+                "success": True,
+                "rollups_written": len(documents),
+                "since": since.isoformat() if since else None
+            }
+            
+        except Exception as e:
+            logger.error("❌ Error rebuilding alert rollups: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    @staticmethod
+    def _rollup_breakdown_stages(field: str) -> List[Dict[str, Any]]:
+        """Stages summing a rollup counter map (by_severity/by_type) per key"""
+        return [
+            {"$project": {"counts": {"$objectToArray": f"${field}"}}},
+            {"$unwind": "$counts"},
+            {"$group": {"_id": "$counts.k", "count": {"$sum": "$counts.v"}}}
+        ]
+    
     def set_cooldown_period(self, minutes: int):
         """Set alert cooldown period"""
         if minutes < 1 or minutes > 60:
@@ -552,7 +1314,12 @@ class AlertService:
             return
         
         self.cooldown_minutes = minutes
-        logger.info(f"✅ Cooldown period set to {minutes} minutes")
+        
+        # TTLCache has a fixed ttl; start over and let misses fall back to the database
+        with self._cache_lock:
+            self._cooldown_cache = TTLCache(maxsize=100_000, ttl=minutes * 60)
+        
+        logger.info("✅ Cooldown period set to %s minutes", minutes)
     
     def set_daily_limit(self, limit: int):
         """Set daily alert limit"""
@@ -561,7 +1328,11 @@ class AlertService:
             return
         
         self.daily_limit = limit
-        logger.info(f"✅ Daily alert limit set to {limit}")
+        
+        # Backfilled counts were capped at the old limit; recount on demand
+        with self._cache_lock:
+            self._daily_counts.clear()
+        logger.info("✅ Daily alert limit set to %s", limit)
 
 
 # Create global service instance
@@ -2,22 +2,50 @@
 Enhanced Recommendation Service for Amdox - ALIGNED WITH NOTEBOOK
 Context-aware task recommendations using Green/Yellow/Orange/Red zones
 """
-import sys
-import os
 from typing import Dict, List, Optional, Any
 import logging
+import re
+import threading
+import time
 from datetime import datetime
+import numpy as np
+from cachetools import LRUCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Add parent directory to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-backend_dir = os.path.dirname(current_dir)
-parent_dir = os.path.dirname(backend_dir)
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
+# First number in a task duration such as '30-60 minutes'
+_DURATION_RE = re.compile(r'\d+')
+
+# Context factors that raise recommendation confidence
+_CONFIDENCE_FACTORS = (
+    'stress_score',
+    'workload_level',
+    'deadline_pressure',
+    'sleep_hours',
+    'working_hours'
+)
+
+# Base task score by priority
+_PRIORITY_SCORES = {
+    'Critical': 100,
+    'High': 75,
+    'Medium': 50,
+    'Low': 25
+}
+
+# Priority weight when ranking multiple suggestions
+_PRIORITY_MAP = {'Critical': 4, 'High': 3, 'Medium': 2, 'Low': 1}
+
+# Task categories favoured by context when selecting the best task
+_RECOVERY_CATEGORIES = frozenset(('Break', 'Stress recovery'))  # high stress
+_CREATIVE_CATEGORIES = frozenset(('Creative', 'Innovation'))  # low stress
+_LIGHT_CATEGORIES = frozenset(('Light tasks', 'Break'))  # heavy workload
+
+# Task categories favoured by stress when ranking multiple suggestions
+_SUPPORT_CATEGORIES = frozenset(('Break', 'Stress recovery', 'Peer support'))
+_PRODUCTIVE_CATEGORIES = frozenset(('Creative', 'Innovation', 'Teamwork'))
 
 # Import will work when file is in correct location
 try:
@@ -51,13 +79,92 @@ class RecommendationService:
         self.recommendations = TASK_RECOMMENDATIONS
         self.emotion_to_zone = EMOTION_TO_ZONE
         self.task_zones = TASK_ZONES
-        self._recommendation_cache = {}
+        
+        # Recommendations are a pure function of (emotion, context), so
+        # repeat queries (dashboards polling) are served from memory
+        self._recommendation_cache = LRUCache(maxsize=1024)
+        self._cache_lock = threading.Lock()
+        
+        # (epoch second, ISO string) of the last response timestamp
+        self._ts_cache = (0, "")
+        
+        # Resolve zone details once per zone and each emotion's tasks and
+        # zone details into one flat bundle, so a recommendation is a
+        # single lookup instead of a chain of dict gets
+        self._zone_bundle: Dict[str, tuple] = {
+            zone: self._resolve_zone(zone_info)
+            for zone, zone_info in self.task_zones.items()
+        }
+        self._emotion_bundle: Dict[str, tuple] = {
+            emotion: self._resolve_emotion(tasks_data)
+            for emotion, tasks_data in self.recommendations.items()
+        }
+        
+        # Zone index: emotions per zone and their tasks, each tagged with
+        # its emotion once here rather than copied per request
+        self._zone_to_emotions: Dict[str, List[str]] = {}
+        self._zone_to_tasks: Dict[str, List[Dict]] = {}
+        for emotion, zone in self.emotion_to_zone.items():
+            self._zone_to_emotions.setdefault(zone, []).append(emotion)
+            self._zone_to_tasks.setdefault(zone, []).extend(
+                {**task, 'emotion': emotion}
+                for task in self.recommendations.get(emotion, {}).get('tasks', [])
+            )
+        
+        # (high stress, low stress) insight per zone
+        self._zone_insights: Dict[str, tuple] = {
+            zone: self._stress_insights(zone) for zone in self.task_zones
+        }
+        
+        self._task_arrays: Dict[str, Dict[str, np.ndarray]] = {
+            emotion: self._build_task_arrays(bundle[2])
+            for emotion, bundle in self._emotion_bundle.items()
+        }
+        
         logger.info("💡 Recommendation Service initialized")
     
+    @staticmethod
+    def _resolve_zone(zone_info: Dict) -> tuple:
+        """(description, energy_level, color) of a task zone"""
+        return (
+            zone_info.get('description', ''),
+            zone_info.get('energy_level', ''),
+            zone_info.get('color', '#FFC107')
+        )
+    
+    def _resolve_emotion(self, emotion_tasks: Dict) -> tuple:
+        """(zone, zone_name, tasks, description, energy_level, color) of an emotion's tasks"""
+        zone = emotion_tasks.get('zone', 'YELLOW')
+        zone_bundle = self._zone_bundle.get(zone) or self._resolve_zone({})
+        return (
+            zone,
+            emotion_tasks.get('zone_name', 'Yellow_Routine_Task'),
+            emotion_tasks.get('tasks', []),
+            *zone_bundle
+        )
+    
+    def _get_emotion_bundle(self, emotion: str) -> Optional[tuple]:
+        """
+        Precomputed bundle for an emotion
+        
+        Emotions outside the catalog resolve through get_tasks_for_emotion
+        (the Neutral fallback) as before.
+        
+        Returns:
+            tuple: (zone, zone_name, tasks, description, energy_level, color)
+                or None if no tasks are available for the emotion
+        """
+        try:
+            return self._emotion_bundle[emotion]
+        except KeyError:
+            emotion_tasks = get_tasks_for_emotion(emotion)
+            return self._resolve_emotion(emotion_tasks) if emotion_tasks else None
+    
     def recommend_task(
         self,
         dominant_emotion: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        include: Optional[set] = None
     ) -> Dict[str, Any]:
         """
         Get task recommendation based on emotion and context
@@ -65,81 +172,244 @@ class RecommendationService:
         Args:
             dominant_emotion: Detected emotion
             context: Optional context (stress_score, workload, etc.)
+            include: Optional parts to build ('zone_info', 'insights');
+                None builds all of them
         
         Returns:
             dict: Task recommendation with zone info
         """
         try:
-            # Get tasks for emotion
-            emotion_tasks = get_tasks_for_emotion(dominant_emotion)
-            
-            if not emotion_tasks:
-                logger.warning(f"⚠️ No tasks found for emotion: {dominant_emotion}")
-                return {
-                    "success": False,
-                    "error": f"No recommendations available for emotion: {dominant_emotion}"
-                }
-            
-            # Get zone info
-            zone = emotion_tasks.get('zone', 'YELLOW')
-            zone_name = emotion_tasks.get('zone_name', 'Yellow_Routine_Task')
-            tasks_list = emotion_tasks.get('tasks', [])
-            
-            if not tasks_list:
-                return {
-                    "success": False,
-                    "error": "No tasks available in zone"
-                }
-            
-            # Select best task based on context
-            selected_task = self._select_best_task(tasks_list, context)
-            
-            # Calculate confidence based on context completeness
-            confidence = self._calculate_confidence(context)
-            
-            # Get zone details
-            zone_info = self.task_zones.get(zone, {})
-            
-            result = {
-                "success": True,
-                "dominant_emotion": dominant_emotion,
-                "recommendation": selected_task,
-                "zone": zone,
-                "zone_name": zone_name,
-                "zone_info": {
-                    "description": zone_info.get('description', ''),
-                    "energy_level": zone_info.get('energy_level', ''),
-                    "color": zone_info.get('color', '#FFC107')
-                },
-                "confidence": confidence,
-                "context_used": context is not None,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            # Add contextual insights if context provided
-            if context:
-                result["contextual_insights"] = self._generate_insights(
-                    context,
-                    selected_task,
-                    zone
-                )
+            cache_key = (
+                dominant_emotion,
+                None if context is None else tuple(sorted(context.items())),
+                None if include is None else frozenset(include)
+            )
+            hash(cache_key)
+        except TypeError:
+            # Unhashable context values - compute without caching
+            return self._recommend_task(dominant_emotion, context, include)
+        
+        with self._cache_lock:
+            cached = self._recommendation_cache.get(cache_key)
+        
+        if cached is not None:
+            return {**cached, "timestamp": self._timestamp()}
+        
+        result = self._recommend_task(dominant_emotion, context, include)
+        
+        if result.get("success"):
+            with self._cache_lock:
+                self._recommendation_cache[cache_key] = result
+            result = dict(result)
+        
+        return result
+    
+    def _recommend_task(
+        self,
+        dominant_emotion: str,
+        context: Optional[Dict[str, Any]],
+        include: Optional[set] = None
+    ) -> Dict[str, Any]:
+        """Build a task recommendation (uncached)"""
+        try:
+            # Get tasks and zone info for emotion
+            bundle = self._get_emotion_bundle(dominant_emotion)
             
-            logger.debug(f"💡 Recommendation: {selected_task['task']} ({zone})")
+            if bundle is None:
+                return self._no_tasks_result(dominant_emotion)
             
-            return result
+            return self._build_recommendation(
+                dominant_emotion,
+                bundle,
+                self._task_arrays.get(dominant_emotion),
+                context,
+                self._timestamp(),
+                include
+            )
             
         except Exception as e:
-            logger.error(f"❌ Error generating recommendation: {e}", exc_info=True)
+            return self._recommendation_error(e)
+    
+    def recommend_batch(
+        self,
+        emotions: List[str],
+        contexts: Optional[List[Optional[Dict[str, Any]]]] = None,
+        include: Optional[set] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get task recommendations for many (emotion, context) requests at once
+        
+        Requests are grouped by emotion so each emotion's tasks and scoring
+        columns are resolved once per batch; the batch shares one timestamp.
+        
+        Args:
+            emotions: Detected emotion per request
+            contexts: Optional context per request (same length as emotions)
+            include: Optional parts to build, as for recommend_task
+        
+        Returns:
+            list: recommend_task result per request, in request order
+        
+        Raises:
+            ValueError: If contexts and emotions differ in length
+        """
+        if contexts is None:
+            contexts = [None] * len(emotions)
+        elif len(contexts) != len(emotions):
+            raise ValueError("emotions and contexts must have the same length")
+        
+        timestamp = self._timestamp()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(emotions)
+        
+        groups: Dict[str, List[int]] = {}
+        for idx, emotion in enumerate(emotions):
+            groups.setdefault(emotion, []).append(idx)
+        
+        for emotion, indices in groups.items():
+            try:
+                bundle = self._get_emotion_bundle(emotion)
+                
+                if bundle is None:
+                    failure = self._no_tasks_result(emotion)
+                    for idx in indices:
+                        results[idx] = dict(failure)
+                    continue
+                
+                arrays = self._task_arrays.get(emotion)
+                if arrays is None and bundle[2]:
+                    arrays = self._build_task_arrays(bundle[2])
+            except Exception as e:
+                failure = self._recommendation_error(e)
+                for idx in indices:
+                    results[idx] = dict(failure)
+                continue
+            
+            for idx in indices:
+                try:
+                    results[idx] = self._build_recommendation(
+                        emotion,
+                        bundle,
+                        arrays,
+                        contexts[idx],
+                        timestamp,
+                        include
+                    )
+                except Exception as e:
+                    results[idx] = self._recommendation_error(e)
+        
+        logger.debug(f"💡 Batch recommendations: {len(emotions)} requests, {len(groups)} emotions")
+        
+        return results
+    
+    def _build_recommendation(
+        self,
+        dominant_emotion: str,
+        bundle: tuple,
+        arrays: Optional[Dict[str, np.ndarray]],
+        context: Optional[Dict[str, Any]],
+        timestamp: str,
+        include: Optional[set] = None
+    ) -> Dict[str, Any]:
+        """
+        Recommendation result for an emotion's resolved bundle
+        
+        zone_info and contextual insights are only built when requested
+        (or when include is None).
+        
+        Args:
+            dominant_emotion: Detected emotion
+            bundle: Emotion bundle from _get_emotion_bundle
+            arrays: Scoring columns for the bundle's tasks (built if None)
+            context: Optional user context
+            timestamp: Response timestamp
+            include: Optional parts to build ('zone_info', 'insights')
+        
+        Returns:
+            dict: Task recommendation with zone info
+        """
+        zone, zone_name, tasks_list, description, energy_level, color = bundle
+        
+        if not tasks_list:
             return {
                 "success": False,
-                "error": str(e),
-                "error_type": type(e).__name__
+                "error": "No tasks available in zone"
             }
+        
+        # Select best task based on context
+        selected_task = self._select_best_task(tasks_list, context, arrays)
+        
+        # Calculate confidence based on context completeness
+        confidence = self._calculate_confidence(context)
+        
+        result = {
+            "success": True,
+            "dominant_emotion": dominant_emotion,
+            "recommendation": selected_task,
+            "zone": zone,
+            "zone_name": zone_name
+        }
+        
+        if include is None or 'zone_info' in include:
+            result["zone_info"] = {
+                "description": description,
+                "energy_level": energy_level,
+                "color": color
+            }
+        
+        result["confidence"] = confidence
+        result["context_used"] = context is not None
+        result["timestamp"] = timestamp
+        
+        # Add contextual insights if context provided
+        if context and (include is None or 'insights' in include):
+            result["contextual_insights"] = self._generate_insights(
+                context,
+                selected_task,
+                zone
+            )
+        
+        logger.debug(f"💡 Recommendation: {selected_task['task']} ({zone})")
+        
+        return result
+    
+    @staticmethod
+    def _no_tasks_result(dominant_emotion: str) -> Dict[str, Any]:
+        """Failure result for an emotion without tasks"""
+        logger.warning(f"⚠️ No tasks found for emotion: {dominant_emotion}")
+        return {
+            "success": False,
+            "error": f"No recommendations available for emotion: {dominant_emotion}"
+        }
+    
+    @staticmethod
+    def _recommendation_error(e: Exception) -> Dict[str, Any]:
+        """Failure result for an error while recommending"""
+        logger.error(f"❌ Error generating recommendation: {e}", exc_info=True)
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__
+        }
+    
+    def _timestamp(self) -> str:
+        """
+        Current UTC time as an ISO string at second granularity
+        
+        The string is formatted once per second and reused by every
+        response within that second.
+        """
+        second = int(time.time())
+        ts_cache = self._ts_cache
+        if ts_cache[0] != second:
+            ts_cache = (second, datetime.utcfromtimestamp(second).isoformat())
+            self._ts_cache = ts_cache
+        return ts_cache[1]
     
     def _select_best_task(
         self,
         tasks: List[Dict],
-        context: Optional[Dict]
+        context: Optional[Dict],
+        arrays: Optional[Dict[str, np.ndarray]] = None
     ) -> Dict:
         """
         Select the most appropriate task based on context
@@ -147,6 +417,7 @@ class RecommendationService:
         Args:
             tasks: List of available tasks
             context: User context
+            arrays: Precomputed scoring columns for tasks (built if omitted)
         
         Returns:
             dict: Selected task
@@ -155,59 +426,67 @@ class RecommendationService:
             # No context - return highest priority task
             return tasks[0]
         
-        # Score each task based on context
-        scored_tasks = []
+        if arrays is None:
+            arrays = self._build_task_arrays(tasks)
         
-        for task in tasks:
-            score = 0
-            
-            # Priority scoring
-            priority_scores = {
-                'Critical': 100,
-                'High': 75,
-                'Medium': 50,
-                'Low': 25
-            }
-            score += priority_scores.get(task.get('priority', 'Medium'), 50)
-            
-            # Stress-based scoring
-            stress_score = context.get('stress_score', 5)
-            if stress_score >= 7:
-                # High stress - prefer recovery/break tasks
-                if task.get('category') in ['Break', 'Stress recovery']:
-                    score += 50
-            elif stress_score <= 3:
-                # Low stress - prefer creative/challenging tasks
-                if task.get('category') in ['Creative', 'Innovation']:
-                    score += 50
-            
-            # Workload-based scoring
-            workload = context.get('workload_level', 5)
-            if workload >= 7:
-                # High workload - prefer light tasks
-                if task.get('category') in ['Light tasks', 'Break']:
-                    score += 30
-            
-            # Time availability
-            if 'time_available' in context:
-                task_duration = self._parse_duration(task.get('duration', '30 minutes'))
-                if task_duration <= context['time_available']:
-                    score += 20
-            
-            scored_tasks.append((score, task))
+        # Score every task at once over the precomputed columns
+        scores = arrays['priority'].copy()
+        
+        # Stress-based scoring
+        stress_score = context.get('stress_score', 5)
+        if stress_score >= 7:
+            # High stress - prefer recovery/break tasks
+            scores += 50 * arrays['recovery']
+        elif stress_score <= 3:
+            # Low stress - prefer creative/challenging tasks
+            scores += 50 * arrays['creative']
+        
+        # Workload-based scoring
+        workload = context.get('workload_level', 5)
+        if workload >= 7:
+            # High workload - prefer light tasks
+            scores += 30 * arrays['light']
         
-        # Sort by score and return best
-        scored_tasks.sort(key=lambda x: x[0], reverse=True)
-        return scored_tasks[0][1]
+        # Time availability
+        if 'time_available' in context:
+            scores += 20 * (arrays['duration'] <= context['time_available'])
+        
+        # argmax keeps the first of equally scored tasks
+        return tasks[int(scores.argmax())]
+    
+    def _build_task_arrays(self, tasks: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Column (structure-of-arrays) view of a task list for scoring
+        
+        Args:
+            tasks: List of available tasks
+        
+        Returns:
+            dict: Base priority scores, category flags and durations per task
+        """
+        categories = [task.get('category') for task in tasks]
+        
+        return {
+            'priority': np.array(
+                [_PRIORITY_SCORES.get(task.get('priority', 'Medium'), 50) for task in tasks],
+                dtype=np.int32
+            ),
+            'recovery': np.array([c in _RECOVERY_CATEGORIES for c in categories], dtype=bool),
+            'creative': np.array([c in _CREATIVE_CATEGORIES for c in categories], dtype=bool),
+            'light': np.array([c in _LIGHT_CATEGORIES for c in categories], dtype=bool),
+            'duration': np.array(
+                [self._parse_duration(task.get('duration', '30 minutes')) for task in tasks],
+                dtype=np.int32
+            )
+        }
     
     def _parse_duration(self, duration_str: str) -> int:
         """Parse duration string to minutes (approximate)"""
         try:
             # Extract first number
-            import re
-            numbers = re.findall(r'\d+', duration_str)
-            if numbers:
-                return int(numbers[0])
+            match = _DURATION_RE.search(duration_str)
+            if match:
+                return int(match.group())
         except Exception:
             pass
         return 30  # Default
@@ -228,16 +507,8 @@ class RecommendationService:
         confidence = 0.6
         
         # Add confidence for each context factor
-        factors = [
-            'stress_score',
-            'workload_level',
-            'deadline_pressure',
-            'sleep_hours',
-            'working_hours'
-        ]
-        
-        available_factors = sum(1 for f in factors if f in context)
-        confidence += (available_factors / len(factors)) * 0.4
+        available_factors = sum(1 for f in _CONFIDENCE_FACTORS if f in context)
+        confidence += (available_factors / len(_CONFIDENCE_FACTORS)) * 0.4
         
         return round(min(1.0, confidence), 2)
     
@@ -255,10 +526,9 @@ class RecommendationService:
             workload = context.get('workload_level', 0)
             
             # Stress-based insights
-            if stress >= 7:
-                insights.append(f"⚠️ High stress detected - {zone} zone task recommended for recovery")
-            elif stress <= 3:
-                insights.append(f"✅ Low stress - good opportunity for {zone} zone productivity")
+            if stress >= 7 or stress <= 3:
+                stress_insights = self._zone_insights.get(zone) or self._stress_insights(zone)
+                insights.append(stress_insights[0] if stress >= 7 else stress_insights[1])
             
             # Workload insights
             if workload >= 7:
@@ -279,6 +549,14 @@ class RecommendationService:
         
         return insights
     
+    @staticmethod
+    def _stress_insights(zone: str) -> tuple:
+        """(high stress, low stress) insight text for a zone"""
+        return (
+            f"⚠️ High stress detected - {zone} zone task recommended for recovery",
+            f"✅ Low stress - good opportunity for {zone} zone productivity"
+        )
+    
     def get_multiple_recommendations(
         self,
         dominant_emotion: str,
@@ -304,17 +582,15 @@ class RecommendationService:
                 }
             
             # Get tasks for emotion
-            emotion_tasks = get_tasks_for_emotion(dominant_emotion)
+            bundle = self._get_emotion_bundle(dominant_emotion)
             
-            if not emotion_tasks:
+            if bundle is None:
                 return {
                     "success": False,
                     "error": f"No recommendations for emotion: {dominant_emotion}"
                 }
             
-            tasks_list = emotion_tasks.get('tasks', [])
-            zone = emotion_tasks.get('zone', 'YELLOW')
-            zone_name = emotion_tasks.get('zone_name', '')
+            zone, zone_name, tasks_list = bundle[:3]
             
             # Limit to available tasks
             count = min(count, len(tasks_list))
@@ -331,12 +607,13 @@ class RecommendationService:
             else:
                 selected_tasks = tasks_list[:count]
             
-            # Add ranking
+            # Add ranking (confidence depends on context only)
+            confidence = self._calculate_confidence(context)
             suggestions = []
             for idx, task in enumerate(selected_tasks, 1):
                 task_copy = task.copy()
                 task_copy['rank'] = idx
-                task_copy['confidence'] = self._calculate_confidence(context)
+                task_copy['confidence'] = confidence
                 suggestions.append(task_copy)
             
             return {
@@ -360,19 +637,18 @@ class RecommendationService:
         score = 0.0
         
         # Priority weight
-        priority_map = {'Critical': 4, 'High': 3, 'Medium': 2, 'Low': 1}
-        score += priority_map.get(task.get('priority', 'Medium'), 2) * 10
+        score += _PRIORITY_MAP.get(task.get('priority', 'Medium'), 2) * 10
         
         # Context alignment
         stress = context.get('stress_score', 5)
         
         if stress >= 7:
             # Prefer recovery tasks
-            if task.get('category') in ['Break', 'Stress recovery', 'Peer support']:
+            if task.get('category') in _SUPPORT_CATEGORIES:
                 score += 30
         elif stress <= 3:
             # Prefer productive tasks
-            if task.get('category') in ['Creative', 'Innovation', 'Teamwork']:
+            if task.get('category') in _PRODUCTIVE_CATEGORIES:
                 score += 30
         
         return score
@@ -387,17 +663,16 @@ class RecommendationService:
         try:
             emotion_task_mapping = {}
             
-            for emotion, tasks_data in self.recommendations.items():
-                zone = tasks_data.get('zone', 'YELLOW')
-                zone_info = self.task_zones.get(zone, {})
+            for emotion, bundle in self._emotion_bundle.items():
+                zone, zone_name, tasks_list, description, energy_level, _ = bundle
                 
                 emotion_task_mapping[emotion] = {
                     "zone": zone,
-                    "zone_name": tasks_data.get('zone_name', ''),
-                    "zone_description": zone_info.get('description', ''),
-                    "energy_level": zone_info.get('energy_level', ''),
-                    "task_count": len(tasks_data.get('tasks', [])),
-                    "tasks": tasks_data.get('tasks', [])
+                    "zone_name": zone_name,
+                    "zone_description": description,
+                    "energy_level": energy_level,
+                    "task_count": len(tasks_list),
+                    "tasks": tasks_list
                 }
             
             return {
@@ -438,24 +713,9 @@ class RecommendationService:
                     "error": f"Invalid zone: {zone}"
                 }
             
-            # Get all emotions in this zone
-            zone_emotions = [
-                emotion for emotion, z in self.emotion_to_zone.items()
-                if z == zone
-            ]
-            
-            # Collect tasks from all emotions in zone
-            all_tasks = []
-            for emotion in zone_emotions:
-                emotion_data = self.recommendations.get(emotion, {})
-                tasks = emotion_data.get('tasks', [])
-                for task in tasks:
-                    task_copy = task.copy()
-                    task_copy['emotion'] = emotion
-                    all_tasks.append(task_copy)
-            
-            # Limit count
-            selected_tasks = all_tasks[:count]
+            # Emotions in this zone and their tasks, limited to count
+            zone_emotions = list(self._zone_to_emotions.get(zone, []))
+            selected_tasks = self._zone_to_tasks.get(zone, [])[:count]
             
             zone_info = self.task_zones[zone]
             
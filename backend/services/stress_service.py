@@ -7,7 +7,9 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import logging
+import math
 from collections import defaultdict
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +23,22 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from backend.database.db import db_manager
+from backend.services._stress_kernels import trend_stats
+
+# Mood stress points per emotion (notebook Cell 7)
+_MOOD_POINTS = {
+    'Happy': 0.0,
+    'Surprise': 2.5,
+    'Neutral': 5.0,
+    'Sad': 7.5,
+    'Fear': 7.5,
+    'Disgust': 7.5,
+    'Angry': 10.0
+}
+
+# Points for a 0-10 workload/deadline rating, indexed by the rating:
+# 0-2 → 0, 3-4 → 2.5, 5-6 → 5, 7-8 → 7.5, 9-10 → 10
+_BIN10_POINTS = (0.0, 0.0, 0.0, 2.5, 2.5, 5.0, 5.0, 7.5, 7.5, 10.0, 10.0)
 
 
 class StressService:
@@ -31,6 +49,10 @@ class StressService:
     
     def __init__(self):
         self.db = db_manager.get_database()
+        
+        # Stress level label for every integer score 0-10
+        self._level_lut = tuple(self._compute_level(s) for s in range(11))
+        
         logger.info("💊 Stress Service initialized (Notebook-aligned)")
     
     def calculate_stress_score(
@@ -66,17 +88,7 @@ class StressService:
             
             # ===== FACTOR 1: MOOD SCORING (0-10 points) =====
             # From notebook Cell 7
-            mood_points_map = {
-                'Happy': 0.0,
-                'Surprise': 2.5,
-                'Neutral': 5.0,
-                'Sad': 7.5,
-                'Fear': 7.5,
-                'Disgust': 7.5,
-                'Angry': 10.0
-            }
-            
-            mood_points = mood_points_map.get(dominant_emotion, 5.0)
+            mood_points = _MOOD_POINTS.get(dominant_emotion, 5.0)
             points += mood_points
             factor_breakdown['mood'] = {
                 'value': dominant_emotion,
@@ -197,32 +209,24 @@ class StressService:
         7-8: High (7.5 pts)
         9-10: Very High (10 pts)
         """
-        if workload <= 2:
-            return 0.0
-        elif workload <= 4:
-            return 2.5
-        elif workload <= 6:
-            return 5.0
-        elif workload <= 8:
-            return 7.5
-        else:
-            return 10.0
+        return self._bin10_points(workload)
     
     def _calculate_deadline_points(self, deadline: int) -> float:
         """
         Calculate deadline pressure points (0-10 scale input)
         Same bins as workload
         """
-        if deadline <= 2:
-            return 0.0
-        elif deadline <= 4:
-            return 2.5
-        elif deadline <= 6:
-            return 5.0
-        elif deadline <= 8:
-            return 7.5
-        else:
-            return 10.0
+        return self._bin10_points(deadline)
+    
+    @staticmethod
+    def _bin10_points(rating: float) -> float:
+        """
+        Points for a 0-10 rating from the shared lookup table
+        
+        Fractional ratings round up, so each value falls in the same bin
+        as the original upper-bound comparisons (e.g. 2.5 → 3-4 bin).
+        """
+        return _BIN10_POINTS[max(0, min(10, math.ceil(rating)))]
     
     def _calculate_work_hours_points(self, hours: float) -> float:
         """
@@ -274,6 +278,23 @@ class StressService:
         Args:
             score: Stress score (0-10)
         
+        Returns:
+            str: Stress level label
+        """
+        index = int(score)
+        if index != score:
+            # Fractional scores keep the exact range comparison
+            return self._compute_level(score)
+        return self._level_lut[min(max(index, 0), 10)]
+    
+    @staticmethod
+    def _compute_level(score: float) -> str:
+        """
+        Map a score to its stress level label by range
+        
+        Args:
+            score: Stress score
+        
         Returns:
             str: Stress level label
         """
@@ -354,39 +375,41 @@ class StressService:
             
             since = datetime.utcnow() - timedelta(days=days)
             
-            entries = list(
-                mood_collection.find({
+            # Stream only the scores straight into a float32 series
+            cursor = mood_collection.find(
+                {
                     "user_id": user_id,
                     "timestamp": {"$gte": since}
-                }).sort("timestamp", 1)
+                },
+                {"_id": 0, "stress_score": 1}
+            ).sort("timestamp", 1).batch_size(500)
+            
+            stress_scores = np.fromiter(
+                (e.get("stress_score", 0) for e in cursor),
+                dtype=np.float32
             )
+            n = int(stress_scores.shape[0])
             
-            if not entries:
+            if not n:
                 return {
                     "success": True,
                     "message": "No data available for analysis",
                     "analysis": {}
                 }
             
-            # Extract stress scores
-            stress_scores = [e.get("stress_score", 0) for e in entries]
-            
-            # Calculate statistics
-            import numpy as np
+            # Calculate statistics (compiled kernel for long series)
+            avg_stress, std_stress, first_avg, second_avg = trend_stats(stress_scores)
+            max_stress = stress_scores.max()
+            min_stress = stress_scores.min()
             
-            avg_stress = np.mean(stress_scores)
-            max_stress = np.max(stress_scores)
-            min_stress = np.min(stress_scores)
-            std_stress = np.std(stress_scores)
+            # Count high stress events
+            high_stress_events = int(np.count_nonzero(stress_scores >= 7))
+            moderate_stress_events = int(np.count_nonzero(
+                (stress_scores >= 3) & (stress_scores < 7)
+            ))
             
             # Determine trend
-            if len(stress_scores) >= 2:
-                first_half = stress_scores[:len(stress_scores)//2]
-                second_half = stress_scores[len(stress_scores)//2:]
-                
-                first_avg = np.mean(first_half)
-                second_avg = np.mean(second_half)
-                
+            if n >= 2:
                 if second_avg > first_avg + 1:
                     trend = "increasing"
                 elif second_avg < first_avg - 1:
@@ -396,10 +419,6 @@ class StressService:
             else:
                 trend = "insufficient_data"
             
-            # Count high stress events
-            high_stress_events = sum(1 for s in stress_scores if s >= 7)
-            moderate_stress_events = sum(1 for s in stress_scores if 3 <= s < 7)
-            
             return {
                 "success": True,
                 "user_id": user_id,
@@ -412,10 +431,8 @@ class StressService:
                     "trend": trend,
                     "high_stress_events": high_stress_events,
                     "moderate_stress_events": moderate_stress_events,
-                    "total_entries": len(stress_scores),
-                    "high_stress_percentage": round(
-                        (high_stress_events / len(stress_scores)) * 100, 1
-                    ) if stress_scores else 0
+                    "total_entries": n,
+                    "high_stress_percentage": round((high_stress_events / n) * 100, 1)
                 }
             }
             
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Convert the FER2013 Mini-XCEPTION Keras model to TFLite and an XLA SavedModel for Amdox
+One-time offline step - the backend picks up the converted models automatically
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+MODELS_DIR = Path(__file__).resolve().parent / "models"
+KERAS_MODEL = MODELS_DIR / "fer2013_mini_XCEPTION.102-0.66.hdf5"
+INT8_MODEL = MODELS_DIR / "fer2013_mini_XCEPTION_int8.tflite"
+FP16_MODEL = MODELS_DIR / "fer2013_mini_XCEPTION_fp16.tflite"
+SAVED_MODEL = MODELS_DIR / "fer2013_mini_XCEPTION_savedmodel"
+
+TARGET_SIZE = (64, 64)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def load_calibration_samples(samples_dir: Path, limit: int):
+    """Load and preprocess face images used to calibrate int8 ranges"""
+    import cv2
+
+    samples = []
+    for path in sorted(samples_dir.rglob("*")):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+
+        gray = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+
+        # Same pipeline as EmotionModel.preprocess_face
+        gray = cv2.resize(gray, TARGET_SIZE, interpolation=cv2.INTER_AREA)
+        gray = cv2.equalizeHist(gray)
+        samples.append((gray.astype(np.float32) * (1.0 / 255.0))[None, :, :, None])
+
+        if len(samples) >= limit:
+            break
+
+    return samples
+
+
+def convert_int8(model, samples, output_path: Path):
+    """Full-integer post-training quantization with int8 input/output"""
+    import tensorflow as tf
+
+    def representative_dataset():
+        for sample in samples:
+            yield [sample]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+
+    output_path.write_bytes(converter.convert())
+    print(f"  ✅ Saved int8 model: {output_path} ({output_path.stat().st_size / 1024:.0f} KB)")
+
+
+def convert_fp16(model, output_path: Path):
+    """Float16 weight quantization (fallback when int8 calibration drifts)"""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+
+    output_path.write_bytes(converter.convert())
+    print(f"  ✅ Saved fp16 model: {output_path} ({output_path.stat().st_size / 1024:.0f} KB)")
+
+
+def export_saved_model(model, output_dir: Path):
+    """XLA-compiled batch-1 and variable-batch SavedModel (TF deployments without TFLite)"""
+    import tensorflow as tf
+
+    input_shape = (*TARGET_SIZE, 1)
+    module = tf.Module()
+    module.model = model
+    module.infer1 = tf.function(
+        lambda x: model(x, training=False),
+        jit_compile=True,
+        input_signature=[tf.TensorSpec([1, *input_shape], tf.float32)]
+    )
+    module.infer_batch = tf.function(
+        lambda x: model(x, training=False),
+        jit_compile=True,
+        input_signature=[tf.TensorSpec([None, *input_shape], tf.float32)]
+    )
+
+    # Export beside the target and swap it in, so a starting backend never
+    # loads a half-written directory
+    staging = Path(tempfile.mkdtemp(prefix=f"{output_dir.name}.", dir=output_dir.parent))
+    try:
+        tf.saved_model.save(
+            module, str(staging),
+            signatures={"serving_default": module.infer_batch.get_concrete_function()}
+        )
+        if output_dir.exists():
+            retired = output_dir.with_name(f"{output_dir.name}.old")
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(output_dir, retired)
+            os.replace(staging, output_dir)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, output_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    print(f"  ✅ Saved SavedModel: {output_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the emotion model to TFLite and a SavedModel")
+    parser.add_argument(
+        "--samples", type=Path,
+        help="Directory of face images (e.g. FER2013 test split) used for int8 calibration; "
+             "the int8 model is skipped without it"
+    )
+    parser.add_argument("--limit", type=int, default=100, help="Number of calibration samples")
+    parser.add_argument("--model", type=Path, default=KERAS_MODEL, help="Source Keras model")
+    args = parser.parse_args()
+
+    try:
+        from tensorflow import keras
+    except ImportError:
+        print("❌ TensorFlow not available. Install with: pip install tensorflow")
+        return 1
+
+    print(f"📥 Loading Keras model: {args.model}")
+    model = keras.models.load_model(str(args.model), compile=False)
+
+    print("\n⚙️ Converting to TFLite fp16...")
+    convert_fp16(model, FP16_MODEL)
+
+    print("\n⚙️ Exporting XLA SavedModel...")
+    export_saved_model(model, SAVED_MODEL)
+
+    if args.samples is None:
+        print("\n⚠️ No --samples given - skipping int8 conversion")
+    else:
+        print(f"\n🖼️ Loading calibration samples from: {args.samples}")
+        samples = load_calibration_samples(args.samples, args.limit)
+        if not samples:
+            print("❌ No calibration images found")
+            return 1
+        print(f"  ✅ {len(samples)} samples")
+
+        print("\n⚙️ Converting to TFLite int8...")
+        convert_int8(model, samples, INT8_MODEL)
+
+    print("\n🎉 Conversion complete!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())